@@ -0,0 +1,109 @@
+"""
+Benchmark the vectorized batch BMI API and check it against the scalar API.
+
+Times calculate_bmi_batch, categorize_bmi_batch and validate_batch over
+random rows, once with a single unit per column and once with a unit per
+row, then compares a sample of rows with calculate_bmi, categorize_bmi and
+validate_input.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_batch.py [--rows N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+
+
+SAMPLE = 100000
+WEIGHT_UNITS = ('kg', 'lbs', 'stone')
+HEIGHT_UNITS = ('m', 'cm', 'ft', 'in')
+
+
+def best_of(operation, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_rows(rows: int, rng, mixed_units: bool):
+    """Weights in kg and heights in m, converted to random units per row when mixed_units."""
+    weights = rng.uniform(5, 700, rows)
+    heights = rng.uniform(0.3, 3.0, rows)
+    if not mixed_units:
+        return weights, heights, 'kg', 'm'
+    engine = BMICalculatorPro.__new__(BMICalculatorPro)
+    weight_units = np.array(WEIGHT_UNITS)[rng.integers(0, len(WEIGHT_UNITS), rows)]
+    height_units = np.array(HEIGHT_UNITS)[rng.integers(0, len(HEIGHT_UNITS), rows)]
+    for unit in WEIGHT_UNITS:
+        rows_in_unit = weight_units == unit
+        weights[rows_in_unit] /= engine.WEIGHT_CONVERSIONS[(unit, 'kg')]
+    for unit in HEIGHT_UNITS:
+        rows_in_unit = height_units == unit
+        heights[rows_in_unit] /= engine.HEIGHT_CONVERSIONS[(unit, 'm')]
+    return weights, heights, weight_units, height_units
+
+
+def check(engine, weights, heights, weight_units, height_units) -> bool:
+    """Compare the first SAMPLE rows with the scalar API."""
+    n = min(SAMPLE, len(weights))
+    units = [(weight_units if isinstance(weight_units, str) else weight_units[i],
+              height_units if isinstance(height_units, str) else height_units[i]) for i in range(n)]
+    bmis = engine.calculate_bmi_batch(weights[:n], heights[:n], *((weight_units, height_units) if isinstance(
+        weight_units, str) else (weight_units[:n], height_units[:n])))
+    codes = engine.categorize_bmi_batch(bmis)
+    valid = engine.validate_batch(weights[:n], heights[:n], *((weight_units, height_units) if isinstance(
+        weight_units, str) else (weight_units[:n], height_units[:n])))
+    keys = engine.CATEGORY_KEYS + ('unknown',)
+    for i in range(n):
+        w, h = float(weights[i]), float(heights[i])
+        if engine.calculate_bmi(w, h, *units[i]) != bmis[i]:
+            return False
+        if engine.categorize_bmi(float(bmis[i])) != keys[codes[i]]:
+            return False
+        if engine.validate_input(w, h, *units[i])[0] != valid[i]:
+            return False
+    edges = [-1.0, 0.0, 16.0, 18.5, 24.999, 25.0, 40.0, float('inf'), float('nan')]
+    return [engine.categorize_bmi(b) for b in edges] == [keys[c] for c in engine.categorize_bmi_batch(edges)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000000)
+    args = parser.parse_args()
+
+    engine = BMICalculatorPro.__new__(BMICalculatorPro)
+    rng = np.random.default_rng(42)
+    print(f"{args.rows:,} rows\n")
+    print(f"{'':<26} {'bmi':>12} {'categorize':>12} {'validate':>12} {'all three':>12}   scalar API match")
+    for label, mixed in (('one unit per column', False), ('unit per row', True)):
+        weights, heights, weight_units, height_units = make_rows(args.rows, rng, mixed)
+        bmis = engine.calculate_bmi_batch(weights, heights, weight_units, height_units)
+        times = [
+            best_of(lambda: engine.calculate_bmi_batch(weights, heights, weight_units, height_units)),
+            best_of(lambda: engine.categorize_bmi_batch(bmis)),
+            best_of(lambda: engine.validate_batch(weights, heights, weight_units, height_units)),
+        ]
+        rates = [args.rows / t / 1e6 for t in times + [sum(times)]]
+        match = check(engine, weights, heights, weight_units, height_units)
+        print(f"{label:<26} " + ' '.join(f"{r:8.1f} M/s" for r in rates) + f"   {match}")
+
+    start = time.perf_counter()
+    for i in range(SAMPLE):
+        bmi = engine.calculate_bmi(float(weights[i]), float(heights[i]), weight_units[i], height_units[i])
+        engine.categorize_bmi(bmi)
+        engine.validate_input(float(weights[i]), float(heights[i]), weight_units[i], height_units[i])
+    print(f"\nscalar API, unit per row: {SAMPLE / (time.perf_counter() - start) / 1e6:.2f} M/s")
+
+
+if __name__ == '__main__':
+    main()
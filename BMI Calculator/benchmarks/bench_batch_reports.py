@@ -0,0 +1,79 @@
+"""
+Benchmark per-user reports for a whole population against a serial loop.
+
+serial loop:  generate_report(name) for every user, the only way before
+batch, 0:     generate_user_reports rendering in this process
+batch, N:     generate_user_reports with N worker processes (one per CPU)
+batch, zip:   the same, written to a single .zip archive
+
+Reports are checked against generate_report for a sample of users.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_batch_reports.py [--users N] [--per-user N]
+"""
+import argparse
+import itertools
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+from bmi_reports import generate_user_reports
+from synthetic import iter_records
+
+
+CHUNK = 50000
+SAMPLE = 100
+
+
+def without_timestamp(report: str) -> str:
+    return re.sub(r'Report generated: .*', '', report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--per-user', type=int, default=5)
+    args = parser.parse_args()
+    workers = os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = BMICalculatorPro(storage='sqlite', data_dir=tmp)
+        records = iter_records(args.users * args.per_user, users=args.users)
+        while True:
+            chunk = list(itertools.islice(records, CHUNK))
+            if not chunk:
+                break
+            engine.storage.append_many(chunk)
+        names = [f"User {i}" for i in range(args.users)]
+        results = []
+
+        start = time.perf_counter()
+        for name in names:
+            engine.generate_report(name)
+        results.append(('serial loop', time.perf_counter() - start))
+
+        for label, destination, count in (('batch, 0', 'reports0', 0),
+                                          (f'batch, {workers}', 'reports', workers),
+                                          (f'batch, {workers}, zip', 'reports.zip', workers)):
+            start = time.perf_counter()
+            written = generate_user_reports(engine, os.path.join(tmp, destination), count)
+            results.append((label, time.perf_counter() - start))
+            assert written == args.users
+
+        for name in names[:SAMPLE]:
+            with open(os.path.join(tmp, 'reports', f"{name.replace(' ', '_')}.txt"), encoding='utf-8') as f:
+                assert without_timestamp(f.read()) == without_timestamp(engine.generate_report(name))
+        engine.close()
+
+        print(f"{args.users:,} user reports ({args.per_user} records each, sqlite backend, {workers} CPUs)\n")
+        for label, seconds in results:
+            print(f"{label:<18} {seconds:8.2f} s {args.users / seconds:10,.0f} reports/s")
+
+
+if __name__ == '__main__':
+    main()
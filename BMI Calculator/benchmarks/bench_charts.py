@@ -0,0 +1,110 @@
+"""
+Benchmark analytics charts: raw records against binned data and the chart cache.
+
+raw:      load all records and draw from them, as before (the trend plots
+          every record)
+binned:   chart data from the running statistics and trend rollups, then draw
+cached:   the data signature check that lets an unchanged chart be re-shown
+
+Charts are drawn off screen with the Agg backend, as the Tk canvas does.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_charts.py [--records N] [--days N]
+"""
+import argparse
+import datetime
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from bmi_engine import BMICalculatorPro
+from bmi_calculator_pro_clean import BMICalculatorProGUI
+from synthetic import iter_records
+
+
+CHUNK = 50000
+CHART_TYPES = ('BMI Distribution', 'Category Analysis', 'BMI Trend')
+
+
+class Charts(BMICalculatorProGUI):
+    """The GUI's chart code drawing on an off-screen figure."""
+
+    def __init__(self, engine):
+        self.bmi_engine = engine
+        self.fig = Figure(figsize=(10, 6), dpi=100)
+        self.canvas = FigureCanvasAgg(self.fig)
+
+    def draw(self, chart_type, data):
+        self.fig.clear()
+        {'BMI Distribution': self.create_bmi_distribution_chart,
+         'Category Analysis': self.create_category_analysis_chart,
+         'BMI Trend': self.create_bmi_trend_chart}[chart_type](data)
+        self.fig.tight_layout()
+        self.canvas.draw()
+
+    def draw_raw(self, chart_type):
+        """Draw from all records, as generate_chart did before binning."""
+        records = self.bmi_engine.load_records()
+        self.fig.clear()
+        ax = self.fig.add_subplot(111)
+        if chart_type == 'BMI Distribution':
+            ax.hist([r['bmi'] for r in records], bins=15, edgecolor='black', alpha=0.7)
+        elif chart_type == 'Category Analysis':
+            categories = {}
+            for record in records:
+                cat = record.get('category_name', 'Unknown')
+                categories[cat] = categories.get(cat, 0) + 1
+            ax.pie(categories.values(), labels=categories.keys(), autopct='%1.1f%%', startangle=90)
+        else:
+            ax.plot([datetime.datetime.fromisoformat(r['timestamp']) for r in records],
+                    [r['bmi'] for r in records], linewidth=0.5)
+        self.fig.tight_layout()
+        self.canvas.draw()
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=5 * 365)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = BMICalculatorPro(storage='sqlite', data_dir=tmp)
+        records = iter_records(args.records, days=args.days)
+        while True:
+            chunk = list(itertools.islice(records, CHUNK))
+            if not chunk:
+                break
+            engine.storage.append_many(chunk)
+        build = timed(engine.get_statistics)
+        engine.close()
+
+        engine = BMICalculatorPro(storage='sqlite', data_dir=tmp)
+        charts = Charts(engine)
+        print(f"{args.records:,} records over {args.days} days (sqlite); running statistics "
+              f"built once in {build:.1f} s and read back from file\n")
+        print(f"{'chart':<18} {'raw':>10} {'binned':>10} {'cached':>10}")
+        for chart_type in CHART_TYPES:
+            binned = timed(lambda: charts.draw(chart_type, charts._chart_data(chart_type)))
+            signature = engine.data_signature()
+            cached = timed(lambda: engine.data_signature() == signature)
+            raw = timed(lambda: charts.draw_raw(chart_type))
+            print(f"{chart_type:<18} {raw * 1000:7.0f} ms {binned * 1000:7.0f} ms {cached * 1000:7.3f} ms")
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
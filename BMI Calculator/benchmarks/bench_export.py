@@ -0,0 +1,92 @@
+"""
+Benchmark streaming exports: speed and peak memory by record count.
+
+Fills SQLite databases, then exports each to CSV, gzipped CSV and JSON
+in a child process, reporting time and the child's peak RSS. With
+streaming the peak should stay flat as the record count grows. The
+string-building export_data is measured on the smallest set for contrast.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_export.py [--records N]
+"""
+import argparse
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+from synthetic import iter_records
+
+
+SIZES = (500000,)
+CHUNK = 50000
+EXPORTS = (('csv', 'export.csv'), ('csv', 'export.csv.gz'), ('json', 'export.json'))
+
+
+def fill(data_dir: str, count: int):
+    engine = BMICalculatorPro(storage='sqlite', data_dir=data_dir)
+    records = iter_records(count)
+    while True:
+        chunk = list(itertools.islice(records, CHUNK))
+        if not chunk:
+            break
+        engine.storage.append_many(chunk)
+    engine.close()
+
+
+def child(data_dir: str, format_type: str, filename: str, streaming: bool):
+    """Run one export in this process."""
+    engine = BMICalculatorPro(storage='sqlite', data_dir=data_dir)
+    path = os.path.join(data_dir, filename)
+    if streaming:
+        engine.export_to_file(path, format_type)
+    else:
+        data = engine.export_data(format_type)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(data)
+    engine.close()
+
+
+def run_child(data_dir: str, format_type: str, filename: str, streaming: bool = True):
+    """Return seconds taken, peak RSS in MB and output size in MB."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', data_dir,
+                                format_type, filename, str(int(streaming))])
+    _, status, usage = os.wait4(process.pid, 0)
+    assert status == 0
+    size = os.path.getsize(os.path.join(data_dir, filename)) / 1e6
+    return time.perf_counter() - start, usage.ru_maxrss / 1024, size
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        data_dir, format_type, filename, streaming = sys.argv[2:]
+        child(data_dir, format_type, filename, streaming == '1')
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=5000000)
+    args = parser.parse_args()
+
+    print(f"{'records':>10} {'export':<16} {'seconds':>8} {'peak RSS':>10} {'output':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in SIZES + (args.records,):
+            data_dir = os.path.join(tmp, str(count))
+            os.makedirs(data_dir)
+            fill(data_dir, count)
+            runs = [(f"{filename}", run_child(data_dir, format_type, filename)) for format_type, filename in EXPORTS]
+            if count == SIZES[0]:
+                runs.append(('export_data csv', run_child(data_dir, 'csv', 'string.csv', streaming=False)))
+            for label, (seconds, peak, size) in runs:
+                print(f"{count:>10,} {label:<16} {seconds:8.1f} {peak:7.0f} MB {size:7.0f} MB", flush=True)
+            for name in os.listdir(data_dir):
+                os.remove(os.path.join(data_dir, name))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark bulk CSV import speed and memory.
+
+Writes screening CSVs (1% of rows invalid), then runs bmi_import.py on
+each in a child process with the SQLite backend, reporting the import
+rate and the child's peak memory. Memory should not grow with file size.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_import.py [--rows N]
+"""
+import argparse
+import csv
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = (100000,)
+
+
+def write_csv(path: str, rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'age', 'gender', 'weight', 'height', 'weight_unit', 'height_unit'])
+        for i in range(rows):
+            weight = round(rng.uniform(45, 130), 1)
+            height = round(rng.uniform(150, 200), 1)
+            if i % 100 == 99:
+                weight = 'n/a' if i % 200 == 199 else 2000
+            unit = 'kg' if i % 4 else 'lbs'
+            if unit == 'lbs' and isinstance(weight, float):
+                weight = round(weight * 2.20462, 1)
+            writer.writerow([f"Patient {i}", rng.randint(18, 90), ('Male', 'Female')[i % 2],
+                             weight, height, unit, 'cm'])
+
+
+def run_import(csv_path: str, data_dir: str):
+    """Return the importer's summary line and its peak RSS in MB."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'bmi_import.py'), csv_path,
+         '--storage', 'sqlite', '--data-dir', data_dir],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    output = process.stdout.read()
+    _, _, usage = os.wait4(process.pid, 0)
+    process.stdout.close()
+    summary = next(line for line in output.splitlines() if line.startswith('Imported'))
+    return summary, usage.ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in SIZES + (args.rows,):
+            csv_path = os.path.join(tmp, f'screening_{rows}.csv')
+            write_csv(csv_path, rows)
+            size_mb = os.path.getsize(csv_path) / 1e6
+            summary, peak_mb = run_import(csv_path, os.path.join(tmp, f'data_{rows}'))
+            print(f"{rows:>9,} rows ({size_mb:6.1f} MB)  peak RSS {peak_mb:6.1f} MB  {summary}")
+
+
+if __name__ == '__main__':
+    main()
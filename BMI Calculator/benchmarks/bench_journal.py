@@ -0,0 +1,50 @@
+"""
+Benchmark save cost of the journal backend as the record count grows.
+
+For each size the journal store starts from a snapshot of that many
+records, then SAVES records are saved through BMICalculatorPro.save_record
+(including any background compactions they trigger). Startup time, which
+reads the snapshot and replays the journal, is shown as well.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_journal.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+from synthetic import make_records
+
+
+SIZES = (1000, 100000, 500000)
+SAVES = 20000
+
+
+def main():
+    print(f"{'records':>10} {'saves/s':>10} {'us/save':>9} {'startup':>9}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'bmi_records.json'), 'w', encoding='utf-8') as f:
+                json.dump(make_records(size), f)
+
+            start = time.perf_counter()
+            engine = BMICalculatorPro(storage='journal', data_dir=tmp)
+            startup = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(SAVES):
+                engine.save_record(f"User {i % 1000}", 30, 'Female', 62, 1.68)
+            elapsed = time.perf_counter() - start
+            engine.storage.close()
+            assert len(engine.load_records()) == size + SAVES
+
+            print(f"{size:>10,} {SAVES / elapsed:10,.0f} {elapsed / SAVES * 1e6:9.1f} {startup:8.2f}s")
+
+
+if __name__ == '__main__':
+    main()
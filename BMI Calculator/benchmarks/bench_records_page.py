@@ -0,0 +1,92 @@
+"""
+Benchmark time-to-display of the records tab with paging.
+
+old refresh:   load, sort and format every record, as before paging
+first page:    get_records_page(0, 100) on a new engine, formatted
+next page:     the second page, with the engine warm
+middle page:   a page halfway through the records
+search:        the first page of names starting with "user 12"
+after save:    the first page again after one save_record()
+after delete:  the first page again after one delete_record()
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_records_page.py [--records N] [--backend sqlite]
+"""
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+from bmi_calculator_pro_clean import BMICalculatorProGUI
+from synthetic import iter_records
+
+
+CHUNK = 50000
+PAGE_SIZE = BMICalculatorProGUI.PAGE_SIZE
+format_row = BMICalculatorProGUI._record_row
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def show_page(engine, page, search=''):
+    total, records = engine.get_records_page(page * PAGE_SIZE, PAGE_SIZE, search)
+    return total, [format_row(record) for record in records]
+
+
+def old_refresh(engine):
+    records = engine.load_records()
+    records.sort(key=lambda x: x['timestamp'], reverse=True)
+    return [format_row(record) for record in records]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--backend', nargs='+', default=['sqlite', 'journal', 'json'],
+                        choices=('json', 'sqlite', 'journal'))
+    args = parser.parse_args()
+
+    print(f"{args.records:,} records, {PAGE_SIZE} per page\n")
+    print(f"{'backend':<8} {'step':<14} {'ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backend:
+            data_dir = os.path.join(tmp, backend)
+            engine = BMICalculatorPro(storage=backend, data_dir=data_dir)
+            records = iter_records(args.records)
+            while True:
+                chunk = list(itertools.islice(records, CHUNK))
+                if not chunk:
+                    break
+                engine.storage.append_many(chunk)
+            engine.close()
+
+            engine = BMICalculatorPro(storage=backend, data_dir=data_dir)
+            results = [('first page', timed(lambda: show_page(engine, 0))),
+                       ('next page', timed(lambda: show_page(engine, 1))),
+                       ('middle page', timed(lambda: show_page(engine, args.records // PAGE_SIZE // 2))),
+                       ('search', timed(lambda: show_page(engine, 0, 'user 12')))]
+            engine.save_record('Bench User', 40, 'Female', 70, 1.7)
+            results.append(('after save', timed(lambda: show_page(engine, 0))))
+            total, newest = engine.get_records_page(0, 1)
+            assert total == args.records + 1 and newest[0]['name'] == 'Bench User'
+            engine.delete_record(newest[0]['id'])
+            results.append(('after delete', timed(lambda: show_page(engine, 0))))
+            assert engine.get_records_page(0, 1)[0] == args.records
+            results.append(('old refresh', timed(lambda: old_refresh(engine))))
+            engine.close()
+
+            for label, seconds in results:
+                print(f"{backend:<8} {label:<14} {seconds * 1000:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark generate_report() on a large record set, cold vs warm.
+
+cold:        a new BMICalculatorPro, so records are read and parsed first
+warm:        the same engine again, served from the record cache
+after save:  one record saved in between; the cache is updated in place
+             and only the statistics are recomputed
+after touch: the data file changed on disk, so everything is reloaded
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_report_cache.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+from synthetic import make_records
+
+
+RECORDS = 200000
+
+
+def timed(operation) -> float:
+    start = time.perf_counter()
+    operation()
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'bmi_records.json')
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump(make_records(RECORDS), f)
+
+        engine = BMICalculatorPro(storage='json', data_dir=tmp)
+        results = [('cold', timed(engine.generate_report)),
+                   ('warm', timed(engine.generate_report))]
+
+        engine.save_record('New User', 35, 'Male', 80, 1.8)
+        results.append(('after save', timed(engine.generate_report)))
+        results.append(('warm', timed(engine.generate_report)))
+
+        # Another process rewriting the file
+        os.utime(data_file, ns=(time.time_ns(), time.time_ns() + 10**9))
+        results.append(('after touch', timed(engine.generate_report)))
+
+        print(f"generate_report() over {RECORDS:,} records (json backend)\n")
+        for label, seconds in results:
+            print(f"{label:<12} {seconds * 1000:10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
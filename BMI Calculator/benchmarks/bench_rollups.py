@@ -0,0 +1,84 @@
+"""
+Benchmark trend range queries on rollups against scanning the records.
+
+Five years of records are added to TrendRollups one at a time, as saves
+would. Each query shape is then timed on the rollups and on a scan of
+the records for the same range, and the results are compared.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_rollups.py [--records N] [--days N]
+"""
+import argparse
+import datetime
+import math
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_rollups import TrendRollups, age_band, period_key
+from synthetic import make_records
+
+
+REPEAT = 20
+
+
+def scan(records, start, end, granularity, gender=None, band=None):
+    """The rows of TrendRollups.query, computed from the records."""
+    periods = defaultdict(lambda: [0, 0.0, Counter()])
+    first, last = period_key(start, granularity), period_key(end, granularity)
+    for record in records:
+        period = period_key(record['timestamp'], granularity)
+        if not first <= period <= last:
+            continue
+        if gender and record['gender'] != gender or band and age_band(record['age']) != band:
+            continue
+        row = periods[period]
+        row[0] += 1
+        row[1] += record['bmi']
+        row[2][record['category_name']] += 1
+    return [{'period': period, 'count': count, 'mean_bmi': total / count, 'categories': dict(categories)}
+            for period, (count, total, categories) in sorted(periods.items())]
+
+
+def timed(function, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=5 * 365)
+    args = parser.parse_args()
+
+    records = make_records(args.records, days=args.days)
+    rollups = TrendRollups()
+    build, _ = timed(lambda: [rollups.add(record) for record in records])
+    print(f"{args.records:,} records over {args.days} days: rollups built in {build:.1f} s "
+          f"({args.records / build:,.0f} records/s)\n")
+
+    today = datetime.date.today()
+    queries = (
+        ('5 years by day', today - datetime.timedelta(days=args.days), today, 'day', None, None),
+        ('5 years by week', today - datetime.timedelta(days=args.days), today, 'week', None, None),
+        ('5 years by month', today - datetime.timedelta(days=args.days), today, 'month', None, None),
+        ('1 year, Female, 30-44', today - datetime.timedelta(days=365), today, 'week', 'Female', '30-44'),
+        ('90 days by day', today - datetime.timedelta(days=90), today, 'day', None, None)
+    )
+    print(f"{'query':<24} {'rows':>6} {'rollups':>10} {'scan':>10} {'speedup':>9}")
+    for label, start, end, granularity, gender, band in queries:
+        fast, rows = timed(lambda: rollups.query(start, end, granularity, gender, band), REPEAT)
+        slow, expected = timed(lambda: scan(records, start, end, granularity, gender, band))
+        assert [(r['period'], r['count'], r['categories']) for r in rows] == \
+               [(r['period'], r['count'], r['categories']) for r in expected]
+        assert all(math.isclose(a['mean_bmi'], b['mean_bmi'], rel_tol=1e-9) for a, b in zip(rows, expected))
+        print(f"{label:<24} {len(rows):>6} {fast * 1000:7.2f} ms {slow * 1000:7.0f} ms {slow / fast:8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark get_statistics() with running statistics against a full recalculation.
+
+rebuild:        first call with no statistics file; built from all records
+restart:        a new engine, statistics read from the file without loading records
+after save:     one save_record() and one get_statistics()
+after delete:   one delete_record() and one get_statistics()
+full recompute: _compute_statistics() over all records, the previous behaviour
+
+Afterwards the running statistics are compared with a full recalculation.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_running_stats.py [--records N] [--backend sqlite]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+from synthetic import make_records
+from bench_statistics import same
+
+
+OPERATIONS = 1000
+
+
+def timed(operation) -> float:
+    start = time.perf_counter()
+    operation()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=200000)
+    parser.add_argument('--backend', default='sqlite', choices=('json', 'sqlite', 'journal'))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = BMICalculatorPro(storage=args.backend, data_dir=tmp)
+        engine.storage.append_many(make_records(args.records))
+        results = [('rebuild', timed(engine.get_statistics))]
+        engine.close()
+
+        engine = BMICalculatorPro(storage=args.backend, data_dir=tmp)
+        results.append(('restart', timed(engine.get_statistics)))
+
+        rng = random.Random(1)
+        save_time = delete_time = 0.0
+        for i in range(OPERATIONS):
+            save_time += timed(lambda: (engine.save_record(f'Bench {i}', rng.randint(18, 90), 'Female',
+                                                           rng.uniform(45, 130), rng.uniform(1.5, 2.0)),
+                                        engine.get_statistics()))
+        ids = [r['id'] for r in engine.storage.load_all()]
+        for record_id in rng.sample(ids, OPERATIONS):
+            delete_time += timed(lambda: (engine.delete_record(record_id), engine.get_statistics()))
+        results.append(('after save', save_time / OPERATIONS))
+        results.append(('after delete', delete_time / OPERATIONS))
+
+        records = engine.storage.load_all()
+        start = time.perf_counter()
+        expected = engine._compute_statistics(records)
+        results.append(('full recompute', time.perf_counter() - start))
+
+        actual = dict(engine.get_statistics())
+        # Day buckets count the whole boundary day as recent
+        expected_recent = expected.pop('recent_records_count')
+        actual_recent = actual.pop('recent_records_count')
+        engine.close()
+
+        print(f"get_statistics() over {args.records:,} records ({args.backend} backend)\n")
+        for label, seconds in results:
+            print(f"{label:<16} {seconds * 1000:10.3f} ms")
+        print(f"\nafter {OPERATIONS} saves and {OPERATIONS} deletes:")
+        print(f"matches full recompute: {same(expected, actual)}")
+        print(f"recent records: {actual_recent} (exact: {expected_recent})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Load test the HTTP service on localhost: requests/s and latency percentiles.
+
+The service runs in a child process on a SQLite store of synthetic
+records. Client threads each keep one keep-alive connection and send
+requests back to back for a fixed time; "new connection" scenarios open
+a connection per request instead. Single /bmi calls are measured with
+and without grouping them into vectorized batches.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_service.py [--records N] [--clients N] [--seconds N]
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bmi_engine import BMICalculatorPro
+from synthetic import iter_records
+
+
+CHUNK = 50000
+BATCH_ROWS = 1000
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_service(data_dir: str, port: int, batching: bool = True) -> subprocess.Popen:
+    command = [sys.executable, os.path.join(ROOT, 'bmi_service.py'), '--port', str(port),
+               '--storage', 'sqlite', '--data-dir', data_dir]
+    if not batching:
+        command.append('--no-batching')
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        if line.startswith('Serving on'):
+            return process
+    raise RuntimeError('Service did not start')
+
+
+def stop_service(process: subprocess.Popen):
+    process.terminate()
+    process.wait()
+    process.stdout.close()
+
+
+def make_requests(seed: int):
+    """Endless (method, path, body) tuples for each scenario's requests."""
+    rng = random.Random(seed)
+    return {
+        'POST /bmi': lambda: ('POST', '/bmi', {'weight': round(rng.uniform(45, 130), 1),
+                                               'height': round(rng.uniform(150, 200), 1), 'height_unit': 'cm'}),
+        'POST /bmi/batch': lambda: ('POST', '/bmi/batch', {
+            'weights': [round(rng.uniform(45, 130), 1) for _ in range(BATCH_ROWS)],
+            'heights': [round(rng.uniform(1.5, 2.0), 2) for _ in range(BATCH_ROWS)]}),
+        'GET /records': lambda: ('GET', f"/records?name=User%20{rng.randrange(1000)}", None),
+        'GET /statistics': lambda: ('GET', '/statistics', None),
+        'POST /records': lambda: ('POST', '/records', {'name': f"Load {rng.randrange(1000)}", 'age': 40,
+                                                       'gender': 'Female', 'weight': 70, 'height': 1.7})
+    }
+
+
+def client(port: int, request, keep_alive: bool, deadline: float, latencies: list, errors: list):
+    connection = http.client.HTTPConnection('127.0.0.1', port) if keep_alive else None
+    while time.perf_counter() < deadline:
+        method, path, body = request()
+        payload = json.dumps(body) if body is not None else None
+        start = time.perf_counter()
+        if not keep_alive:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+        connection.request(method, path, body=payload, headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 300:
+            errors.append(response.status)
+        if not keep_alive:
+            connection.close()
+    if connection is not None:
+        connection.close()
+
+
+def run(port: int, scenario: str, clients: int, seconds: float, keep_alive: bool = True):
+    """Return requests/s, p50 and p99 latency in ms and the number of errors."""
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(port, make_requests(i)[scenario], keep_alive,
+                                                      deadline, latencies, errors))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (len(latencies) / elapsed, latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000, len(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = BMICalculatorPro(storage='sqlite', data_dir=tmp)
+        records = iter_records(args.records)
+        while True:
+            chunk = list(itertools.islice(records, CHUNK))
+            if not chunk:
+                break
+            engine.storage.append_many(chunk)
+        engine.get_statistics()
+        engine.close()
+
+        print(f"{args.records:,} records (sqlite), {args.clients} clients, {args.seconds:.0f} s per scenario, "
+              f"{os.cpu_count()} CPUs\n")
+        print(f"{'scenario':<34} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        scenarios = (
+            ('POST /bmi', True, True),
+            ('POST /bmi', True, False),
+            ('POST /bmi', False, True),
+            ('POST /bmi/batch', True, True),
+            ('GET /records', True, True),
+            ('GET /statistics', True, True),
+            ('POST /records', True, True)
+        )
+        for scenario, keep_alive, batching in scenarios:
+            port = free_port()
+            process = start_service(tmp, port, batching)
+            try:
+                rate, p50, p99, errors = run(port, scenario, args.clients, args.seconds, keep_alive)
+            finally:
+                stop_service(process)
+            label = scenario + ('' if keep_alive else ', new connection') + ('' if batching else ', unbatched')
+            rows = f" ({rate * BATCH_ROWS:,.0f} rows/s)" if scenario == 'POST /bmi/batch' else ''
+            print(f"{label:<34} {rate:8,.0f} {p50:8.2f} {p99:8.2f} {errors:7}{rows}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
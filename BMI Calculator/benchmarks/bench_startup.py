@@ -0,0 +1,77 @@
+"""
+Benchmark GUI startup import time with python -X importtime.
+
+lazy:   import bmi_calculator_pro_clean as it is, plotting loaded on first use
+eager:  the same plus the plotting stack it used to import at the top
+
+Each is run in a fresh interpreter several times and the best run is
+reported, with the slowest modules of that run.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_startup.py [--runs N] [--top N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUI_MODULE = 'bmi_calculator_pro_clean'
+# Imported at the top of the GUI before plotting was made lazy
+PLOTTING = ('matplotlib.pyplot', 'matplotlib.patches', 'matplotlib.backends.backend_tkagg',
+            'matplotlib.figure', 'numpy', 'seaborn')
+
+
+def import_times(modules) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """Import modules in a fresh interpreter.
+
+    Returns the total import time in microseconds and, for every module
+    imported, its (self, cumulative) time. Modules the interpreter imports
+    at startup are left out.
+    """
+    command = [sys.executable, '-X', 'importtime', '-c']
+    startup = set(_parse(subprocess.run(command + ['pass'], cwd=ROOT, capture_output=True,
+                                        text=True, check=True).stderr))
+    result = subprocess.run(command + [f"import {', '.join(modules)}"], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    entries = {name: entry for name, entry in _parse(result.stderr).items() if name not in startup}
+    total = sum(cumulative_us for _, cumulative_us, depth in entries.values() if depth == 0)
+    return total, {name: (self_us, cumulative_us) for name, (self_us, cumulative_us, _) in entries.items()}
+
+
+def _parse(stderr: str) -> Dict[str, Tuple[int, int, int]]:
+    """Parse -X importtime output to module -> (self us, cumulative us, nesting depth)."""
+    entries = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Names are indented two spaces per level of nesting
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return entries
+
+
+def best_of(modules, runs: int) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """The run of import_times with the lowest total."""
+    return min((import_times(modules) for _ in range(runs)), key=lambda run: run[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8)
+    args = parser.parse_args()
+
+    for label, modules in (('lazy', (GUI_MODULE,)), ('eager', (GUI_MODULE,) + PLOTTING)):
+        total, times = best_of(modules, args.runs)
+        plotting = sorted(module for module in times if module.split('.')[0] in ('matplotlib', 'numpy', 'seaborn'))
+        print(f"{label}: {total / 1000:.0f} ms, {len(times)} modules, {len(plotting)} from the plotting stack")
+        for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: -item[1][0])[:args.top]:
+            print(f"    {self_us / 1000:7.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+
+if __name__ == '__main__':
+    main()
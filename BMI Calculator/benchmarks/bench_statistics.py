@@ -0,0 +1,69 @@
+"""
+Benchmark get_statistics() over NumPy columns against the pure Python path.
+
+The Python path (_python_statistics over record dicts) is timed on a
+sample, where both results are also compared. The columnar path is then
+timed on the full set, built straight from a record generator so the
+record dicts never have to be held in memory at once.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_statistics.py [--records N] [--sample N]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_columns import RecordColumns
+from bmi_engine import _python_statistics
+from synthetic import iter_records, make_records
+
+
+def timed(operation, repeat: int = 1):
+    """Return the result and the best time in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = operation()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def same(expected, actual) -> bool:
+    """Compare statistics, allowing for floating point rounding."""
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(same(expected[k], actual[k]) for k in expected)
+    if isinstance(expected, float) or isinstance(actual, float):
+        return math.isclose(expected, actual, rel_tol=1e-9)
+    return expected == actual
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--sample', type=int, default=100000)
+    args = parser.parse_args()
+
+    sample = make_records(args.sample)
+    expected, python_time = timed(lambda: _python_statistics(sample))
+    actual, sample_time = timed(lambda: RecordColumns(sample).statistics())
+    print(f"{args.sample:,} records")
+    print(f"{'python':<24} {python_time * 1000:10.1f} ms")
+    print(f"{'columns (incl. build)':<24} {sample_time * 1000:10.1f} ms")
+    print(f"results match: {same(expected, actual)}")
+    del sample
+
+    columns, build_time = timed(lambda: RecordColumns(iter_records(args.records)))
+    _, stats_time = timed(columns.statistics, repeat=5)
+
+    print(f"\n{args.records:,} records")
+    print(f"{'generate + build':<24} {build_time * 1000:10.1f} ms")
+    print(f"{'statistics':<24} {stats_time * 1000:10.1f} ms")
+    print(f"python path, estimated:  {python_time * args.records / args.sample * 1000:10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark record saves and user lookups on the JSON and SQLite backends.
+
+Both stores are filled with RECORDS records, then single saves (through
+BMICalculatorPro.save_record) and user lookups are timed at that size. The
+JSON backend rewrites the whole file on each save, so only a sample of
+saves is timed there and the full count is extrapolated.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_storage.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+from synthetic import make_records
+
+
+RECORDS = 100000
+USERS = 1000
+LOOKUPS = 200
+JSON_SAVE_SAMPLE = 20
+
+
+def timed(count: int, operation) -> float:
+    """Return seconds per call of operation(i) over count calls."""
+    start = time.perf_counter()
+    for i in range(count):
+        operation(i)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    records = make_records(RECORDS, USERS)
+    print(f"{RECORDS:,} records, {USERS:,} users\n")
+    print(f"{'backend':<8} {'saves/s':>10} {f'{RECORDS:,} saves':>14} {'lookup':>10}")
+
+    for backend in ('json', 'sqlite'):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = BMICalculatorPro(storage=backend, data_dir=tmp)
+            engine.storage.append_many(records)
+
+            save_count = JSON_SAVE_SAMPLE if backend == 'json' else RECORDS
+            per_save = timed(save_count, lambda i: engine.save_record(f"User {i % USERS}", 30, 'Male', 70, 1.75))
+            per_lookup = timed(LOOKUPS, lambda i: engine.get_user_records(f"user {i % USERS}"))
+            assert len(engine.get_user_records('User 1')) >= RECORDS // USERS
+
+            print(f"{backend:<8} {1 / per_save:10,.1f} {per_save * RECORDS:13,.1f}s "
+                  f"{per_lookup * 1000:8.2f}ms")
+            engine.storage.close()
+
+
+if __name__ == '__main__':
+    main()
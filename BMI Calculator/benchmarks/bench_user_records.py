@@ -0,0 +1,90 @@
+"""
+Benchmark per-user lookups and reports against a linear scan.
+
+Fills a storage backend with users x records-per-user records, then times
+get_user_records() and generate_report(user) for random users. The
+baseline is the previous lookup: a scan comparing name.lower() against
+every record, here over records already in memory.
+
+Run from the BMI Calculator directory:
+    python benchmarks/bench_user_records.py [--backend sqlite] [--users 10000] [--per-user 100]
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+from synthetic import iter_records
+
+
+LOOKUPS = 200
+SCANS = 5
+CHUNK = 50000
+
+
+def per_call(names, operation) -> float:
+    start = time.perf_counter()
+    for name in names:
+        operation(name)
+    return (time.perf_counter() - start) / len(names)
+
+
+def fill(backend: str, data_dir: str, count: int, users: int):
+    records = iter_records(count, users=users)
+    if backend == 'json':
+        # JSONStorage rewrites the file per append, so write it in one go
+        with open(os.path.join(data_dir, 'bmi_records.json'), 'w', encoding='utf-8') as f:
+            json.dump(list(records), f)
+        return
+    engine = BMICalculatorPro(storage=backend, data_dir=data_dir)
+    while True:
+        chunk = list(itertools.islice(records, CHUNK))
+        if not chunk:
+            break
+        engine.storage.append_many(chunk)
+    engine.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backend', default='sqlite', choices=('json', 'sqlite', 'journal'))
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--per-user', type=int, default=100)
+    args = parser.parse_args()
+    count = args.users * args.per_user
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        fill(args.backend, tmp, count, args.users)
+        print(f"{count:,} records ({args.users:,} users x {args.per_user}), {args.backend} backend, "
+              f"filled in {time.perf_counter() - start:.1f} s\n")
+
+        engine = BMICalculatorPro(storage=args.backend, data_dir=tmp)
+        rng = random.Random(1)
+        names = [f"user {rng.randrange(args.users)}" for _ in range(LOOKUPS)]
+
+        start = time.perf_counter()
+        engine.get_user_records(names[0])
+        print(f"{'first lookup':<24} {(time.perf_counter() - start) * 1000:10.3f} ms (builds any in-memory index)")
+        lookup = per_call(names, engine.get_user_records)
+        report = per_call(names, engine.generate_report)
+        assert len(engine.get_user_records(names[0])) == args.per_user
+
+        records = engine.storage.load_all()
+        scan = per_call(names[:SCANS], lambda name: [r for r in records if r.get('name', '').lower() == name.lower()])
+        engine.close()
+
+        print(f"{'get_user_records':<24} {lookup * 1000:10.3f} ms")
+        print(f"{'generate_report(user)':<24} {report * 1000:10.3f} ms")
+        print(f"{'linear scan (before)':<24} {scan * 1000:10.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
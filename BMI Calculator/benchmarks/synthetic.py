@@ -0,0 +1,52 @@
+"""
+Synthetic BMI records for the benchmarks.
+"""
+import datetime
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_engine import BMICalculatorPro
+
+
+GENDERS = ('Male', 'Female', 'Other')
+
+
+def make_records(count: int, users: int = 1000, days: int = 365, seed: int = 42) -> list:
+    """Build count records spread over users and the last days days."""
+    return list(iter_records(count, users, days, seed))
+
+
+def iter_records(count: int, users: int = 1000, days: int = 365, seed: int = 42):
+    """Yield the records of make_records one at a time."""
+    rng = random.Random(seed)
+    bounds = BMICalculatorPro.BMI_CATEGORIES
+    info = BMICalculatorPro.CATEGORY_INFO
+    start = datetime.datetime.now() - datetime.timedelta(days=days)
+    step = days * 86400 / max(count, 1)
+    for i in range(count):
+        weight = round(rng.uniform(45, 130), 1)
+        height = round(rng.uniform(1.5, 2.0), 2)
+        bmi = round(weight / height ** 2, 2)
+        category = next(c for c, (lower, upper) in bounds.items() if lower <= bmi < upper)
+        timestamp = start + datetime.timedelta(seconds=i * step)
+        yield {
+            'id': f"{timestamp.strftime('%Y%m%d_%H%M%S_%f')}_{i:08d}",
+            'name': f"User {i % users}",
+            'age': rng.randint(18, 90),
+            'gender': GENDERS[i % 3],
+            'weight_kg': weight,
+            'height_m': height,
+            'weight_input': weight,
+            'height_input': height,
+            'weight_unit': 'kg',
+            'height_unit': 'm',
+            'bmi': bmi,
+            'category': category,
+            'category_name': info[category]['name'],
+            'risk_level': info[category]['risk'],
+            'timestamp': timestamp.isoformat(),
+            'date': timestamp.date().isoformat()
+        }
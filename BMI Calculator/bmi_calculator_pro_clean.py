@@ -7,20 +7,22 @@ data visualization, health analytics, and detailed reporting.
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import numpy as np
-import seaborn as sns
 from datetime import datetime, timedelta
 from bmi_engine import BMICalculatorPro
+from bmi_worker import BackgroundWorker
 
 
 class BMICalculatorProGUI:
-    def __init__(self, root):
+    # Records shown per page of the records tab
+    PAGE_SIZE = 100
+    # Milliseconds to wait after the last keystroke before searching
+    SEARCH_DELAY = 300
+    
+    def __init__(self, root, engine: BMICalculatorPro = None):
         self.root = root
-        self.bmi_engine = BMICalculatorPro()
+        self.bmi_engine = engine or BMICalculatorPro()
+        # Engine calls that can take a while run here, off the UI thread
+        self.worker = BackgroundWorker(root)
         
         self.setup_window()
         self.setup_styles()
@@ -175,7 +177,7 @@ class BMICalculatorProGUI:
                 font=('Arial', 10)).grid(row=2, column=0, sticky='w', pady=5)
         self.gender_var = tk.StringVar(value='Select')
         gender_combo = ttk.Combobox(personal_frame, textvariable=self.gender_var,
-                                   values=['Male', 'Female', 'Other'], 
+                                   values=list(self.bmi_engine.GENDERS), 
                                    state='readonly', width=22)
         gender_combo.grid(row=2, column=1, sticky='ew', padx=(10, 0), pady=5)
         
@@ -320,6 +322,14 @@ class BMICalculatorProGUI:
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=20)
         search_entry.pack(side='left', padx=(5, 10))
+        self.search_var.trace_add('write', lambda *args: self._schedule_search())
+        self._search_pending = None
+        
+        # Paging state: only the current page is materialized in the treeview
+        self.records_page = 0
+        self.records_total = 0
+        # Treeview row ID -> record ID; Tk assigns row IDs, as legacy records may share an ID
+        self._row_records = {}
         
         # Action buttons
         button_frame = ttk.Frame(controls_frame)
@@ -327,6 +337,8 @@ class BMICalculatorProGUI:
         
         ttk.Button(button_frame, text="🔄 Refresh", 
                   command=self.refresh_records).pack(side='left', padx=(0, 5))
+        ttk.Button(button_frame, text="🗑️ Delete", 
+                  command=self.delete_selected_records).pack(side='left', padx=(0, 5))
         ttk.Button(button_frame, text="📊 Export CSV", 
                   command=self.export_csv).pack(side='left')
         
@@ -348,6 +360,19 @@ class BMICalculatorProGUI:
         self.records_tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        # Pager
+        pager_frame = ttk.Frame(container)
+        pager_frame.pack(fill='x', pady=(10, 0))
+        
+        self.prev_button = ttk.Button(pager_frame, text="◀ Prev", 
+                                      command=lambda: self.show_records_page(self.records_page - 1))
+        self.prev_button.pack(side='left')
+        self.page_label = ttk.Label(pager_frame, text="")
+        self.page_label.pack(side='left', padx=10)
+        self.next_button = ttk.Button(pager_frame, text="Next ▶", 
+                                      command=lambda: self.show_records_page(self.records_page + 1))
+        self.next_button.pack(side='left')
+        
         # Load initial records (defer to avoid status bar issue)
         self.root.after(100, self.refresh_records)
     
@@ -367,23 +392,30 @@ class BMICalculatorProGUI:
         ttk.Label(controls_frame, text="Chart Type:").pack(side='left')
         self.chart_type_var = tk.StringVar(value='BMI Distribution')
         chart_combo = ttk.Combobox(controls_frame, textvariable=self.chart_type_var,
-                                 values=['BMI Distribution', 'Category Analysis'],
+                                 values=['BMI Distribution', 'Category Analysis', 'BMI Trend'],
                                  state='readonly', width=20)
         chart_combo.pack(side='left', padx=(5, 20))
+        chart_combo.bind('<<ComboboxSelected>>', lambda event: self.generate_chart())
         
         ttk.Button(controls_frame, text="📊 Generate Chart", 
                   command=self.generate_chart).pack(side='left')
         
         # Chart area
-        chart_frame = ttk.LabelFrame(container, text="Data Visualization")
-        chart_frame.pack(fill='both', expand=True)
-        
-        self.fig = Figure(figsize=(10, 6), dpi=100)
-        self.canvas = FigureCanvasTkAgg(self.fig, chart_frame)
-        self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
-        
-        # Generate initial chart (defer to avoid status bar issue)
-        self.root.after(200, self.generate_chart)
+        self.chart_frame = ttk.LabelFrame(container, text="Data Visualization")
+        self.chart_frame.pack(fill='both', expand=True)
+        
+        # One figure and canvas per chart type, created on first use; the
+        # shown one is self.fig and self.canvas
+        self.fig = None
+        self.canvas = None
+        self._chart_canvases = {}
+        # Chart type -> data signature its canvas was drawn for
+        self._chart_signatures = {}
+        
+        # Draw the first chart when the tab is first shown, so matplotlib
+        # is only loaded if analytics are used
+        self.analytics_frame = analytics_frame
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed, add='+')
     
     def create_reports_tab(self):
         """Create the reports tab."""
@@ -515,6 +547,10 @@ class BMICalculatorProGUI:
             # Display results
             self.display_results(bmi, analysis)
             
+            # The new record is the newest; reload the first page to show it
+            if success and self.records_page == 0:
+                self.refresh_records()
+            
             # Show success message
             if success:
                 self.update_status(f"BMI calculated and saved: {bmi:.1f} ({analysis['category_name']})")
@@ -631,98 +667,244 @@ class BMICalculatorProGUI:
     
     # Records Management
     def refresh_records(self):
-        """Refresh the records display."""
-        # Clear existing items
-        for item in self.records_tree.get_children():
-            self.records_tree.delete(item)
-        
-        # Load records
-        records = self.bmi_engine.load_records()
-        
-        # Sort by timestamp (newest first)
-        records.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        # Insert records
-        for record in records:
-            date = record['timestamp'][:10]
-            name = record.get('name', 'Unknown')
-            age = record.get('age', 'N/A')
-            gender = record.get('gender', 'N/A')
-            weight = f"{record.get('weight_input', record.get('weight_kg', 0)):.1f} {record.get('weight_unit', 'kg')}"
-            height = f"{record.get('height_input', record.get('height_m', 0)):.1f} {record.get('height_unit', 'm')}"
-            bmi = f"{record['bmi']:.1f}"
-            category = record.get('category_name', 'Unknown')
-            
-            self.records_tree.insert('', 'end', values=(
-                date, name, age, gender, weight, height, bmi, category
-            ))
+        """Refresh the current page of the records display.
+        
+        Only one page of records is fetched, sorted and filtered by the
+        engine's indexes, in the background. Clicking again while a page
+        is loading supersedes the earlier request.
+        """
+        self.update_status("Loading records...")
+        page = self.records_page
+        self.worker.submit(
+            'records', self.bmi_engine.get_records_page,
+            page * self.PAGE_SIZE, self.PAGE_SIZE, self.search_var.get(),
+            on_done=lambda result: self._show_records(page, *result),
+            on_error=lambda e: self.update_status(f"Failed to load records: {e}"))
+    
+    def show_records_page(self, page):
+        """Show another page of records."""
+        self.records_page = max(page, 0)
+        self.refresh_records()
+    
+    def _schedule_search(self):
+        """Search once typing pauses, starting from the first page."""
+        if self._search_pending is not None:
+            self.root.after_cancel(self._search_pending)
+        self._search_pending = self.root.after(self.SEARCH_DELAY, self._run_search)
+    
+    def _run_search(self):
+        self._search_pending = None
+        self.show_records_page(0)
+    
+    @staticmethod
+    def _record_row(record):
+        """Treeview values for a record."""
+        date = record['timestamp'][:10]
+        name = record.get('name', 'Unknown')
+        age = record.get('age', 'N/A')
+        gender = record.get('gender', 'N/A')
+        weight = f"{record.get('weight_input', record.get('weight_kg', 0)):.1f} {record.get('weight_unit', 'kg')}"
+        height = f"{record.get('height_input', record.get('height_m', 0)):.1f} {record.get('height_unit', 'm')}"
+        bmi = f"{record['bmi']:.1f}"
+        category = record.get('category_name', 'Unknown')
+        return (date, name, age, gender, weight, height, bmi, category)
+    
+    def _show_records(self, page, total, records):
+        """Replace the treeview contents with one page of records."""
+        if not records and page > 0 and total:
+            # The page emptied, e.g. after deletions; show the last one instead
+            self.show_records_page((total - 1) // self.PAGE_SIZE)
+            return
+        
+        self.records_tree.delete(*self.records_tree.get_children())
+        self._row_records = {self.records_tree.insert('', 'end', values=self._record_row(record)): record['id']
+                             for record in records}
+        
+        self.records_total = total
+        self._update_pager()
+        self.update_status(f"Loaded {len(records)} of {total} records")
+    
+    def _update_pager(self):
+        pages = max((self.records_total + self.PAGE_SIZE - 1) // self.PAGE_SIZE, 1)
+        self.page_label.config(text=f"Page {self.records_page + 1} of {pages} ({self.records_total} records)")
+        self.prev_button.state(['!disabled'] if self.records_page > 0 else ['disabled'])
+        self.next_button.state(['!disabled'] if self.records_page + 1 < pages else ['disabled'])
+    
+    def delete_selected_records(self):
+        """Delete the selected records and remove their rows."""
+        rows = self.records_tree.selection()
+        if not rows:
+            messagebox.showinfo("No Selection", "Please select records to delete.")
+            return
+        if not messagebox.askyesno("Delete Records", f"Delete {len(rows)} selected record(s)?"):
+            return
+        record_ids = list(dict.fromkeys(self._row_records[row] for row in rows))
         
-        self.update_status(f"Loaded {len(records)} records")
+        self.update_status("Deleting records...")
+        self.worker.submit(
+            'delete', lambda: [i for i in record_ids if self.bmi_engine.delete_record(i)],
+            on_done=self._remove_record_rows,
+            on_error=lambda e: messagebox.showerror("Delete Error", f"Failed to delete records: {str(e)}"))
+    
+    def _remove_record_rows(self, record_ids):
+        """Remove deleted records from the current page without reloading it."""
+        deleted = set(record_ids)
+        rows = [row for row, record_id in self._row_records.items() if record_id in deleted]
+        for row in rows:
+            self.records_tree.delete(row)
+            del self._row_records[row]
+        self.records_total = max(self.records_total - len(rows), 0)
+        self._update_pager()
+        self.update_status(f"Deleted {len(rows)} record(s)")
     
     def export_csv(self):
-        """Export records to CSV file."""
-        records = self.bmi_engine.load_records()
-        if not records:
+        """Export all records to a CSV file in the background.
+        
+        The record count is checked and the file written by the worker;
+        records are streamed from the storage, so memory use does not grow
+        with the number of records.
+        """
+        self.update_status("Preparing export...")
+        self.worker.submit('export', lambda: self.bmi_engine.get_records_page(0, 1)[0],
+                           on_done=self._ask_export_file,
+                           on_error=self._export_failed)
+    
+    def _ask_export_file(self, total):
+        """Ask where to export total records and start writing them."""
+        if not total:
             messagebox.showinfo("No Data", "No records available to export.")
+            self.update_status("No records to export")
             return
         
         filename = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            filetypes=[("CSV files", "*.csv"), ("Compressed CSV files", "*.csv.gz"), ("All files", "*.*")],
             title="Export Records"
         )
+        if not filename:
+            self.update_status("Export cancelled")
+            return
         
-        if filename:
-            try:
-                csv_data = self.bmi_engine.export_data('csv', records)
-                with open(filename, 'w', newline='', encoding='utf-8') as f:
-                    f.write(csv_data)
-                
-                messagebox.showinfo("Export Complete", f"Records exported to {filename}")
-                self.update_status(f"Exported {len(records)} records to CSV")
-            except Exception as e:
-                messagebox.showerror("Export Error", f"Failed to export records: {str(e)}")
+        self.update_status(f"Exporting {total} records...")
+        # Written record by record; .gz names are compressed
+        self.worker.submit('export', self.bmi_engine.export_to_file, filename, 'csv',
+                           on_done=lambda _: self._export_done(filename, total),
+                           on_error=self._export_failed)
+    
+    def _export_done(self, filename, total):
+        messagebox.showinfo("Export Complete", f"Records exported to {filename}")
+        self.update_status(f"Exported {total} records to CSV")
+    
+    def _export_failed(self, error):
+        self.update_status("Export failed")
+        messagebox.showerror("Export Error", f"Failed to export records: {str(error)}")
     
     # Analytics Functions
     def generate_chart(self):
-        """Generate selected chart type."""
+        """Generate selected chart type.
+        
+        Each chart type keeps its rendered canvas along with the data
+        signature it was drawn for, so showing an unchanged chart again just
+        swaps its canvas in. Otherwise the binned chart data is computed in
+        the background and only drawing runs on the UI thread.
+        """
         chart_type = self.chart_type_var.get()
+        signature = self.bmi_engine.data_signature()
+        if self._chart_signatures.get(chart_type) == signature:
+            self._show_chart(chart_type)
+            self.update_status(f"Showing {chart_type} chart")
+            return
+        
+        self.update_status(f"Generating {chart_type} chart...")
+        self.worker.submit('chart', self._chart_data, chart_type,
+                           on_done=lambda data: self._draw_chart(chart_type, signature, data),
+                           on_error=self._chart_failed)
+    
+    def _chart_data(self, chart_type):
+        """Summarize the records for a chart; runs in the worker.
+        
+        Everything comes from the engine's running statistics and trend
+        rollups, so no records are loaded.
+        """
+        if chart_type == 'BMI Distribution':
+            return self.bmi_engine.get_bmi_histogram() or None
+        
+        if chart_type == 'BMI Trend':
+            granularity, rows = self.bmi_engine.get_bmi_trend()
+            if not rows:
+                return None
+            return {'count': sum(row['count'] for row in rows), 'granularity': granularity, 'rows': rows}
+        
+        stats = self.bmi_engine.get_statistics()
+        if not stats:
+            return None
+        return {'count': stats['total_records'], 'categories': stats['category_distribution']}
+    
+    def _on_tab_changed(self, event):
+        if self.canvas is None and self.notebook.select() == str(self.analytics_frame):
+            self.generate_chart()
+    
+    def _show_chart(self, chart_type):
+        """Make chart_type's canvas the visible one, creating it on first use."""
+        if chart_type not in self._chart_canvases:
+            # Imported here rather than at startup; the plotting stack takes
+            # longer to load than the rest of the application
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(10, 6), dpi=100)
+            self._chart_canvases[chart_type] = (fig, FigureCanvasTkAgg(fig, self.chart_frame))
+        fig, canvas = self._chart_canvases[chart_type]
+        if canvas is not self.canvas:
+            if self.canvas is not None:
+                self.canvas.get_tk_widget().pack_forget()
+            canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
+            self.fig, self.canvas = fig, canvas
+    
+    def _draw_chart(self, chart_type, signature, data):
+        """Draw a chart from _chart_data's result on its own canvas."""
+        self._show_chart(chart_type)
+        self._chart_signatures.pop(chart_type, None)
         
         # Clear previous chart
         self.fig.clear()
         
-        # Load records
-        records = self.bmi_engine.load_records()
-        
-        if not records:
+        if not data:
             ax = self.fig.add_subplot(111)
             ax.text(0.5, 0.5, 'No data available',
                    ha='center', va='center', transform=ax.transAxes,
                    fontsize=14, color='gray')
             ax.set_title('No Data Available')
             self.canvas.draw()
+            self._chart_signatures[chart_type] = signature
             return
         
         try:
             if chart_type == 'BMI Distribution':
-                self.create_bmi_distribution_chart(records)
+                self.create_bmi_distribution_chart(data)
             elif chart_type == 'Category Analysis':
-                self.create_category_analysis_chart(records)
+                self.create_category_analysis_chart(data)
+            elif chart_type == 'BMI Trend':
+                self.create_bmi_trend_chart(data)
             
             self.fig.tight_layout()
             self.canvas.draw()
-            self.update_status(f"Generated {chart_type} chart with {len(records)} records")
+            self._chart_signatures[chart_type] = signature
+            self.update_status(f"Generated {chart_type} chart with {data['count']} records")
             
         except Exception as e:
-            messagebox.showerror("Chart Error", f"Failed to generate chart: {str(e)}")
-            self.update_status("Chart generation failed")
+            self._chart_failed(e)
+    
+    def _chart_failed(self, error):
+        messagebox.showerror("Chart Error", f"Failed to generate chart: {str(error)}")
+        self.update_status("Chart generation failed")
     
-    def create_bmi_distribution_chart(self, records):
-        """Create BMI distribution histogram."""
-        bmis = [r['bmi'] for r in records]
+    def create_bmi_distribution_chart(self, data):
+        """Create BMI distribution histogram from precomputed bin counts."""
+        bins = data['edges']
         
         ax = self.fig.add_subplot(111)
-        n, bins, patches = ax.hist(bmis, bins=15, edgecolor='black', alpha=0.7)
+        n, bins, patches = ax.hist(bins[:-1], bins=bins, weights=data['counts'],
+                                   edgecolor='black', alpha=0.7)
         
         # Color bars by BMI category
         for i, (patch, bin_center) in enumerate(zip(patches, (bins[:-1] + bins[1:]) / 2)):
@@ -741,17 +923,14 @@ class BMICalculatorProGUI:
         ax.grid(True, alpha=0.3)
         
         # Add statistics
-        mean_bmi = np.mean(bmis)
+        mean_bmi = data['mean']
         ax.axvline(mean_bmi, color='red', linestyle='--', alpha=0.8, 
                   label=f'Mean: {mean_bmi:.1f}')
         ax.legend()
     
-    def create_category_analysis_chart(self, records):
+    def create_category_analysis_chart(self, data):
         """Create BMI category distribution pie chart."""
-        categories = {}
-        for record in records:
-            cat = record.get('category_name', 'Unknown')
-            categories[cat] = categories.get(cat, 0) + 1
+        categories = data['categories']
         
         if not categories:
             return
@@ -770,22 +949,43 @@ class BMICalculatorProGUI:
         
         ax.set_title('BMI Category Distribution', fontsize=14, fontweight='bold')
     
+    def create_bmi_trend_chart(self, data):
+        """Create mean BMI over time, one point per day, week or month."""
+        rows = data['rows']
+        # Month periods are YYYY-MM; plot them at the first of the month
+        dates = [datetime.fromisoformat(row['period'] if len(row['period']) == 10 else row['period'] + '-01')
+                 for row in rows]
+        means = [row['mean_bmi'] for row in rows]
+        
+        ax = self.fig.add_subplot(111)
+        ax.axhspan(18.5, 25, color='#2ecc71', alpha=0.15, label='Normal range')
+        ax.plot(dates, means, color='#3498db', linewidth=1.5, marker='o' if len(rows) <= 60 else None,
+                label=f"Mean BMI per {data['granularity']}")
+        
+        ax.set_xlabel('Date', fontsize=12)
+        ax.set_ylabel('Mean BMI', fontsize=12)
+        ax.set_title('BMI Trend', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+        self.fig.autofmt_xdate()
+    
     # Reports Functions
     def generate_report(self):
-        """Generate comprehensive report."""
-        try:
-            report_content = self.bmi_engine.generate_report()
-            
-            # Display report
-            self.report_text.configure(state='normal')
-            self.report_text.delete('1.0', tk.END)
-            self.report_text.insert('1.0', report_content)
-            self.report_text.configure(state='disabled')
-            
-            self.update_status("Generated comprehensive report")
-            
-        except Exception as e:
-            messagebox.showerror("Report Error", f"Failed to generate report: {str(e)}")
+        """Generate comprehensive report in the background."""
+        self.update_status("Generating report...")
+        self.worker.submit('report', self.bmi_engine.generate_report,
+                           on_done=self._show_report,
+                           on_error=lambda e: messagebox.showerror(
+                               "Report Error", f"Failed to generate report: {str(e)}"))
+    
+    def _show_report(self, report_content):
+        """Display a generated report."""
+        self.report_text.configure(state='normal')
+        self.report_text.delete('1.0', tk.END)
+        self.report_text.insert('1.0', report_content)
+        self.report_text.configure(state='disabled')
+        
+        self.update_status("Generated comprehensive report")
     
     def save_report(self):
         """Save the current report."""
@@ -821,6 +1021,9 @@ def main():
         print("\nApplication closed by user.")
     except Exception as e:
         print(f"Unexpected error: {e}")
+    finally:
+        app.worker.close()
+        app.bmi_engine.close()
 
 
 if __name__ == "__main__":
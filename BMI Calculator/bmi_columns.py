@@ -0,0 +1,144 @@
+"""
+BMI Calculator Pro - Columnar Records
+NumPy column arrays of BMI records for vectorized statistics.
+"""
+
+import datetime
+from typing import Dict, Iterable, List
+
+try:
+    import numpy as np
+except ImportError:  # Statistics fall back to the pure Python implementation
+    np = None
+
+
+RECENT_DAYS = 30
+
+
+class _Codes:
+    """Maps category values to small integer codes in order of first appearance."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def counts(self, codes) -> Dict[str, int]:
+        """Count codes, keyed by value in order of first appearance."""
+        counts = np.bincount(codes, minlength=len(self.values)) if len(codes) else []
+        return {value: int(count) for value, count in zip(self.values, counts) if count}
+
+
+def _timestamps_to_us(timestamps: List[str]):
+    """Parse ISO timestamps to int64 microseconds."""
+    try:
+        return np.array(timestamps, dtype='datetime64[us]').astype(np.int64)
+    except ValueError:
+        # Offsets or unusual formats; parse one by one
+        epoch = datetime.datetime(1970, 1, 1)
+        return np.array([
+            (datetime.datetime.fromisoformat(t).replace(tzinfo=None) - epoch) // datetime.timedelta(microseconds=1)
+            for t in timestamps
+        ], dtype=np.int64)
+
+
+def _number(value):
+    """Convert a NumPy scalar to int when integral, else float."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class RecordColumns:
+    """Record fields used by statistics, stored as NumPy arrays.
+
+    Category, gender and name are stored as integer codes. The columns are
+    a snapshot of the records they were built from; build new columns for
+    a changed record set (compute_statistics does so on every call).
+    """
+
+    FIELDS = ('bmi', 'weight', 'age', 'timestamp', 'category', 'gender', 'name')
+
+    def __init__(self, records: Iterable[Dict] = ()):
+        if np is None:
+            raise ImportError("NumPy is required for columnar statistics")
+        self.categories = _Codes()
+        self.genders = _Codes()
+        self.names = _Codes()
+        self.names.code('')  # Code 0: no name, not counted as a user
+
+        rows = {field: [] for field in self.FIELDS}
+        for r in records:
+            rows['bmi'].append(r['bmi'])
+            rows['weight'].append(r['weight_kg'])
+            age = r.get('age')
+            rows['age'].append(np.nan if age is None else age)
+            rows['timestamp'].append(r['timestamp'])
+            rows['category'].append(self.categories.code(r.get('category_name', 'Unknown')))
+            rows['gender'].append(self.genders.code(r.get('gender', 'Unknown')))
+            rows['name'].append(self.names.code(r.get('name') or ''))
+        self._size = len(rows['bmi'])
+
+        self._bmi = np.array(rows['bmi'], dtype=np.float64)
+        self._weight = np.array(rows['weight'], dtype=np.float64)
+        self._age = np.array(rows['age'], dtype=np.float64)
+        self._timestamp = _timestamps_to_us(rows['timestamp']) if self._size else np.empty(0, dtype=np.int64)
+        self._category = np.array(rows['category'], dtype=np.int32)
+        self._gender = np.array(rows['gender'], dtype=np.int32)
+        self._name = np.array(rows['name'], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, field: str):
+        """Return one column ('bmi', 'weight', 'age', 'timestamp', 'category', 'gender', 'name')."""
+        return getattr(self, '_' + field)
+
+    def statistics(self, now: datetime.datetime = None) -> Dict:
+        """Calculate statistics in the format of BMICalculatorPro.get_statistics."""
+        n = self._size
+        if not n:
+            return {}
+        bmis = self.column('bmi')
+        ages = self.column('age')
+        ages = ages[~np.isnan(ages)]
+        timestamps = self.column('timestamp')
+
+        now = now or datetime.datetime.now()
+        cutoff = np.datetime64(now - datetime.timedelta(days=RECENT_DAYS), 'us').astype(np.int64)
+        first, last = timestamps.min(), timestamps.max()
+
+        age_stats = {}
+        if len(ages):
+            age_stats = {
+                'mean': float(ages.mean()),
+                'median': _number(np.median(ages)),
+                'min': _number(ages.min()),
+                'max': _number(ages.max())
+            }
+
+        return {
+            'total_records': n,
+            'unique_users': int(np.count_nonzero(np.bincount(self.column('name'))[1:])),
+            'bmi_statistics': {
+                'count': n,
+                'mean': float(bmis.mean()),
+                'median': float(np.median(bmis)),
+                'min': float(bmis.min()),
+                'max': float(bmis.max()),
+                'stdev': float(bmis.std(ddof=1)) if n > 1 else 0
+            },
+            'category_distribution': self.categories.counts(self.column('category')),
+            'gender_distribution': self.genders.counts(self.column('gender')),
+            'age_statistics': age_stats,
+            'recent_records_count': int(np.count_nonzero(timestamps > cutoff)),
+            'date_range': {
+                'first': str(np.datetime64(int(first), 'us'))[:10],
+                'last': str(np.datetime64(int(last), 'us'))[:10]
+            }
+        }
@@ -5,14 +5,171 @@ Unified BMI calculation, data management, and analysis engine.
 
 import json
 import os
+import bisect
 import datetime
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import statistics
+from bmi_storage import RecordStorage, create_storage, generate_record_id, name_key
+from bmi_rollups import GRANULARITIES
+from bmi_stats import RunningStatistics
+
+
+def _timestamp(record: Dict) -> str:
+    return record.get('timestamp', '')
+
+
+# Record lists at least this long are summarized on NumPy columns when NumPy is installed
+COLUMNAR_MIN_RECORDS = 1000
+
+
+def compute_statistics(records: List[Dict]) -> Dict:
+    """Calculate statistics over the given records, as returned by get_statistics.
+    
+    Long lists go through RecordColumns, which gives the same results up to
+    floating point rounding at a fraction of the cost. The columns are built
+    from the records on each call: callers pass arbitrary subsets (a user's
+    records, a filtered view), and the engine's own totals are kept by
+    RunningStatistics instead.
+    """
+    if len(records) >= COLUMNAR_MIN_RECORDS:
+        try:
+            from bmi_columns import RecordColumns
+            return RecordColumns(records).statistics()
+        except ImportError:
+            pass  # NumPy is not installed
+    return _python_statistics(records)
+
+
+def _python_statistics(records: List[Dict]) -> Dict:
+    """Calculate statistics over record dicts in pure Python."""
+    if not records:
+        return {}
+    
+    bmis = [r['bmi'] for r in records]
+    weights = [r['weight_kg'] for r in records]
+    ages = [r['age'] for r in records if 'age' in r]
+    
+    # BMI statistics
+    bmi_stats = {
+        'count': len(bmis),
+        'mean': statistics.mean(bmis),
+        'median': statistics.median(bmis),
+        'min': min(bmis),
+        'max': max(bmis),
+        'stdev': statistics.stdev(bmis) if len(bmis) > 1 else 0
+    }
+    
+    # Category distribution
+    categories = {}
+    for record in records:
+        cat = record.get('category_name', 'Unknown')
+        categories[cat] = categories.get(cat, 0) + 1
+    
+    # Gender distribution
+    genders = {}
+    for record in records:
+        gender = record.get('gender', 'Unknown')
+        genders[gender] = genders.get(gender, 0) + 1
+    
+    # Age statistics
+    age_stats = {}
+    if ages:
+        age_stats = {
+            'mean': statistics.mean(ages),
+            'median': statistics.median(ages),
+            'min': min(ages),
+            'max': max(ages)
+        }
+    
+    # Recent trends (last 30 days)
+    recent_date = datetime.datetime.now() - datetime.timedelta(days=30)
+    recent_records = [
+        r for r in records 
+        if datetime.datetime.fromisoformat(r['timestamp']) > recent_date
+    ]
+    
+    return {
+        'total_records': len(records),
+        'unique_users': len(set(r.get('name', '') for r in records if r.get('name'))),
+        'bmi_statistics': bmi_stats,
+        'category_distribution': categories,
+        'gender_distribution': genders,
+        'age_statistics': age_stats,
+        'recent_records_count': len(recent_records),
+        'date_range': {
+            'first': min(r['timestamp'] for r in records)[:10] if records else None,
+            'last': max(r['timestamp'] for r in records)[:10] if records else None
+        }
+    }
+
+
+def render_report(title: str, stats: Dict, latest: Dict, generated: Optional[str] = None) -> str:
+    """Render a report from statistics and the latest record.
+    
+    generated is the time stamp printed at the end; by default, now.
+    """
+    if generated is None:
+        generated = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    report = f"""
+{title}
+{'=' * len(title)}
+
+SUMMARY
+-------
+Total Records: {stats['total_records']}
+Date Range: {stats['date_range']['first']} to {stats['date_range']['last']}
+Unique Users: {stats['unique_users']}
+
+LATEST RECORD
+-------------
+Date: {latest['timestamp'][:10]}
+BMI: {latest['bmi']} ({latest['category_name']})
+Risk Level: {latest['risk_level']}
+
+BMI STATISTICS
+--------------
+Average: {stats['bmi_statistics']['mean']:.2f}
+Median: {stats['bmi_statistics']['median']:.2f}
+Range: {stats['bmi_statistics']['min']:.2f} - {stats['bmi_statistics']['max']:.2f}
+Standard Deviation: {stats['bmi_statistics']['stdev']:.2f}
+
+CATEGORY DISTRIBUTION
+--------------------
+"""
+    for category, count in stats['category_distribution'].items():
+        percentage = (count / stats['total_records']) * 100
+        report += f"{category}: {count} records ({percentage:.1f}%)\n"
+    
+    if stats['gender_distribution']:
+        report += "\nGENDER DISTRIBUTION\n-------------------\n"
+        for gender, count in stats['gender_distribution'].items():
+            percentage = (count / stats['total_records']) * 100
+            report += f"{gender}: {count} records ({percentage:.1f}%)\n"
+    
+    report += f"\nReport generated: {generated}"
+    
+    return report
 
 
 class BMICalculatorPro:
     """Professional BMI Calculator with comprehensive features."""
     
+    # Records written between yields of iter_export
+    EXPORT_CHUNK_SIZE = 1000
+    
+    # Minimum seconds between writes of the running statistics file; close()
+    # writes any remaining changes
+    STATS_SAVE_INTERVAL = 5.0
+    
+    # Most periods in a BMI trend; longer histories use weeks or months
+    TREND_MAX_POINTS = 400
+    
+    # Genders offered by the GUI and accepted by the HTTP service
+    GENDERS = ('Male', 'Female', 'Other')
+    
     # WHO BMI Categories
     BMI_CATEGORIES = {
         'severe_underweight': (0, 16),
@@ -24,6 +181,31 @@ class BMICalculatorPro:
         'obese_class_3': (40, float('inf'))
     }
     
+    # Category codes used by the batch API index into CATEGORY_KEYS; -1 is unknown.
+    # The ranges are contiguous, so a category is found by its lower bound.
+    CATEGORY_KEYS = tuple(BMI_CATEGORIES)
+    CATEGORY_LOWER_BOUNDS = tuple(lower for lower, _ in BMI_CATEGORIES.values())
+    
+    # Unit conversion factors by (from unit, to unit)
+    WEIGHT_CONVERSIONS = {
+        ('kg', 'kg'): 1.0,
+        ('lbs', 'kg'): 0.453592,
+        ('kg', 'lbs'): 2.20462,
+        ('lbs', 'lbs'): 1.0,
+        ('stone', 'kg'): 6.35029,
+        ('kg', 'stone'): 0.157473
+    }
+    
+    HEIGHT_CONVERSIONS = {
+        ('m', 'm'): 1.0,
+        ('cm', 'm'): 0.01,
+        ('ft', 'm'): 0.3048,
+        ('in', 'm'): 0.0254,
+        ('m', 'cm'): 100.0,
+        ('m', 'ft'): 3.28084,
+        ('m', 'in'): 39.3701
+    }
+    
     CATEGORY_INFO = {
         'severe_underweight': {
             'name': 'Severely Underweight',
@@ -76,43 +258,173 @@ class BMICalculatorPro:
         }
     }
     
-    def __init__(self):
-        """Initialize the BMI Calculator Pro."""
-        self.data_dir = os.path.join(os.path.dirname(__file__), 'data')
+    def __init__(self, storage: Optional[str] = None, data_dir: Optional[str] = None):
+        """Initialize the BMI Calculator Pro.
+        
+        storage names the backend ('json' or 'sqlite'); by default it is read
+        from the BMI_STORAGE environment variable, falling back to 'json'.
+        """
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), 'data')
         self.data_file = os.path.join(self.data_dir, 'bmi_records.json')
         self._ensure_data_directory()
+        self.storage: RecordStorage = create_storage(storage, self.data_dir)
+        
+        # Records are cached until the storage signature changes; data_version
+        # counts changes to the cached set and keys memoized results
+        self._cache_lock = threading.RLock()
+        self._records_cache: Optional[List[Dict]] = None
+        self._cache_signature = None
+        self._memo: Dict[str, Tuple[int, object]] = {}
+        self.data_version = 0
+        # name_key -> the user's cached records, oldest first; only used when
+        # the storage backend has no name index of its own
+        self._users: Optional[Dict[str, List[Dict]]] = None
+        # The cached records oldest first, for paging; only used when the
+        # storage backend has no time index of its own
+        self._timeline: Optional[List[Dict]] = None
+        # The timeline's timestamps, bisected in its place (bisect has no key= before 3.10)
+        self._timeline_keys: List[str] = []
+        
+        # Running statistics are kept up to date on save and delete and
+        # persisted next to the data, tagged with the storage fingerprint
+        self.stats_file = os.path.join(self.data_dir, 'bmi_stats.json')
+        self._stats: Optional[RunningStatistics] = None
+        self._stats_signature = None
+        self._stats_saved_at: Optional[float] = None
+        self._stats_unsaved = False
     
     def _ensure_data_directory(self):
         """Ensure data directory exists."""
         os.makedirs(self.data_dir, exist_ok=True)
-        
-        # Create empty records file if it doesn't exist
-        if not os.path.exists(self.data_file):
-            with open(self.data_file, 'w') as f:
-                json.dump([], f)
+    
+    def _cached_records(self) -> List[Dict]:
+        """Return the cached record list, reloading it if the storage changed."""
+        with self._cache_lock:
+            signature = self.storage.signature()
+            if self._records_cache is None or signature != self._cache_signature:
+                self._records_cache = self.storage.load_all()
+                self._cache_signature = signature
+                self._users = None
+                self._timeline = None
+                self.data_version += 1
+            return self._records_cache
+    
+    def _user_index(self) -> Dict[str, List[Dict]]:
+        """Return the cached records grouped by user, each group oldest first."""
+        with self._cache_lock:
+            records = self._cached_records()
+            if self._users is None:
+                self._users = {}
+                for record in records:
+                    self._index_user_record(record)
+            return self._users
+    
+    def _timeline_records(self) -> List[Dict]:
+        """Return the cached records sorted oldest first."""
+        with self._cache_lock:
+            records = self._cached_records()
+            if self._timeline is None:
+                self._timeline = sorted(records, key=_timestamp)
+                self._timeline_keys = [_timestamp(record) for record in self._timeline]
+            return self._timeline
+    
+    def _index_user_record(self, record: Dict):
+        user_records = self._users.setdefault(name_key(record.get('name')), [])
+        user_records.append(record)
+        if len(user_records) > 1 and record.get('timestamp', '') < user_records[-2].get('timestamp', ''):
+            user_records.sort(key=lambda r: r.get('timestamp', ''))
+    
+    def _running_statistics(self) -> RunningStatistics:
+        """Return the running statistics, loading or rebuilding them if the storage changed."""
+        with self._cache_lock:
+            signature = self.storage.signature()
+            if self._stats is None or signature != self._stats_signature:
+                self._stats = RunningStatistics.load(self.stats_file, self.storage.fingerprint())
+                if self._stats is None:
+                    self._stats = RunningStatistics.from_records(self._cached_records())
+                    self._stats_unsaved = True
+                    self._stats_saved_at = None
+                self._stats_signature = signature
+                self._save_running_statistics()
+            return self._stats
+    
+    def _save_running_statistics(self, force: bool = False):
+        """Persist unsaved running statistics, at most once per STATS_SAVE_INTERVAL unless forced."""
+        with self._cache_lock:
+            if self._stats is None or not self._stats_unsaved:
+                return
+            now = time.monotonic()
+            if not force and self._stats_saved_at is not None and now - self._stats_saved_at < self.STATS_SAVE_INTERVAL:
+                return
+            try:
+                self._stats.save(self.stats_file, self.storage.fingerprint())
+                self._stats_unsaved = False
+                self._stats_saved_at = now
+            except OSError as e:
+                print(f"Error saving statistics: {e}")
+    
+    def _update_cache(self, signature_before, added: List[Dict] = (), removed: Optional[Dict] = None):
+        """Apply one of our own writes to the caches, dropping any the storage changed under."""
+        with self._cache_lock:
+            signature = self.storage.signature()
+            if self._records_cache is not None and signature_before == self._cache_signature:
+                self._records_cache.extend(added)
+                if self._users is not None:
+                    for record in added:
+                        self._index_user_record(record)
+                if self._timeline is not None:
+                    for record in added:
+                        index = bisect.bisect_right(self._timeline_keys, _timestamp(record))
+                        self._timeline_keys.insert(index, _timestamp(record))
+                        self._timeline.insert(index, record)
+                if removed is not None:
+                    self._records_cache.remove(next(r for r in self._records_cache if r.get('id') == removed.get('id')))
+                    if self._users is not None:
+                        key = name_key(removed.get('name'))
+                        user_records = self._users[key]
+                        user_records.remove(next(r for r in user_records if r.get('id') == removed.get('id')))
+                        if not user_records:
+                            del self._users[key]
+                    if self._timeline is not None:
+                        index = bisect.bisect_left(self._timeline_keys, _timestamp(removed))
+                        while self._timeline[index].get('id') != removed.get('id'):
+                            index += 1
+                        del self._timeline_keys[index]
+                        del self._timeline[index]
+                self._cache_signature = signature
+            else:
+                self._records_cache = None
+                self._users = None
+                self._timeline = None
+            if self._stats is not None and signature_before == self._stats_signature:
+                for record in added:
+                    self._stats.add(record)
+                if removed is not None:
+                    self._stats.remove(removed)
+                self._stats_signature = signature
+                self._stats_unsaved = True
+                self._save_running_statistics()
+            else:
+                self._stats = None
+            self.data_version += 1
+    
+    def _memoized(self, key: str, compute):
+        """Return compute() cached until the record set changes."""
+        with self._cache_lock:
+            self._cached_records()
+            version, value = self._memo.get(key, (None, None))
+            if version != self.data_version:
+                value = compute()
+                self._memo[key] = (self.data_version, value)
+            return value
     
     def convert_units(self, value: float, from_unit: str, to_unit: str, 
                      measurement_type: str) -> float:
         """Convert between different units."""
         if measurement_type == 'weight':
-            conversions = {
-                ('kg', 'kg'): 1.0,
-                ('lbs', 'kg'): 0.453592,
-                ('kg', 'lbs'): 2.20462,
-                ('lbs', 'lbs'): 1.0,
-                ('stone', 'kg'): 6.35029,
-                ('kg', 'stone'): 0.157473
-            }
+            conversions = self.WEIGHT_CONVERSIONS
         elif measurement_type == 'height':
-            conversions = {
-                ('m', 'm'): 1.0,
-                ('cm', 'm'): 0.01,
-                ('ft', 'm'): 0.3048,
-                ('in', 'm'): 0.0254,
-                ('m', 'cm'): 100.0,
-                ('m', 'ft'): 3.28084,
-                ('m', 'in'): 39.3701
-            }
+            conversions = self.HEIGHT_CONVERSIONS
         else:
             return value
         
@@ -147,15 +459,75 @@ class BMICalculatorPro:
         weight_kg = self.convert_units(weight, weight_unit, 'kg', 'weight')
         height_m = self.convert_units(height, height_unit, 'm', 'height')
         
-        return weight_kg / (height_m ** 2)
+        # Multiplied rather than squared with ** so results match calculate_bmi_batch exactly
+        return weight_kg / (height_m * height_m)
     
     def categorize_bmi(self, bmi: float) -> str:
         """Categorize BMI value."""
-        for category, (lower, upper) in self.BMI_CATEGORIES.items():
-            if lower <= bmi < upper:
+        index = bisect.bisect_right(self.CATEGORY_LOWER_BOUNDS, bmi) - 1
+        if index >= 0:
+            category = self.CATEGORY_KEYS[index]
+            if bmi < self.BMI_CATEGORIES[category][1]:
                 return category
         return 'unknown'
     
+    def convert_units_batch(self, values, from_unit, to_unit: str, measurement_type: str):
+        """Convert an array of values; from_unit may be one unit or an array of units.
+        
+        Unknown unit pairs are left unconverted, as in convert_units.
+        """
+        import numpy as np
+        
+        values = np.asarray(values, dtype=np.float64)
+        if measurement_type == 'weight':
+            conversions = self.WEIGHT_CONVERSIONS
+        elif measurement_type == 'height':
+            conversions = self.HEIGHT_CONVERSIONS
+        else:
+            return values
+        
+        if isinstance(from_unit, str):
+            return values * conversions.get((from_unit, to_unit), 1.0)
+        units = np.asarray(from_unit)
+        factors = np.ones(values.shape)
+        for (source, target), factor in conversions.items():
+            if target == to_unit and factor != 1.0:
+                factors[units == source] = factor
+        return values * factors
+    
+    def calculate_bmi_batch(self, weights, heights, weight_unit='kg', height_unit='m'):
+        """Calculate BMI for arrays of weights and heights in one vectorized pass.
+        
+        Units may be single units or arrays of units, one per row. Rows with a
+        zero height give inf or nan instead of raising; see validate_batch.
+        """
+        import numpy as np
+        
+        weight_kg = self.convert_units_batch(weights, weight_unit, 'kg', 'weight')
+        height_m = self.convert_units_batch(heights, height_unit, 'm', 'height')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return weight_kg / (height_m * height_m)
+    
+    def categorize_bmi_batch(self, bmis):
+        """Categorize an array of BMIs, returning codes into CATEGORY_KEYS (-1 for unknown)."""
+        import numpy as np
+        
+        bmis = np.asarray(bmis, dtype=np.float64)
+        codes = np.searchsorted(self.CATEGORY_LOWER_BOUNDS, bmis, side='right').astype(np.int8) - 1
+        # Negative BMIs already map to -1; nan and inf fall outside every range
+        codes[~np.isfinite(bmis)] = -1
+        return codes
+    
+    def validate_batch(self, weights, heights, weight_unit='kg', height_unit='m'):
+        """Return a boolean mask of the rows validate_input accepts."""
+        import numpy as np
+        
+        weight_kg = self.convert_units_batch(weights, weight_unit, 'kg', 'weight')
+        height_m = self.convert_units_batch(heights, height_unit, 'm', 'height')
+        # Rejections as in validate_input, so nan passes there and here alike
+        invalid = (weight_kg < 10) | (weight_kg > 650) | (height_m < 0.5) | (height_m > 2.8)
+        return ~invalid
+    
     def get_bmi_analysis(self, bmi: float) -> Dict:
         """Get comprehensive BMI analysis."""
         category = self.categorize_bmi(bmi)
@@ -190,7 +562,7 @@ class BMICalculatorPro:
             height_m = self.convert_units(height, height_unit, 'm', 'height')
             
             record = {
-                'id': datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f'),
+                'id': generate_record_id(),
                 'name': name.strip(),
                 'age': age,
                 'gender': gender,
@@ -208,137 +580,263 @@ class BMICalculatorPro:
                 'date': datetime.date.today().isoformat()
             }
             
-            # Load existing records
-            records = self.load_records()
-            records.append(record)
-            
-            # Save updated records
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(records, f, indent=2, ensure_ascii=False)
-            
+            with self._cache_lock:
+                signature = self.storage.signature()
+                self.storage.append(record)
+                self._update_cache(signature, added=[record])
             return True
         except Exception as e:
             print(f"Error saving record: {e}")
             return False
     
+    def save_records(self, records: List[Dict]) -> int:
+        """Save complete records, as built by save_record, in one storage write.
+        
+        Used for bulk imports; returns the number of records saved.
+        """
+        if not records:
+            return 0
+        with self._cache_lock:
+            signature = self.storage.signature()
+            self.storage.append_many(records)
+            self._update_cache(signature, added=records)
+        return len(records)
+    
     def load_records(self) -> List[Dict]:
-        """Load all BMI records."""
+        """Load all BMI records.
+        
+        The records are shared with the cache and must not be modified.
+        """
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            return list(self._cached_records())
         except Exception as e:
             print(f"Error loading records: {e}")
         return []
     
     def get_user_records(self, name: str) -> List[Dict]:
-        """Get records for a specific user."""
-        all_records = self.load_records()
-        return [r for r in all_records if r.get('name', '').lower() == name.lower()]
+        """Get records for a specific user, oldest first.
+        
+        Names match case-insensitively, ignoring surrounding whitespace.
+        """
+        if self.storage.has_name_index:
+            return self.storage.find_by_name(name)
+        try:
+            return list(self._user_index().get(name_key(name), ()))
+        except Exception as e:
+            print(f"Error loading records: {e}")
+        return []
+    
+    def get_records_page(self, offset: int = 0, limit: int = 100, search: str = '') -> Tuple[int, List[Dict]]:
+        """Return the number of matching records and limit of them from offset, newest first.
+        
+        search matches the start of names, ignoring case and surrounding
+        whitespace. Backends with a time index answer with one indexed
+        query; otherwise pages are sliced from a time-ordered view of the
+        cached records that is kept up to date on save and delete.
+        """
+        try:
+            if self.storage.has_time_index:
+                return self.storage.find_page(offset, limit, search)
+            key = name_key(search)
+            with self._cache_lock:
+                if key:
+                    records = sorted((r for user, user_records in self._user_index().items()
+                                      if user.startswith(key) for r in user_records), key=_timestamp)
+                else:
+                    records = self._timeline_records()
+                end = max(len(records) - offset, 0)
+                return len(records), records[max(end - limit, 0):end][::-1]
+        except Exception as e:
+            print(f"Error loading records: {e}")
+        return 0, []
     
     def get_statistics(self, records: List[Dict] = None) -> Dict:
-        """Calculate comprehensive statistics."""
-        if records is None:
-            records = self.load_records()
+        """Calculate comprehensive statistics.
         
-        if not records:
-            return {}
-        
-        bmis = [r['bmi'] for r in records]
-        weights = [r['weight_kg'] for r in records]
-        ages = [r['age'] for r in records if 'age' in r]
-        
-        # BMI statistics
-        bmi_stats = {
-            'count': len(bmis),
-            'mean': statistics.mean(bmis),
-            'median': statistics.median(bmis),
-            'min': min(bmis),
-            'max': max(bmis),
-            'stdev': statistics.stdev(bmis) if len(bmis) > 1 else 0
-        }
+        Statistics over all records come from running statistics kept up to
+        date on every save and delete; see RunningStatistics for how closely
+        they match a full recalculation.
+        """
+        if records is None:
+            return self._running_statistics().statistics()
+        return self._compute_statistics(records)
+    
+    def get_trends(self, start=None, end=None, granularity: str = 'day',
+                   gender: Optional[str] = None, age_band: Optional[str] = None) -> List[Dict]:
+        """Return BMI trends per day, week or month between start and end (inclusive).
         
-        # Category distribution
-        categories = {}
-        for record in records:
-            cat = record.get('category_name', 'Unknown')
-            categories[cat] = categories.get(cat, 0) + 1
+        Rows come from rollups kept with the running statistics, so a query
+        reads one precomputed bucket per period; see TrendRollups.query.
+        """
+        return self._running_statistics().trends.query(start, end, granularity, gender, age_band)
+    
+    def get_bmi_trend(self, max_points: Optional[int] = None) -> Tuple[str, List[Dict]]:
+        """Return the granularity and rows of the BMI trend over all records.
         
-        # Gender distribution
-        genders = {}
-        for record in records:
-            gender = record.get('gender', 'Unknown')
-            genders[gender] = genders.get(gender, 0) + 1
-        
-        # Age statistics
-        age_stats = {}
-        if ages:
-            age_stats = {
-                'mean': statistics.mean(ages),
-                'median': statistics.median(ages),
-                'min': min(ages),
-                'max': max(ages)
-            }
+        The finest of day, week and month with at most max_points periods
+        (default TREND_MAX_POINTS) is used, so years of records chart as a
+        few hundred points whatever the record count.
+        """
+        max_points = max_points or self.TREND_MAX_POINTS
+        with self._cache_lock:
+            trends = self._running_statistics().trends
+            for granularity in GRANULARITIES:
+                if len(trends.periods[granularity]) <= max_points:
+                    break
+            return granularity, trends.query(granularity=granularity)
+    
+    def get_bmi_histogram(self, bins: int = 15) -> Dict:
+        """Return the BMI histogram of all records; empty without records.
         
-        # Recent trends (last 30 days)
-        recent_date = datetime.datetime.now() - datetime.timedelta(days=30)
-        recent_records = [
-            r for r in records 
-            if datetime.datetime.fromisoformat(r['timestamp']) > recent_date
-        ]
+        Binned from the running statistics' exact BMI histogram rather than
+        the records, giving the edges and counts numpy.histogram gives for
+        the raw values.
+        """
+        import numpy as np
         
-        return {
-            'total_records': len(records),
-            'unique_users': len(set(r.get('name', '') for r in records if r.get('name'))),
-            'bmi_statistics': bmi_stats,
-            'category_distribution': categories,
-            'gender_distribution': genders,
-            'age_statistics': age_stats,
-            'recent_records_count': len(recent_records),
-            'date_range': {
-                'first': min(r['timestamp'] for r in records)[:10] if records else None,
-                'last': max(r['timestamp'] for r in records)[:10] if records else None
-            }
-        }
+        with self._cache_lock:
+            stats = self._running_statistics()
+            if not stats.count:
+                return {}
+            values = np.fromiter(stats.bmis.keys(), dtype=float, count=len(stats.bmis))
+            weights = np.fromiter(stats.bmis.values(), dtype=float, count=len(stats.bmis))
+            count, mean = stats.count, stats.mean
+        counts, edges = np.histogram(values, bins=bins, weights=weights)
+        return {'count': count, 'mean': mean, 'counts': counts.astype(np.int64), 'edges': edges}
+    
+    def data_signature(self) -> tuple:
+        """Return a value that changes whenever the records change, through this engine or not."""
+        return (self.data_version, self.storage.signature())
+    
+    def _compute_statistics(self, records: List[Dict]) -> Dict:
+        """Calculate statistics over the given records."""
+        return compute_statistics(records)
     
     def delete_record(self, record_id: str) -> bool:
         """Delete a specific record by ID."""
         try:
-            records = self.load_records()
-            original_count = len(records)
-            records = [r for r in records if r.get('id') != record_id]
-            
-            if len(records) < original_count:
-                with open(self.data_file, 'w', encoding='utf-8') as f:
-                    json.dump(records, f, indent=2, ensure_ascii=False)
-                return True
-            return False
+            with self._cache_lock:
+                signature = self.storage.signature()
+                record = self.storage.get(record_id)
+                if record is None or not self.storage.delete(record_id):
+                    return False
+                self._update_cache(signature, removed=record)
+            return True
         except Exception as e:
             print(f"Error deleting record: {e}")
             return False
     
-    def export_data(self, format_type: str = 'json', records: List[Dict] = None) -> str:
+    def close(self):
+        """Save the running statistics and close the storage."""
+        self._save_running_statistics(force=True)
+        self.storage.close()
+    
+    def export_data(self, format_type: str = 'json', records: List[Dict] = None,
+                    fields: Optional[List[str]] = None) -> str:
         """Export data in various formats."""
-        if records is None:
-            records = self.load_records()
+        return ''.join(self.iter_export(format_type, records, fields))
+    
+    def export_to_file(self, destination, format_type: str = 'json', records: Iterable[Dict] = None,
+                       fields: Optional[List[str]] = None, compress: Optional[bool] = None):
+        """Export data straight to a file, without building it in memory.
         
-        if format_type.lower() == 'json':
-            return json.dumps(records, indent=2, ensure_ascii=False)
+        destination is a path or a text file object; with compress it must be
+        a binary file object instead. Paths ending in .gz are compressed
+        unless compress is False.
+        """
+        import gzip
+        import io
+        
+        if isinstance(destination, (str, os.PathLike)):
+            if compress is None:
+                compress = str(destination).endswith('.gz')
+            opener = gzip.open if compress else open
+            with opener(destination, 'wt', encoding='utf-8', newline='') as f:
+                self.export_to_file(f, format_type, records, fields, compress=False)
+            return
+        
+        if compress:
+            with gzip.GzipFile(fileobj=destination, mode='wb') as compressed:
+                with io.TextIOWrapper(compressed, encoding='utf-8', newline='') as f:
+                    self.export_to_file(f, format_type, records, fields, compress=False)
+            return
         
+        for chunk in self.iter_export(format_type, records, fields):
+            destination.write(chunk)
+    
+    def iter_records(self) -> Iterator[Dict]:
+        """Yield all records, streaming them from the storage unless they are cached."""
+        return self._export_source(None)()
+    
+    def generate_user_reports(self, destination: str, workers: Optional[int] = None) -> int:
+        """Write a report for every user to a directory or .zip archive; see bmi_reports."""
+        from bmi_reports import generate_user_reports
+        
+        return generate_user_reports(self, destination, workers)
+    
+    def iter_export(self, format_type: str = 'json', records: Iterable[Dict] = None,
+                    fields: Optional[List[str]] = None) -> Iterator[str]:
+        """Yield an export in chunks of EXPORT_CHUNK_SIZE records.
+        
+        Without records, all records are streamed from the storage. fields
+        selects and orders the exported fields; by default CSV columns are
+        every field of any record, in order of first appearance.
+        """
+        if format_type.lower() == 'json':
+            return self._iter_json(self._export_source(records)(), fields)
         elif format_type.lower() == 'csv':
-            import csv
-            import io
-            
-            output = io.StringIO()
-            if records:
-                fieldnames = records[0].keys()
-                writer = csv.DictWriter(output, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(records)
-            
-            return output.getvalue()
+            return self._iter_csv(self._export_source(records), fields)
+        return iter(())
+    
+    def _export_source(self, records: Optional[Iterable[Dict]]) -> Callable[[], Iterator[Dict]]:
+        """Return a function giving a fresh iterator over the records to export."""
+        if records is not None:
+            records = records if isinstance(records, (list, tuple)) else list(records)
+            return lambda: iter(records)
+        with self._cache_lock:
+            if self._records_cache is not None and self.storage.signature() == self._cache_signature:
+                cached = list(self._records_cache)
+                return lambda: iter(cached)
+        return self.storage.iter_all
+    
+    def _iter_json(self, records: Iterator[Dict], fields: Optional[List[str]]) -> Iterator[str]:
+        # Same layout as json.dumps(records, indent=2)
+        chunk = []
+        separator = '[\n  '
+        for record in records:
+            if fields is not None:
+                record = {field: record[field] for field in fields if field in record}
+            chunk.append(separator + json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+            separator = ',\n  '
+            if len(chunk) >= self.EXPORT_CHUNK_SIZE:
+                yield ''.join(chunk)
+                chunk = []
+        chunk.append('[]' if separator.startswith('[') else '\n]')
+        yield ''.join(chunk)
+    
+    def _iter_csv(self, source: Callable[[], Iterator[Dict]], fields: Optional[List[str]]) -> Iterator[str]:
+        import csv
+        import io
+        
+        if fields is None:
+            # A first pass collects the header: the union of all record fields
+            header = {}
+            for record in source():
+                header.update(dict.fromkeys(record))
+            fields = list(header)
+        if not fields:
+            return
         
-        return ""
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for count, record in enumerate(source(), 1):
+            writer.writerow(record)
+            if count % self.EXPORT_CHUNK_SIZE == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        yield output.getvalue()
     
     def generate_report(self, user_name: str = None) -> str:
         """Generate comprehensive BMI report."""
@@ -346,51 +844,17 @@ class BMICalculatorPro:
             records = self.get_user_records(user_name)
             title = f"BMI Report for {user_name}"
         else:
-            records = self.load_records()
+            records = self._cached_records()
             title = "Comprehensive BMI Report"
         
         if not records:
             return f"{title}\n\nNo records found."
         
-        stats = self.get_statistics(records)
-        latest = max(records, key=lambda x: x['timestamp'])
-        
-        report = f"""
-{title}
-{'=' * len(title)}
-
-SUMMARY
--------
-Total Records: {stats['total_records']}
-Date Range: {stats['date_range']['first']} to {stats['date_range']['last']}
-Unique Users: {stats['unique_users']}
-
-LATEST RECORD
--------------
-Date: {latest['timestamp'][:10]}
-BMI: {latest['bmi']} ({latest['category_name']})
-Risk Level: {latest['risk_level']}
-
-BMI STATISTICS
---------------
-Average: {stats['bmi_statistics']['mean']:.2f}
-Median: {stats['bmi_statistics']['median']:.2f}
-Range: {stats['bmi_statistics']['min']:.2f} - {stats['bmi_statistics']['max']:.2f}
-Standard Deviation: {stats['bmi_statistics']['stdev']:.2f}
-
-CATEGORY DISTRIBUTION
---------------------
-"""
-        for category, count in stats['category_distribution'].items():
-            percentage = (count / stats['total_records']) * 100
-            report += f"{category}: {count} records ({percentage:.1f}%)\n"
-        
-        if stats['gender_distribution']:
-            report += "\nGENDER DISTRIBUTION\n-------------------\n"
-            for gender, count in stats['gender_distribution'].items():
-                percentage = (count / stats['total_records']) * 100
-                report += f"{gender}: {count} records ({percentage:.1f}%)\n"
-        
-        report += f"\nReport generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        if user_name:
+            stats = self.get_statistics(records)
+            latest = records[-1]  # Oldest first
+        else:
+            stats = self.get_statistics()
+            latest = self._memoized('latest', lambda: max(self._cached_records(), key=lambda x: x['timestamp']))
         
-        return report
\ No newline at end of file
+        return render_report(title, stats, latest)
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+BMI Calculator Pro - Bulk Import
+Streams screening spreadsheets saved as CSV into the record storage.
+
+Rows are read in chunks; each chunk is validated and its BMIs calculated
+with the batch API, then saved in a single storage write (one transaction
+with the SQLite backend). Memory use depends on the chunk size, not on
+the size of the file. Rejected rows are written to a report with the line
+number and the reason.
+
+Usage:
+    python bmi_import.py screening.csv [--storage sqlite] [--weight-unit lbs] [--height-unit cm]
+"""
+
+import argparse
+import csv
+import datetime
+import itertools
+import math
+import os
+import time
+from typing import Dict, List, Optional, TextIO
+
+from bmi_engine import BMICalculatorPro
+from bmi_storage import generate_record_id
+
+
+CHUNK_SIZE = 50000
+
+# Column names are matched case-insensitively; unit columns override the defaults per row
+REQUIRED_COLUMNS = ('name', 'weight', 'height')
+OPTIONAL_COLUMNS = ('age', 'gender', 'weight_unit', 'height_unit', 'timestamp')
+
+
+def _parse_floats(values: List[str]):
+    """Parse numbers, returning the array (nan where unparseable) and a mask of valid entries."""
+    import numpy as np
+
+    try:
+        parsed = np.array(values, dtype=np.float64)
+    except ValueError:
+        parsed = np.empty(len(values))
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = float(value)
+            except ValueError:
+                parsed[i] = np.nan
+    return parsed, np.isfinite(parsed)
+
+
+class _Chunk:
+    """One chunk of input rows, split into columns."""
+
+    def __init__(self, rows: List[List[str]], columns: Dict[str, int]):
+        width = len(columns) and max(columns.values()) + 1
+        self.rows = [row + [''] * (width - len(row)) if len(row) < width else row for row in rows]
+        self.columns = columns
+
+    def column(self, name: str, default: Optional[str] = None) -> Optional[List[str]]:
+        index = self.columns.get(name)
+        if index is None:
+            return None if default is None else [default] * len(self.rows)
+        return [row[index].strip() or (default or '') for row in self.rows]
+
+
+def _import_chunk(engine: BMICalculatorPro, chunk: _Chunk, first_line: int,
+                  weight_unit: str, height_unit: str, report) -> int:
+    """Validate and save one chunk; return the number of records saved."""
+    import numpy as np
+
+    errors: Dict[int, str] = {}
+
+    def reject(mask, message: str):
+        for i in np.flatnonzero(~mask):
+            errors.setdefault(int(i), message)
+
+    names = chunk.column('name')
+    reject(np.array([bool(name) for name in names], dtype=bool), "Name is required")
+    weights, weights_ok = _parse_floats(chunk.column('weight'))
+    reject(weights_ok, "Weight is not a number")
+    heights, heights_ok = _parse_floats(chunk.column('height'))
+    reject(heights_ok, "Height is not a number")
+
+    weight_units = chunk.column('weight_unit', weight_unit)
+    height_units = chunk.column('height_unit', height_unit)
+    known_weight_units = {unit for unit, target in engine.WEIGHT_CONVERSIONS if target == 'kg'}
+    known_height_units = {unit for unit, target in engine.HEIGHT_CONVERSIONS if target == 'm'}
+    reject(np.array([unit in known_weight_units for unit in weight_units], dtype=bool), "Unknown weight unit")
+    reject(np.array([unit in known_height_units for unit in height_units], dtype=bool), "Unknown height unit")
+
+    ages: List[Optional[int]] = [None] * len(chunk.rows)
+    for i, value in enumerate(chunk.column('age') or ()):
+        if value:
+            try:
+                # Spreadsheets often save whole numbers as 35.0
+                age = float(value)
+                if not age.is_integer():
+                    raise ValueError(value)
+                ages[i] = int(age)
+            except (ValueError, OverflowError):
+                errors.setdefault(i, "Age is not a whole number")
+
+    now = datetime.datetime.now().isoformat()
+    timestamps = [now] * len(chunk.rows)
+    for i, value in enumerate(chunk.column('timestamp') or ()):
+        if value:
+            try:
+                timestamp = datetime.datetime.fromisoformat(value)
+                if timestamp.tzinfo is not None:
+                    # Stored timestamps are naive local time, like save_record's
+                    timestamp = timestamp.astimezone().replace(tzinfo=None)
+                timestamps[i] = timestamp.isoformat()
+            except ValueError:
+                errors.setdefault(i, "Timestamp is not an ISO date")
+
+    weight_units = np.array(weight_units)
+    height_units = np.array(height_units)
+    valid = engine.validate_batch(weights, heights, weight_units, height_units)
+    for i in np.flatnonzero(~valid):
+        if int(i) not in errors:
+            errors[int(i)] = engine.validate_input(float(weights[i]), float(heights[i]),
+                                                   str(weight_units[i]), str(height_units[i]))[1]
+
+    bmis = engine.calculate_bmi_batch(weights, heights, weight_units, height_units)
+    codes = engine.categorize_bmi_batch(bmis)
+    weights_kg = engine.convert_units_batch(weights, weight_units, 'kg', 'weight')
+    heights_m = engine.convert_units_batch(heights, height_units, 'm', 'height')
+
+    genders = chunk.column('gender')
+    records = []
+    for i, (weight, height, weight_kg, height_m, bmi, code) in enumerate(zip(
+            weights.tolist(), heights.tolist(), weights_kg.tolist(), heights_m.tolist(),
+            bmis.tolist(), codes.tolist())):
+        if i in errors:
+            continue
+        category = engine.CATEGORY_KEYS[code] if code >= 0 else 'unknown'
+        info = engine.CATEGORY_INFO.get(category, {})
+        # Same fields as save_record
+        record = {
+            'id': generate_record_id(),
+            'name': names[i],
+            'age': ages[i],
+            'gender': genders[i] if genders else None,
+            'weight_kg': round(weight_kg, 2),
+            'height_m': round(height_m, 3),
+            'weight_input': weight,
+            'height_input': height,
+            'weight_unit': str(weight_units[i]),
+            'height_unit': str(height_units[i]),
+            'bmi': round(bmi, 2),
+            'category': category,
+            'category_name': info.get('name', 'Unknown'),
+            'risk_level': info.get('risk', 'Unknown'),
+            'timestamp': timestamps[i],
+            'date': timestamps[i][:10]
+        }
+        records.append({key: value for key, value in record.items() if value not in (None, '')})
+
+    if report is not None:
+        for i in sorted(errors):
+            report.writerow([first_line + i, errors[i]] + chunk.rows[i])
+    return engine.save_records(records)
+
+
+def import_csv(engine: BMICalculatorPro, source, weight_unit: str = 'kg', height_unit: str = 'm',
+               chunk_size: int = CHUNK_SIZE, errors: Optional[TextIO] = None,
+               progress=None) -> Dict:
+    """Import a CSV file (a path or a text file object) into engine's storage.
+
+    The header must name the columns name, weight and height; age, gender,
+    weight_unit, height_unit and timestamp are optional. Rejected rows are
+    written to errors as CSV, if given. progress, if given, is called with
+    the running summary after each chunk. Returns the summary: rows,
+    imported, rejected and seconds.
+    """
+    start = time.perf_counter()
+    f = open(source, 'r', encoding='utf-8-sig', newline='') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        columns = {}
+        for index, column in enumerate(header):
+            column = column.strip().lower()
+            if column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS:
+                columns.setdefault(column, index)
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        report = None
+        if errors is not None:
+            report = csv.writer(errors)
+            report.writerow(['line', 'error'] + header)
+
+        summary = {'rows': 0, 'imported': 0, 'rejected': 0, 'seconds': 0.0}
+        line = 2  # Line numbers are 1-based and the header is line 1
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                break
+            imported = _import_chunk(engine, _Chunk(rows, columns), line, weight_unit, height_unit, report)
+            line += len(rows)
+            summary['rows'] += len(rows)
+            summary['imported'] += imported
+            summary['rejected'] += len(rows) - imported
+            summary['seconds'] = time.perf_counter() - start
+            if progress:
+                progress(summary)
+        return summary
+    finally:
+        if f is not source:
+            f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import BMI screening records from a CSV file')
+    parser.add_argument('csv_file', help='CSV file with name, weight and height columns')
+    parser.add_argument('--storage', help='Storage backend (json, sqlite or journal); default BMI_STORAGE or json')
+    parser.add_argument('--data-dir', help='Data directory; default the data folder next to this script')
+    parser.add_argument('--weight-unit', default='kg', help='Unit of rows without a weight_unit column (default kg)')
+    parser.add_argument('--height-unit', default='m', help='Unit of rows without a height_unit column (default m)')
+    parser.add_argument('--errors', help='Report of rejected rows (default <csv_file>.errors.csv)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows saved per transaction')
+    args = parser.parse_args()
+
+    errors_path = args.errors or os.path.splitext(args.csv_file)[0] + '.errors.csv'
+    engine = BMICalculatorPro(storage=args.storage, data_dir=args.data_dir)
+    try:
+        with open(errors_path, 'w', encoding='utf-8', newline='') as errors:
+            summary = import_csv(
+                engine, args.csv_file, args.weight_unit, args.height_unit, args.chunk_size, errors,
+                progress=lambda s: print(f"{s['rows']:,} rows read, {s['imported']:,} imported", flush=True))
+    finally:
+        engine.close()
+
+    rate = summary['rows'] / summary['seconds'] if summary['seconds'] else math.inf
+    print(f"Imported {summary['imported']:,} of {summary['rows']:,} rows in {summary['seconds']:.1f} s "
+          f"({rate:,.0f} rows/s)")
+    if summary['rejected']:
+        print(f"{summary['rejected']:,} rows rejected; see {errors_path}")
+    else:
+        os.remove(errors_path)
+
+
+if __name__ == '__main__':
+    main()
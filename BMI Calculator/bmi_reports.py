@@ -0,0 +1,140 @@
+"""
+BMI Calculator Pro - Batch Reports
+Renders one report per user for a whole population.
+
+Records are read once and partitioned by user; the reports are rendered
+in a pool of worker processes and written to a directory, or to a zip
+archive when the destination ends in .zip.
+
+Usage:
+    python bmi_reports.py reports/ [--storage sqlite] [--workers 4]
+    python bmi_reports.py reports.zip
+"""
+
+import argparse
+import datetime
+import itertools
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bmi_engine import BMICalculatorPro, compute_statistics, render_report
+from bmi_storage import name_key
+
+
+# Users rendered per task sent to a worker process
+BATCH_SIZE = 500
+
+# Record fields used by reports; only these are sent to the workers
+REPORT_FIELDS = ('name', 'age', 'gender', 'weight_kg', 'bmi', 'category_name', 'risk_level', 'timestamp')
+
+
+def partition_by_user(records: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    """Group records with a name by name_key(), each group oldest first."""
+    users: Dict[str, List[Dict]] = {}
+    for record in records:
+        key = name_key(record.get('name'))
+        if key:
+            users.setdefault(key, []).append({field: record[field] for field in REPORT_FIELDS if field in record})
+    for user_records in users.values():
+        user_records.sort(key=lambda r: r.get('timestamp', ''))
+    return users
+
+
+def render_user_report(records: List[Dict], generated: Optional[str] = None) -> str:
+    """Render the report of one user from their records, oldest first."""
+    return render_report(f"BMI Report for {records[0]['name']}", compute_statistics(records), records[-1], generated)
+
+
+def _render_batch(batch: List[List[Dict]], generated: str) -> List[Tuple[str, str]]:
+    """Render a batch of users in a worker; returns (name, report) pairs."""
+    return [(records[0]['name'], render_user_report(records, generated)) for records in batch]
+
+
+class _ReportWriter:
+    """Writes reports as text files to a directory or a zip archive."""
+
+    def __init__(self, destination: str):
+        self.used = set()
+        if destination.lower().endswith('.zip'):
+            self.archive = zipfile.ZipFile(destination, 'w', zipfile.ZIP_DEFLATED)
+            self.directory = None
+        else:
+            self.archive = None
+            self.directory = destination
+            os.makedirs(destination, exist_ok=True)
+
+    def filename(self, name: str) -> str:
+        """A file name for the user, unique within this run."""
+        base = re.sub(r'[^\w.-]+', '_', name).strip('._') or 'user'
+        filename = f"{base}.txt"
+        for n in itertools.count(2):
+            if filename.lower() not in self.used:
+                break
+            filename = f"{base}_{n}.txt"
+        self.used.add(filename.lower())
+        return filename
+
+    def write(self, name: str, report: str):
+        filename = self.filename(name)
+        if self.archive is not None:
+            self.archive.writestr(filename, report)
+        else:
+            with open(os.path.join(self.directory, filename), 'w', encoding='utf-8') as f:
+                f.write(report)
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+
+
+def generate_user_reports(engine: BMICalculatorPro, destination: str, workers: Optional[int] = None,
+                          batch_size: int = BATCH_SIZE) -> int:
+    """Write a report for every user; return the number of reports.
+
+    workers is the number of processes (default: one per CPU); 0 renders
+    in this process.
+    """
+    users = list(partition_by_user(engine.iter_records()).values())
+    batches = [users[i:i + batch_size] for i in range(0, len(users), batch_size)]
+    generated = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    writer = _ReportWriter(destination)
+    try:
+        if workers == 0:
+            results = (_render_batch(batch, generated) for batch in batches)
+            for reports in results:
+                for name, report in reports:
+                    writer.write(name, report)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for reports in executor.map(_render_batch, batches, itertools.repeat(generated)):
+                    for name, report in reports:
+                        writer.write(name, report)
+    finally:
+        writer.close()
+    return len(users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a BMI report for every user')
+    parser.add_argument('destination', help='Output directory, or a .zip file')
+    parser.add_argument('--storage', help='Storage backend (json, sqlite or journal); default BMI_STORAGE or json')
+    parser.add_argument('--data-dir', help='Data directory; default the data folder next to this script')
+    parser.add_argument('--workers', type=int, help='Worker processes (default one per CPU; 0 for none)')
+    args = parser.parse_args()
+
+    engine = BMICalculatorPro(storage=args.storage, data_dir=args.data_dir)
+    start = time.perf_counter()
+    try:
+        count = generate_user_reports(engine, args.destination, args.workers)
+    finally:
+        engine.close()
+    print(f"Wrote {count:,} reports to {args.destination} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
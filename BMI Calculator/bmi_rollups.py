@@ -0,0 +1,204 @@
+"""
+BMI Calculator Pro - Trend Rollups
+Per-day, per-week and per-month aggregates of BMI records for trend queries.
+"""
+
+import bisect
+import datetime
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
+
+
+GRANULARITIES = ('day', 'week', 'month')
+
+# (lower, upper, label) with upper exclusive; records without an age are 'Unknown'
+AGE_BANDS = (
+    (0, 18, 'Under 18'),
+    (18, 30, '18-29'),
+    (30, 45, '30-44'),
+    (45, 60, '45-59'),
+    (60, None, '60+')
+)
+
+# Group key matching every gender or age band
+ALL = '*'
+
+DateLike = Union[str, datetime.date, datetime.datetime]
+
+
+def age_band(age: Optional[int]) -> str:
+    """Return the label of the age band containing age."""
+    if age is None:
+        return 'Unknown'
+    for lower, upper, label in AGE_BANDS:
+        if age >= lower and (upper is None or age < upper):
+            return label
+    return 'Unknown'
+
+
+def period_key(day: DateLike, granularity: str) -> str:
+    """Return the period containing day: the date, the Monday of its week, or YYYY-MM."""
+    if isinstance(day, str):
+        day = datetime.date.fromisoformat(day[:10])
+    elif isinstance(day, datetime.datetime):
+        day = day.date()
+    if granularity == 'day':
+        return day.isoformat()
+    if granularity == 'week':
+        return (day - datetime.timedelta(days=day.weekday())).isoformat()
+    if granularity == 'month':
+        return day.isoformat()[:7]
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class _Bucket:
+    """Count, BMI sum and category mix of the records in one period and group."""
+
+    __slots__ = ('count', 'bmi_sum', 'categories')
+
+    def __init__(self):
+        self.count = 0
+        self.bmi_sum = 0.0
+        self.categories: Counter = Counter()
+
+
+class TrendRollups:
+    """Aggregates of records by period, gender and age band, kept up to date as records change.
+
+    Every record is counted under its gender and age band, under each of
+    them alone and under the total (ALL, ALL), so a query reads one bucket
+    per period whatever the filter. Period keys are kept sorted, so a time
+    range is found by bisection and costs O(periods in range).
+    """
+
+    def __init__(self):
+        # granularity -> period -> (gender, age band) -> bucket
+        self.rollups: Dict[str, Dict[str, Dict[Tuple[str, str], _Bucket]]] = {g: {} for g in GRANULARITIES}
+        self.periods: Dict[str, List[str]] = {g: [] for g in GRANULARITIES}
+
+    @staticmethod
+    def _groups(record: Dict) -> List[Tuple[str, str]]:
+        gender = record.get('gender', 'Unknown')
+        band = age_band(record.get('age'))
+        return [(ALL, ALL), (gender, ALL), (ALL, band), (gender, band)]
+
+    def _update(self, record: Dict, sign: int):
+        day = datetime.date.fromisoformat(record['timestamp'][:10])
+        bmi = record['bmi']
+        category = record.get('category_name', 'Unknown')
+        groups = self._groups(record)
+        for granularity in GRANULARITIES:
+            period = period_key(day, granularity)
+            rollup = self.rollups[granularity]
+            buckets = rollup.get(period)
+            if buckets is None:
+                if sign < 0:
+                    continue
+                buckets = rollup[period] = {}
+                bisect.insort(self.periods[granularity], period)
+            for group in groups:
+                bucket = buckets.get(group)
+                if bucket is None:
+                    bucket = buckets[group] = _Bucket()
+                bucket.count += sign
+                bucket.bmi_sum += sign * bmi
+                bucket.categories[category] += sign
+                if bucket.categories[category] <= 0:
+                    del bucket.categories[category]
+                if bucket.count <= 0:
+                    del buckets[group]
+            if not buckets:
+                del rollup[period]
+                periods = self.periods[granularity]
+                del periods[bisect.bisect_left(periods, period)]
+
+    def add(self, record: Dict):
+        """Include a record."""
+        self._update(record, 1)
+
+    def remove(self, record: Dict):
+        """Exclude a record that was previously added."""
+        self._update(record, -1)
+
+    def merge(self, other: 'TrendRollups'):
+        """Include all records counted by other."""
+        for granularity in GRANULARITIES:
+            rollup = self.rollups[granularity]
+            for period, other_buckets in other.rollups[granularity].items():
+                buckets = rollup.get(period)
+                if buckets is None:
+                    buckets = rollup[period] = {}
+                    bisect.insort(self.periods[granularity], period)
+                for group, other_bucket in other_buckets.items():
+                    bucket = buckets.setdefault(group, _Bucket())
+                    bucket.count += other_bucket.count
+                    bucket.bmi_sum += other_bucket.bmi_sum
+                    bucket.categories.update(other_bucket.categories)
+
+    def query(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+              granularity: str = 'day', gender: Optional[str] = None,
+              age_band: Optional[str] = None) -> List[Dict]:
+        """Return the periods containing start and end and those between, oldest first.
+
+        Each row has the period key, the record count, the mean BMI and the
+        category mix of the records matching gender and age_band (None for
+        all). Periods without matching records are left out.
+        """
+        periods = self.periods[granularity]
+        lower = bisect.bisect_left(periods, period_key(start, granularity)) if start else 0
+        upper = bisect.bisect_right(periods, period_key(end, granularity)) if end else len(periods)
+        group = (gender or ALL, age_band or ALL)
+        rollup = self.rollups[granularity]
+        rows = []
+        for period in periods[lower:upper]:
+            bucket = rollup[period].get(group)
+            if bucket is not None:
+                rows.append({
+                    'period': period,
+                    'count': bucket.count,
+                    'mean_bmi': bucket.bmi_sum / bucket.count,
+                    'categories': dict(bucket.categories)
+                })
+        return rows
+
+    def summary(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                granularity: str = 'day', gender: Optional[str] = None,
+                age_band: Optional[str] = None) -> Dict:
+        """Return the count, mean BMI and category mix over a whole range."""
+        count = 0
+        bmi_sum = 0.0
+        categories = Counter()
+        for row in self.query(start, end, granularity, gender, age_band):
+            count += row['count']
+            bmi_sum += row['mean_bmi'] * row['count']
+            categories.update(row['categories'])
+        return {
+            'count': count,
+            'mean_bmi': bmi_sum / count if count else None,
+            'categories': dict(categories)
+        }
+
+    def to_dict(self) -> Dict:
+        """Return a JSON-serializable form of the rollups."""
+        return {
+            granularity: [
+                [period, gender, band, bucket.count, bucket.bmi_sum, bucket.categories]
+                for period, buckets in self.rollups[granularity].items()
+                for (gender, band), bucket in buckets.items()
+            ]
+            for granularity in GRANULARITIES
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TrendRollups':
+        """Restore rollups saved with to_dict()."""
+        rollups = cls()
+        for granularity in GRANULARITIES:
+            rollup = rollups.rollups[granularity]
+            for period, gender, band, count, bmi_sum, categories in data[granularity]:
+                bucket = rollup.setdefault(period, {})[(gender, band)] = _Bucket()
+                bucket.count = count
+                bucket.bmi_sum = bmi_sum
+                bucket.categories = Counter(categories)
+            rollups.periods[granularity] = sorted(rollup)
+        return rollups
@@ -0,0 +1,410 @@
+"""
+BMI Calculator Pro - HTTP Service
+A local HTTP/JSON API over BMICalculatorPro for intake systems.
+
+Requests are served by a fixed pool of worker threads over HTTP/1.1
+keep-alive connections. Single BMI calculations arriving together are
+grouped and computed with the engine's vectorized batch API.
+
+A worker serves one connection until the client closes it or it has been
+idle for KEEP_ALIVE_TIMEOUT seconds, so at most --workers clients are
+served at once; further connections wait for a worker. Size --workers
+for the number of clients that keep connections open.
+
+Endpoints:
+    POST /bmi           {"weight": 70, "height": 1.75, "weight_unit": "kg", "height_unit": "m"}
+    POST /bmi/batch     {"weights": [...], "heights": [...], "weight_unit": ..., "height_unit": ...}
+    POST /records       {"name": ..., "age": ..., "gender": ..., "weight": ..., "height": ..., units}
+    GET  /records       ?name=... for one user, else ?offset=0&limit=100&search=...
+    GET  /statistics
+    GET  /trends        ?start=...&end=...&granularity=day|week|month&gender=...&age_band=...
+    GET  /report        ?name=... (text/plain)
+
+Usage:
+    python bmi_service.py [--port 8080] [--storage sqlite] [--workers 16]
+"""
+
+import argparse
+import json
+import math
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from bmi_engine import BMICalculatorPro
+from bmi_rollups import GRANULARITIES
+
+
+# Threads serving connections; a keep-alive connection holds one until it closes or idles out,
+# so this is also the most clients served at once
+WORKERS = 16
+# Seconds an idle keep-alive connection is kept open
+KEEP_ALIVE_TIMEOUT = 5
+# Largest single calculations grouped into one vectorized call
+MAX_BATCH = 1024
+# Largest request body accepted, in bytes
+MAX_BODY = 16 * 1024 * 1024
+# Most records returned by one page of GET /records
+MAX_PAGE = 1000
+
+
+def _number(data: Dict, field: str) -> float:
+    """A finite number from a request body; raises ValueError otherwise."""
+    value = data.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"'{field}' must be a number")
+    return float(value)
+
+
+def _query_int(params: Dict, field: str, default: int) -> int:
+    try:
+        return int(params.get(field, default))
+    except ValueError:
+        raise ValueError(f"'{field}' must be an integer") from None
+
+
+class BatchAggregator:
+    """Groups single BMI calculations from concurrent requests into vectorized batches.
+
+    Calculations queue up while the previous batch is computed and are
+    then taken together, up to max_batch at a time, so an idle service
+    adds no delay and a busy one makes one batch call per group.
+    """
+
+    def __init__(self, engine: BMICalculatorPro, max_batch: int = MAX_BATCH):
+        self.engine = engine
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='bmi-batcher', daemon=True)
+        self._thread.start()
+
+    def calculate(self, weight: float, height: float, weight_unit: str, height_unit: str) -> Dict:
+        """Return the result for one calculation; raises ValueError for invalid input."""
+        future = Future()
+        self._queue.put((weight, height, weight_unit, height_unit, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch: List[tuple]):
+        futures = [item[4] for item in batch]
+        try:
+            weights, heights, weight_units, height_units, _ = (list(column) for column in zip(*batch))
+            results = BMIService.calculate_many(self.engine, weights, heights, weight_units, height_units)
+            for future, result in zip(futures, results):
+                if 'error' in result:
+                    future.set_exception(ValueError(result['error']))
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class BMIService:
+    """The API's operations; each returns an HTTP status and a JSON-serializable payload."""
+
+    def __init__(self, engine: BMICalculatorPro, batching: bool = True):
+        self.engine = engine
+        self.aggregator = BatchAggregator(engine) if batching else None
+        self.weight_units = {unit for unit, target in engine.WEIGHT_CONVERSIONS if target == 'kg'}
+        self.height_units = {unit for unit, target in engine.HEIGHT_CONVERSIONS if target == 'm'}
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ('POST', '/bmi'): self.calculate,
+            ('POST', '/bmi/batch'): self.calculate_batch,
+            ('POST', '/records'): self.save_record,
+            ('GET', '/records'): self.records,
+            ('GET', '/statistics'): self.statistics,
+            ('GET', '/trends'): self.trends,
+            ('GET', '/report'): self.report
+        }
+
+    @staticmethod
+    def calculate_many(engine: BMICalculatorPro, weights, heights, weight_units, height_units) -> List[Dict]:
+        """Calculate rows with the batch API; rejected rows get an 'error' instead."""
+        import numpy as np
+
+        weight_units = np.array(weight_units)
+        height_units = np.array(height_units)
+        valid = engine.validate_batch(weights, heights, weight_units, height_units)
+        bmis = engine.calculate_bmi_batch(weights, heights, weight_units, height_units)
+        codes = engine.categorize_bmi_batch(bmis)
+        results = []
+        for i, (ok, bmi, code) in enumerate(zip(valid.tolist(), bmis.tolist(), codes.tolist())):
+            if not ok:
+                results.append({'error': engine.validate_input(weights[i], heights[i], str(weight_units[i]),
+                                                               str(height_units[i]))[1]})
+                continue
+            category = engine.CATEGORY_KEYS[code] if code >= 0 else 'unknown'
+            info = engine.CATEGORY_INFO.get(category, {})
+            results.append({
+                'bmi': bmi,
+                'category': category,
+                'category_name': info.get('name', 'Unknown'),
+                'risk_level': info.get('risk', 'Unknown')
+            })
+        return results
+
+    def _measurement(self, data: Dict) -> Tuple[float, float, str, str]:
+        weight_unit = data.get('weight_unit', 'kg')
+        height_unit = data.get('height_unit', 'm')
+        if weight_unit not in self.weight_units:
+            raise ValueError(f"Unknown weight unit: {weight_unit}")
+        if height_unit not in self.height_units:
+            raise ValueError(f"Unknown height unit: {height_unit}")
+        return _number(data, 'weight'), _number(data, 'height'), weight_unit, height_unit
+
+    def calculate(self, data: Dict):
+        weight, height, weight_unit, height_unit = self._measurement(data)
+        if self.aggregator is not None:
+            return 200, self.aggregator.calculate(weight, height, weight_unit, height_unit)
+        is_valid, error_msg = self.engine.validate_input(weight, height, weight_unit, height_unit)
+        if not is_valid:
+            raise ValueError(error_msg)
+        bmi = self.engine.calculate_bmi(weight, height, weight_unit, height_unit)
+        analysis = self.engine.get_bmi_analysis(bmi)
+        return 200, {
+            'bmi': bmi,
+            'category': analysis['category'],
+            'category_name': analysis['category_name'],
+            'risk_level': analysis['risk_level']
+        }
+
+    def calculate_batch(self, data: Dict):
+        weights, heights = data.get('weights'), data.get('heights')
+        if not isinstance(weights, list) or not isinstance(heights, list) or len(weights) != len(heights):
+            raise ValueError("'weights' and 'heights' must be lists of the same length")
+        rows = len(weights)
+        units = {}
+        for field, known in (('weight_unit', self.weight_units), ('height_unit', self.height_units)):
+            unit = data.get(field, 'kg' if field == 'weight_unit' else 'm')
+            column = unit if isinstance(unit, list) else [unit] * rows
+            if len(column) != rows or not set(column) <= known:
+                raise ValueError(f"'{field}' must be a known unit or a list of one per row")
+            units[field] = column
+        for field, values in (('weights', weights), ('heights', heights)):
+            if not all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in values):
+                raise ValueError(f"'{field}' must contain only numbers")
+        if not rows:
+            return 200, {'results': []}
+        return 200, {'results': self.calculate_many(self.engine, weights, heights,
+                                                    units['weight_unit'], units['height_unit'])}
+
+    def save_record(self, data: Dict):
+        name = data.get('name')
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("'name' is required")
+        age = data.get('age')
+        if isinstance(age, bool) or not isinstance(age, int) or not 1 <= age <= 120:
+            raise ValueError("'age' must be an integer between 1 and 120")
+        gender = data.get('gender')
+        if gender not in self.engine.GENDERS:
+            raise ValueError(f"'gender' must be one of {', '.join(self.engine.GENDERS)}")
+        weight, height, weight_unit, height_unit = self._measurement(data)
+        is_valid, error_msg = self.engine.validate_input(weight, height, weight_unit, height_unit)
+        if not is_valid:
+            raise ValueError(error_msg)
+        if not self.engine.save_record(name, age, gender, weight, height, weight_unit, height_unit):
+            return 500, {'error': 'Failed to save record'}
+        return 201, {'saved': True}
+
+    def records(self, params: Dict):
+        if params.get('name'):
+            return 200, {'records': self.engine.get_user_records(params['name'])}
+        offset = max(_query_int(params, 'offset', 0), 0)
+        limit = min(max(_query_int(params, 'limit', 100), 0), MAX_PAGE)
+        total, records = self.engine.get_records_page(offset, limit, params.get('search', ''))
+        return 200, {'total': total, 'offset': offset, 'records': records}
+
+    def statistics(self, params: Dict):
+        return 200, self.engine.get_statistics()
+
+    def trends(self, params: Dict):
+        granularity = params.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"'granularity' must be one of {', '.join(GRANULARITIES)}")
+        rows = self.engine.get_trends(params.get('start'), params.get('end'), granularity,
+                                      params.get('gender'), params.get('age_band'))
+        return 200, {'granularity': granularity, 'trends': rows}
+
+    def report(self, params: Dict):
+        return 200, self.engine.generate_report(params.get('name'))
+
+    def close(self):
+        if self.aggregator is not None:
+            self.aggregator.close()
+
+
+class BMIRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's BMIService; JSON in and out."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'BMICalculatorPro/2.0'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body are written separately; without TCP_NODELAY each
+    # keep-alive response would wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method: str):
+        service: BMIService = self.server.service
+        url = urlsplit(self.path)
+        route = service.routes.get((method, url.path))
+        try:
+            if method == 'POST':
+                data = self._read_json()
+            else:
+                data = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if route is None:
+                known = any(path == url.path for _, path in service.routes)
+                status, payload = (405, {'error': 'Method not allowed'}) if known else (404, {'error': 'Not found'})
+            else:
+                status, payload = route(data)
+        except ValueError as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            self.log_error("Error handling %s %s: %r", method, self.path, e)
+            status, payload = 500, {'error': 'Internal server error'}
+        self._send(status, payload)
+
+    def _read_json(self) -> Dict:
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise ValueError("Invalid Content-Length")
+        if length > MAX_BODY:
+            self.close_connection = True
+            raise ValueError("Request body too large")
+        try:
+            data = json.loads(self.rfile.read(length) or b'{}')
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ValueError("Request body must be JSON") from None
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        return data
+
+    def _send(self, status: int, payload):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; charset=utf-8'
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class BMIServer(HTTPServer):
+    """An HTTP server handing connections to a fixed pool of worker threads."""
+
+    def __init__(self, address: Tuple[str, int], service: BMIService, workers: int = WORKERS,
+                 verbose: bool = False):
+        super().__init__(address, BMIRequestHandler)
+        self.service = service
+        self.verbose = verbose
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bmi-http')
+        # Connections waiting for a worker; closed unserved on shutdown
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._queued_lock:
+            self._queued.add(request)
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        with self._queued_lock:
+            if request not in self._queued:
+                return  # Closed by server_close
+            self._queued.discard(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        with self._queued_lock:
+            queued, self._queued = self._queued, set()
+        for request in queued:
+            self.shutdown_request(request)
+        self._executor.shutdown(wait=True)
+
+
+def serve(engine: BMICalculatorPro, host: str = '127.0.0.1', port: int = 8080, workers: int = WORKERS,
+          batching: bool = True, verbose: bool = False, ready: Optional[Callable] = None):
+    """Serve the API until interrupted; ready(server) is called once listening."""
+    service = BMIService(engine, batching)
+    server = BMIServer((host, port), service, workers, verbose)
+    try:
+        if ready is not None:
+            ready(server)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the BMI calculator as a local HTTP/JSON API')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default 8080)')
+    parser.add_argument('--storage', help='Storage backend (json, sqlite or journal); default BMI_STORAGE or json')
+    parser.add_argument('--data-dir', help='Data directory; default the data folder next to this script')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f'Worker threads, the most clients served at once (default {WORKERS})')
+    parser.add_argument('--no-batching', action='store_true', help='Calculate single BMIs one at a time')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    engine = BMICalculatorPro(storage=args.storage, data_dir=args.data_dir)
+    try:
+        serve(engine, args.host, args.port, args.workers, not args.no_batching, args.verbose,
+              ready=lambda server: print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}",
+                                         flush=True))
+    finally:
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+BMI Calculator Pro - Running Statistics
+Aggregates over BMI records that are updated as records are saved and deleted.
+"""
+
+import datetime
+import json
+import math
+import os
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from bmi_rollups import TrendRollups
+
+
+# Version of the persisted statistics file; other versions are rebuilt
+STATS_FORMAT = 2
+
+RECENT_DAYS = 30
+
+
+def _median(histogram: Counter, count: int):
+    """Median of the values counted in histogram, as statistics.median computes it."""
+    lower_index, upper_index = (count - 1) // 2, count // 2
+    lower = None
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if lower is None and seen > lower_index:
+            lower = value
+        if seen > upper_index:
+            return lower if count % 2 else (lower + value) / 2
+
+
+def _discard(counter: Counter, key, count: int = 1):
+    """Decrement a count, dropping the key once it reaches zero."""
+    counter[key] -= count
+    if counter[key] <= 0:
+        del counter[key]
+
+
+class RunningStatistics:
+    """Incrementally maintained statistics over a set of BMI records.
+
+    The BMI mean and variance use Welford's algorithm, which also supports
+    removing a value, so they agree with a full recomputation up to
+    floating point rounding (relative error around 1e-12). BMI and age
+    values are kept in exact histograms; BMIs are stored rounded to 0.01,
+    so the histogram stays small and median, min and max are exact.
+    Histograms and counters are mergeable, see merge().
+
+    Records are bucketed by day, so recent_records_count counts the
+    records of the day RECENT_DAYS days ago in full rather than only those
+    after the current time of day. Per-period trend aggregates are kept
+    alongside in trends (see bmi_rollups.TrendRollups).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.bmis: Counter = Counter()
+        self.ages: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.genders: Counter = Counter()
+        self.names: Counter = Counter()
+        self.days: Counter = Counter()
+        self.trends = TrendRollups()
+        self._result: Optional[tuple] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'RunningStatistics':
+        """Build statistics over records."""
+        stats = cls()
+        for record in records:
+            stats.add(record)
+        return stats
+
+    def add(self, record: Dict):
+        """Include a record."""
+        bmi = record['bmi']
+        self.count += 1
+        delta = bmi - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (bmi - self.mean)
+        self.bmis[bmi] += 1
+        if record.get('age') is not None:
+            self.ages[record['age']] += 1
+        self.categories[record.get('category_name', 'Unknown')] += 1
+        self.genders[record.get('gender', 'Unknown')] += 1
+        if record.get('name'):
+            self.names[record['name']] += 1
+        self.days[record['timestamp'][:10]] += 1
+        self.trends.add(record)
+        self._result = None
+
+    def remove(self, record: Dict):
+        """Exclude a record that was previously added."""
+        bmi = record['bmi']
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        else:
+            mean = self.mean
+            self.count -= 1
+            self.mean = (mean * (self.count + 1) - bmi) / self.count
+            self.m2 = max(self.m2 - (bmi - mean) * (bmi - self.mean), 0.0)
+        _discard(self.bmis, bmi)
+        if record.get('age') is not None:
+            _discard(self.ages, record['age'])
+        _discard(self.categories, record.get('category_name', 'Unknown'))
+        _discard(self.genders, record.get('gender', 'Unknown'))
+        if record.get('name'):
+            _discard(self.names, record['name'])
+        _discard(self.days, record['timestamp'][:10])
+        self.trends.remove(record)
+        self._result = None
+
+    def merge(self, other: 'RunningStatistics'):
+        """Include all records counted by other."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        for mine, theirs in ((self.bmis, other.bmis), (self.ages, other.ages),
+                             (self.categories, other.categories), (self.genders, other.genders),
+                             (self.names, other.names), (self.days, other.days)):
+            mine.update(theirs)
+        self.trends.merge(other.trends)
+        self._result = None
+
+    def statistics(self, now: datetime.datetime = None) -> Dict:
+        """Return statistics in the format of BMICalculatorPro.get_statistics."""
+        if not self.count:
+            return {}
+        now = now or datetime.datetime.now()
+        cutoff = (now - datetime.timedelta(days=RECENT_DAYS)).date().isoformat()
+        if self._result is not None and self._result[0] == cutoff:
+            return self._result[1]
+
+        age_stats = {}
+        if self.ages:
+            age_count = sum(self.ages.values())
+            age_sum = sum(age * n for age, n in self.ages.items())
+            age_stats = {
+                'mean': age_sum // age_count if age_sum % age_count == 0 else age_sum / age_count,
+                'median': _median(self.ages, age_count),
+                'min': min(self.ages),
+                'max': max(self.ages)
+            }
+
+        result = {
+            'total_records': self.count,
+            'unique_users': len(self.names),
+            'bmi_statistics': {
+                'count': self.count,
+                'mean': self.mean,
+                'median': _median(self.bmis, self.count),
+                'min': min(self.bmis),
+                'max': max(self.bmis),
+                'stdev': math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0
+            },
+            'category_distribution': dict(self.categories),
+            'gender_distribution': dict(self.genders),
+            'age_statistics': age_stats,
+            'recent_records_count': sum(n for day, n in self.days.items() if day >= cutoff),
+            'date_range': {
+                'first': min(self.days),
+                'last': max(self.days)
+            }
+        }
+        self._result = (cutoff, result)
+        return result
+
+    def to_dict(self) -> Dict:
+        """Return a JSON-serializable form of the statistics."""
+        return {
+            'format': STATS_FORMAT,
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            # JSON object keys are strings, so numeric histograms are pairs
+            'bmis': list(self.bmis.items()),
+            'ages': list(self.ages.items()),
+            'categories': self.categories,
+            'genders': self.genders,
+            'names': self.names,
+            'days': self.days,
+            'trends': self.trends.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RunningStatistics':
+        """Restore statistics saved with to_dict()."""
+        if data.get('format') != STATS_FORMAT:
+            raise ValueError(f"Unsupported statistics format: {data.get('format')}")
+        stats = cls()
+        stats.count = data['count']
+        stats.mean = data['mean']
+        stats.m2 = data['m2']
+        stats.bmis = Counter(dict((value, n) for value, n in data['bmis']))
+        stats.ages = Counter(dict((age, n) for age, n in data['ages']))
+        for field in ('categories', 'genders', 'names', 'days'):
+            setattr(stats, field, Counter(data[field]))
+        stats.trends = TrendRollups.from_dict(data['trends'])
+        return stats
+
+    def save(self, path: str, fingerprint: str):
+        """Write the statistics to path, tagged with the storage fingerprint."""
+        data = self.to_dict()
+        data['fingerprint'] = fingerprint
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> Optional['RunningStatistics']:
+        """Read statistics from path if they were saved for the given fingerprint."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('fingerprint') != fingerprint:
+                return None
+            return cls.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
@@ -0,0 +1,133 @@
+"""
+BMI Calculator Pro - Background Worker
+Runs engine calls off the Tk main loop and delivers their results on it.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+
+# Milliseconds between checks for finished tasks while any are pending
+POLL_INTERVAL = 20
+
+
+class BackgroundWorker:
+    """Runs functions in worker threads and calls back on the Tk thread.
+
+    Tasks are submitted under a key such as 'records' or 'chart'. A new
+    task replaces the pending one with the same key: if the old task has
+    not started it is cancelled, otherwise its result is dropped when it
+    arrives. Callbacks therefore only ever see the latest request.
+
+    Tk is not thread-safe, so workers never touch widgets; finished tasks
+    are handed over through a queue that the Tk thread polls with
+    root.after while tasks are pending.
+    """
+
+    def __init__(self, root, workers: int = 2, poll_interval: int = POLL_INTERVAL):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bmi-worker')
+        self._results: queue.Queue = queue.Queue()
+        self._generations: Dict[str, int] = {}
+        self._pending: Dict[str, Tuple[int, Future, Callable, Optional[Callable]]] = {}
+        self._lock = threading.Lock()
+        self._polling = None
+        self._closed = False
+
+    def submit(self, key: str, function: Callable, *args, on_done: Callable = None,
+               on_error: Optional[Callable] = None) -> int:
+        """Run function(*args) in a worker; return the request's generation.
+
+        on_done(result) or on_error(exception) is called on the Tk thread
+        unless the request was superseded or cancelled first.
+        """
+        if self._closed:
+            raise RuntimeError("Worker is closed")
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            previous = self._pending.pop(key, None)
+        if previous is not None:
+            previous[1].cancel()
+
+        def run():
+            if not self.is_current(key, generation):
+                return
+            try:
+                outcome = (True, function(*args))
+            except Exception as e:
+                outcome = (False, e)
+            self._results.put((key, generation, outcome))
+
+        future = self._executor.submit(run)
+        with self._lock:
+            self._pending[key] = (generation, future, on_done, on_error)
+        self._schedule_poll()
+        return generation
+
+    def is_current(self, key: str, generation: int) -> bool:
+        """Whether generation is still the latest request for key.
+
+        Long tasks may check this to stop early once superseded.
+        """
+        return self._generations.get(key) == generation
+
+    def cancel(self, key: str):
+        """Cancel the pending request for key, if any."""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            previous = self._pending.pop(key, None)
+        if previous is not None:
+            previous[1].cancel()
+
+    def busy(self, key: Optional[str] = None) -> bool:
+        """Whether a request for key (or any request) is pending."""
+        return key in self._pending if key is not None else bool(self._pending)
+
+    def _schedule_poll(self):
+        if self._polling is None and not self._closed:
+            self._polling = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Deliver finished tasks; runs on the Tk thread."""
+        self._polling = None
+        while True:
+            try:
+                key, generation, (ok, value) = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                pending = self._pending.get(key)
+                if pending is None or pending[0] != generation:
+                    continue
+                del self._pending[key]
+            _, _, on_done, on_error = pending
+            if ok:
+                if on_done is not None:
+                    on_done(value)
+            elif on_error is not None:
+                on_error(value)
+            else:
+                print(f"Background task '{key}' failed: {value}")
+        if self._pending:
+            self._schedule_poll()
+
+    def close(self):
+        """Cancel pending requests and stop the worker threads."""
+        self._closed = True
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for _, future, _, _ in pending:
+            future.cancel()
+        if self._polling is not None:
+            try:
+                self.root.after_cancel(self._polling)
+            except Exception:
+                pass
+            self._polling = None
+        # Pending futures were cancelled above
+        self._executor.shutdown(wait=False)
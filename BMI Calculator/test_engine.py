@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the BMI engine's storage, statistics, import and report paths
+"""
+
+import datetime
+import http.client
+import io
+import json
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import zipfile
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from bmi_engine import COLUMNAR_MIN_RECORDS, BMICalculatorPro, _python_statistics, compute_statistics
+from bmi_import import import_csv
+from bmi_reports import generate_user_reports
+from bmi_rollups import GRANULARITIES, age_band, period_key
+from bmi_service import BMIServer, BMIService
+from bmi_storage import JournalStorage, JSONStorage, name_key
+from synthetic import make_records
+
+
+BACKENDS = ('json', 'sqlite', 'journal')
+
+
+def same(expected, actual) -> bool:
+    """Compare results, allowing for floating point rounding."""
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(same(expected[k], actual[k]) for k in expected)
+    if isinstance(expected, float) or isinstance(actual, float):
+        return math.isclose(expected, actual, rel_tol=1e-9)
+    return expected == actual
+
+
+def assert_statistics_match(engine: BMICalculatorPro, label: str):
+    expected = _python_statistics(engine.storage.load_all())
+    actual = dict(engine.get_statistics())
+    # Running statistics count the whole boundary day as recent
+    expected.pop('recent_records_count')
+    actual.pop('recent_records_count')
+    assert same(expected, actual), (label, expected, actual)
+
+
+def journal_record(i: int) -> dict:
+    return {'id': f"r{i}", 'name': f"User {i % 3}", 'bmi': 20 + i % 10,
+            'timestamp': f"2024-01-{i % 28 + 1:02d}T10:00:00"}
+
+
+def record_ids(storage) -> set:
+    return {record['id'] for record in storage.load_all()}
+
+
+def test_import_timestamp_offsets():
+    """Test imported timestamps with a UTC offset are stored as naive local time"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = BMICalculatorPro(storage='json', data_dir=data_dir)
+        try:
+            source = io.StringIO("name,weight,height,timestamp\n"
+                                 "Ada,70,1.75,2024-01-01T10:00:00+00:00\n"
+                                 "Ada,71,1.75,2024-02-01T10:00:00\n")
+            summary = import_csv(engine, source)
+            assert summary['imported'] == 2, summary
+
+            utc = datetime.datetime(2024, 1, 1, 10, tzinfo=datetime.timezone.utc)
+            expected = utc.astimezone().replace(tzinfo=None).isoformat()
+            timestamps = sorted(record['timestamp'] for record in engine.get_user_records('Ada'))
+            assert timestamps == sorted([expected, '2024-02-01T10:00:00']), timestamps
+            assert all(datetime.datetime.fromisoformat(t).tzinfo is None for t in timestamps)
+
+            # Naive and aware timestamps used to be compared here
+            assert 'Total Records: 2' in engine.generate_report('Ada')
+        finally:
+            engine.close()
+
+
+def test_service_rejects_bad_input():
+    """Test the HTTP service answers bad genders and body lengths with 400"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = BMICalculatorPro(storage='json', data_dir=data_dir)
+        service = BMIService(engine)
+        server = BMIServer(('127.0.0.1', 0), service, workers=2)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            port = server.server_address[1]
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            record = {'name': 'Ada', 'age': 36, 'weight': 60, 'height': 1.65}
+            for gender, status in ((['x'], 400), (None, 400), ('Female', 201)):
+                connection.request('POST', '/records', json.dumps(dict(record, gender=gender)))
+                response = connection.getresponse()
+                response.read()
+                assert response.status == status, (gender, response.status)
+            connection.request('GET', '/statistics')
+            assert json.loads(connection.getresponse().read())['gender_distribution'] == {'Female': 1}
+            connection.close()
+
+            with socket.create_connection(('127.0.0.1', port), timeout=2) as s:
+                s.sendall(b"POST /bmi HTTP/1.1\r\nHost: localhost\r\nContent-Length: -1\r\n\r\n")
+                assert s.recv(64).startswith(b"HTTP/1.1 400")
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+            engine.close()
+
+
+def test_running_statistics():
+    """Test running statistics match a full recompute after saves, deletes and a restart"""
+    for backend in BACKENDS:
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = BMICalculatorPro(storage=backend, data_dir=data_dir)
+            engine.storage.append_many(make_records(300, users=40, days=90))
+            assert_statistics_match(engine, f"{backend} rebuilt")
+
+            for i in range(5):
+                assert engine.save_record(f"New {i}", 30 + i, 'Female', 60 + i, 1.7)
+            for record in engine.load_records()[::40]:
+                assert engine.delete_record(record['id'])
+            assert_statistics_match(engine, f"{backend} after saves and deletes")
+            engine.close()
+
+            engine = BMICalculatorPro(storage=backend, data_dir=data_dir)
+            assert os.path.exists(engine.stats_file)
+            assert_statistics_match(engine, f"{backend} after restart")
+            engine.close()
+
+
+def test_columnar_statistics():
+    """Test statistics of long record lists, computed on NumPy columns, match the Python path"""
+    records = make_records(COLUMNAR_MIN_RECORDS + 500, users=200, days=400)
+    for i, record in enumerate(records):
+        # Optional fields are missing from some records
+        if i % 7 == 0:
+            del record['age']
+        if i % 11 == 0:
+            del record['gender']
+    expected = _python_statistics(records)
+    actual = compute_statistics(records)
+    assert same(expected, actual), (expected, actual)
+    assert same(_python_statistics(records[:10]), compute_statistics(records[:10]))
+
+
+def test_record_indexes():
+    """Test per-user lookups and record pages match a scan of all records"""
+    def ids(records):
+        return [record['id'] for record in records]
+
+    for backend in BACKENDS:
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = BMICalculatorPro(storage=backend, data_dir=data_dir)
+            engine.storage.append_many(make_records(300, users=12, days=90))
+            engine.get_user_records('User 1')
+            engine.get_records_page(0, 10)
+            # Indexes are updated in place from here on
+            assert engine.save_record('user 3', 40, 'Male', 80, 1.8)
+            assert engine.delete_record(engine.get_user_records('User 5')[0]['id'])
+
+            records = engine.storage.load_all()
+            for name in ('User 3', 'USER 5', ' user 11 ', 'Nobody'):
+                expected = sorted((r for r in records if name_key(r['name']) == name_key(name)),
+                                  key=lambda r: r['timestamp'])
+                assert ids(engine.get_user_records(name)) == ids(expected), (backend, name)
+
+            newest = sorted(records, key=lambda r: r['timestamp'], reverse=True)
+            for offset, limit, search in ((0, 25, ''), (290, 25, ''), (0, 10, 'user 1'), (20, 10, 'USER 1')):
+                matching = [r for r in newest if name_key(r['name']).startswith(name_key(search))]
+                total, page = engine.get_records_page(offset, limit, search)
+                assert total == len(matching), (backend, offset, search, total)
+                assert ids(page) == ids(matching[offset:offset + limit]), (backend, offset, search)
+            engine.close()
+
+
+def test_batch_matches_scalar():
+    """Test the batch BMI API gives the scalar API's results row by row"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = BMICalculatorPro(data_dir=data_dir)
+        rng = random.Random(7)
+        heights_by_unit = {'m': (0.3, 3.0), 'cm': (30, 300), 'ft': (1, 10), 'in': (12, 120)}
+        weight_units = [rng.choice(('kg', 'lbs', 'stone')) for _ in range(500)]
+        height_units = [rng.choice(tuple(heights_by_unit)) for _ in range(500)]
+        weights = [round(rng.uniform(0, 700), 1) for _ in weight_units]
+        heights = [round(rng.uniform(*heights_by_unit[unit]), 2) for unit in height_units]
+
+        valid = engine.validate_batch(weights, heights, weight_units, height_units).tolist()
+        bmis = engine.calculate_bmi_batch(weights, heights, weight_units, height_units).tolist()
+        codes = engine.categorize_bmi_batch(bmis).tolist()
+        assert 0 < sum(valid) < len(valid)
+        for i, row in enumerate(zip(weights, heights, weight_units, height_units)):
+            assert valid[i] == engine.validate_input(*row)[0], row
+            assert bmis[i] == engine.calculate_bmi(*row), row
+            category = engine.CATEGORY_KEYS[codes[i]] if codes[i] >= 0 else 'unknown'
+            assert category == engine.categorize_bmi(bmis[i]), row
+
+        # Category boundaries, and one unit for every row
+        boundaries = [0, 15.99, 16, 18.49, 18.5, 24.99, 25, 29.99, 30, 35, 40, 1000, -1]
+        codes = engine.categorize_bmi_batch(boundaries).tolist()
+        assert [engine.CATEGORY_KEYS[c] if c >= 0 else 'unknown' for c in codes] == \
+            [engine.categorize_bmi(bmi) for bmi in boundaries]
+        bmis = engine.calculate_bmi_batch([154, 200], [70, 65], 'lbs', 'in').tolist()
+        assert bmis == [engine.calculate_bmi(154, 70, 'lbs', 'in'), engine.calculate_bmi(200, 65, 'lbs', 'in')]
+        engine.close()
+
+
+def test_user_reports():
+    """Test batch user reports match each user's report generated alone"""
+    def without_time(report):
+        # The last line is the time the report was generated
+        return report.rstrip().rsplit('\n', 1)[0]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = BMICalculatorPro(storage='sqlite', data_dir=data_dir)
+        engine.storage.append_many(make_records(200, users=7, days=60))
+        assert engine.save_record('Zoë / Admin', 50, 'Other', 55, 1.6)
+        assert engine.save_record('zoë / admin', 51, 'Other', 56, 1.6)
+
+        directory = os.path.join(data_dir, 'reports')
+        archive = os.path.join(data_dir, 'reports.zip')
+        assert generate_user_reports(engine, directory, workers=0) == 8
+        assert generate_user_reports(engine, archive, workers=2) == 8
+
+        files = {}
+        for filename in os.listdir(directory):
+            with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                files[filename] = f.read()
+        with zipfile.ZipFile(archive) as z:
+            assert {filename: z.read(filename).decode('utf-8') for filename in z.namelist()} == files
+        # Names differing only in case are one user, titled with the oldest record's name
+        assert 'Total Records: 2' in files['Zoë_Admin.txt'], sorted(files)
+
+        for report in files.values():
+            name = report.strip().splitlines()[0][len('BMI Report for '):]
+            assert without_time(report) == without_time(engine.generate_report(name)), name
+        engine.close()
+
+
+def test_trend_rollups():
+    """Test trend queries match grouping the records by period"""
+    today = datetime.date.today()
+    start, end = today - datetime.timedelta(days=100), today
+    filters = ((None, None), ('Female', None), (None, '30-44'), ('Male', '60+'))
+
+    def expected_rows(records, granularity, gender, band):
+        periods = {}
+        first, last = period_key(start, granularity), period_key(end, granularity)
+        for r in records:
+            period = period_key(r['timestamp'], granularity)
+            if first <= period <= last and gender in (None, r.get('gender')) and band in (None, age_band(r.get('age'))):
+                periods.setdefault(period, []).append(r)
+        return [{'period': period, 'count': len(rs), 'mean_bmi': sum(r['bmi'] for r in rs) / len(rs),
+                 'categories': dict(Counter(r['category_name'] for r in rs))}
+                for period, rs in sorted(periods.items())]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = BMICalculatorPro(storage='json', data_dir=data_dir)
+        engine.storage.append_many(make_records(400, users=30, days=180))
+        engine.get_trends()
+        for record in engine.load_records()[::25]:
+            assert engine.delete_record(record['id'])
+        assert engine.save_record('New', 35, 'Female', 70, 1.65)
+        engine.close()
+
+        engine = BMICalculatorPro(storage='json', data_dir=data_dir)
+        records = engine.storage.load_all()
+        for granularity in GRANULARITIES:
+            for gender, band in filters:
+                rows = engine.get_trends(start.isoformat(), end, granularity, gender, band)
+                expected = expected_rows(records, granularity, gender, band)
+                assert rows, (granularity, gender, band)
+                assert len(rows) == len(expected) and all(map(same, expected, rows)), (granularity, gender, band)
+        engine.close()
+
+
+def test_json_reads_during_writes():
+    """Test JSON storage readers, like a background export, never see a half-written file"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = JSONStorage(os.path.join(data_dir, 'records.json'))
+        storage.append_many(make_records(2000))
+        done = threading.Event()
+        sizes = []
+
+        def read():
+            while not done.is_set():
+                sizes.append(sum(1 for _ in storage.iter_all()))
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for record in make_records(20, seed=3):
+                storage.append(record)
+        finally:
+            done.set()
+            reader.join()
+        assert sizes and all(2000 <= size <= 2020 for size in sizes), sorted(set(sizes))[:5]
+        assert not os.path.exists(storage.path + '.tmp')
+
+
+def test_journal_compaction():
+    """Test the journal is folded into the snapshot and reloads the same records"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, 'records.json')
+        storage = JournalStorage(path, compact_threshold=5)
+        storage.append_many([journal_record(i) for i in range(12)])
+        for i in range(3):
+            assert storage.delete(f"r{i}")
+        storage.compact()
+        expected = record_ids(storage)
+        fingerprint = storage.fingerprint()
+        storage.close()
+
+        assert expected == {f"r{i}" for i in range(3, 12)}
+        assert os.path.getsize(storage.journal_path) == 0
+        assert not os.path.exists(storage.compacting_path)
+        assert {record['id'] for record in json.load(open(path))} == expected
+
+        storage = JournalStorage(path, compact_threshold=5)
+        assert record_ids(storage) == expected
+        assert storage.fingerprint() == fingerprint
+        assert [r['id'] for r in storage.find_by_name('user 0')] == ['r3', 'r6', 'r9']
+        storage.close()
+
+
+def test_journal_crash_recovery():
+    """Test a torn journal line and an interrupted compaction are recovered on load"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, 'records.json')
+        storage = JournalStorage(path)
+        storage.append_many([journal_record(i) for i in range(4)])
+        storage.close()
+
+        # Crash after rotating the journal, then mid-write of the next entry
+        os.replace(storage.journal_path, storage.compacting_path)
+        with open(storage.journal_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'del', 'id': 'r0'}) + '\n')
+            f.write(json.dumps({'op': 'add', 'record': journal_record(4)})[:20])
+
+        storage = JournalStorage(path)
+        assert record_ids(storage) == {'r1', 'r2', 'r3'}
+        assert not os.path.exists(storage.compacting_path)
+        storage.append_many([journal_record(5)])
+        storage.close()
+
+        storage = JournalStorage(path)
+        assert record_ids(storage) == {'r1', 'r2', 'r3', 'r5'}
+        storage.close()
+
+
+def test_journal_failed_compaction():
+    """Test a failed compaction is retried by the next one instead of blocking compaction"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, 'records.json')
+        storage = JournalStorage(path, compact_threshold=1000)
+        storage.append_many([journal_record(i) for i in range(4)])
+
+        def fail(records):
+            raise OSError("disk full")
+
+        storage._write_snapshot = fail
+        storage.compact()
+        assert os.path.exists(storage.compacting_path)
+
+        del storage._write_snapshot
+        storage.append_many([journal_record(4)])
+        storage.delete('r1')
+        storage.compact()
+        assert not os.path.exists(storage.compacting_path)
+        assert os.path.getsize(storage.journal_path) == 0
+        storage.close()
+
+        storage = JournalStorage(path)
+        assert record_ids(storage) == {'r0', 'r2', 'r3', 'r4'}
+        storage.close()
+
+
+TESTS = [
+    test_import_timestamp_offsets,
+    test_service_rejects_bad_input,
+    test_running_statistics,
+    test_columnar_statistics,
+    test_record_indexes,
+    test_batch_matches_scalar,
+    test_user_reports,
+    test_trend_rollups,
+    test_json_reads_during_writes,
+    test_journal_compaction,
+    test_journal_crash_recovery,
+    test_journal_failed_compaction
+]
+
+
+def main():
+    print("=" * 50)
+    print("BMI Calculator Pro Engine Test")
+    print("=" * 50)
+
+    passed = 0
+    for test in TESTS:
+        name = test.__doc__
+        try:
+            test()
+            print(f"✓ {name}: PASSED")
+            passed += 1
+        except Exception as e:
+            print(f"✗ {name}: FAILED - {e!r}")
+
+    print("=" * 50)
+    print(f"Test Results: {passed}/{len(TESTS)} tests passed")
+    print("=" * 50)
+    if passed != len(TESTS):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the GUI starts quickly and stays responsive with large data sets
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import pytest
+except ImportError:  # Run as a script without pytest
+    pytest = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+RECORDS = 1000000
+CHUNK = 50000
+TICK_MS = 10
+# A page of records must be on screen within this many ms
+DISPLAY_BUDGET_MS = 1000
+# UI events may be delayed this long at the 99th percentile while records load
+LATENCY_BUDGET_MS = 100
+TIMEOUT = 600
+# Importing the GUI module must take less than this, best of STARTUP_RUNS
+STARTUP_BUDGET_MS = 300
+STARTUP_RUNS = 3
+
+
+def has_display() -> bool:
+    return not (sys.platform.startswith('linux') and not os.environ.get('DISPLAY'))
+
+
+def make_engine(data_dir):
+    """An engine on a SQLite store filled with RECORDS synthetic records."""
+    from bmi_engine import BMICalculatorPro
+    from synthetic import iter_records
+    engine = BMICalculatorPro(storage='sqlite', data_dir=data_dir)
+    records = iter_records(RECORDS)
+    while True:
+        chunk = list(itertools.islice(records, CHUNK))
+        if not chunk:
+            break
+        engine.storage.append_many(chunk)
+    return engine
+
+
+if pytest is not None:
+    @pytest.fixture(scope='module')
+    def engine():
+        """The make_engine store, shared by the GUI tests; skips them without a display."""
+        if not has_display():
+            pytest.skip("No display available")
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = make_engine(data_dir)
+            try:
+                yield engine
+            finally:
+                engine.close()
+
+
+def run_gui(engine, action):
+    """Open the GUI, run action(app) and wait until its records are shown.
+
+    Returns the root, the app, the seconds until the page was displayed
+    and the delays of a TICK_MS timer meanwhile, in ms, sorted.
+    """
+    import tkinter as tk
+    from bmi_calculator_pro_clean import BMICalculatorProGUI
+    root = tk.Tk()
+    app = BMICalculatorProGUI(root, engine)
+    delays = []
+    state = {'expected': None, 'done': False, 'start': None}
+
+    def tick():
+        now = time.perf_counter()
+        if state['expected'] is not None and state['start'] is not None:
+            delays.append((now - state['expected']) * 1000)
+        state['expected'] = now + TICK_MS / 1000
+        if not state['done']:
+            root.after(TICK_MS, tick)
+
+    def start():
+        state['start'] = time.perf_counter()
+        action(app)
+        root.after(1, check)
+
+    def check():
+        shown = len(app.records_tree.get_children()) == app.PAGE_SIZE
+        if (shown and not app.worker.busy('records')) or time.perf_counter() - state['start'] > TIMEOUT:
+            state['elapsed'] = time.perf_counter() - state['start']
+            state['done'] = True
+            root.quit()
+        else:
+            root.after(1, check)
+
+    def wait():
+        # Let the startup refresh, chart and report finish first
+        if app.worker.busy():
+            root.after(100, wait)
+        else:
+            start()
+
+    root.after(0, tick)
+    root.after(500, wait)
+    root.mainloop()
+    return root, app, state['elapsed'], sorted(delays)
+
+
+def test_time_to_display(engine):
+    """Measure time to display a page of records and UI latency meanwhile"""
+    print(f"  {RECORDS:,} records")
+    root, app, first, delays = run_gui(engine, lambda app: app.show_records_page(0))
+    app.worker.close()
+    root.destroy()
+    root, app, deep, _ = run_gui(engine, lambda app: app.show_records_page(RECORDS // app.PAGE_SIZE // 2))
+    try:
+        rows = len(app.records_tree.get_children())
+
+        # What the UI thread used to do before showing anything
+        blocking_start = time.perf_counter()
+        records = engine.load_records()
+        records.sort(key=lambda x: x['timestamp'], reverse=True)
+        [app._record_row(record) for record in records]
+        blocking = time.perf_counter() - blocking_start
+    finally:
+        app.worker.close()
+        root.destroy()
+
+    p99 = delays[int(len(delays) * 0.99)] if delays else 0.0
+    print(f"  first page shown in {first * 1000:.0f} ms, middle page in {deep * 1000:.0f} ms")
+    print(f"  timer delay: p99 {p99:.1f} ms, max {delays[-1] if delays else 0.0:.1f} ms")
+    print(f"  loading, sorting and formatting every record took {blocking * 1000:.0f} ms")
+    assert rows == app.PAGE_SIZE, f"{rows} rows shown"
+    assert max(first, deep) * 1000 <= DISPLAY_BUDGET_MS, f"over {DISPLAY_BUDGET_MS} ms"
+    assert p99 <= LATENCY_BUDGET_MS, f"p99 delay {p99:.1f} ms over {LATENCY_BUDGET_MS} ms"
+
+
+def test_startup_time():
+    """Measure GUI import time and check plotting is not loaded at startup"""
+    from bench_startup import GUI_MODULE, best_of
+    total, times = best_of((GUI_MODULE,), STARTUP_RUNS)
+    plotting = [module for module in times if module.split('.')[0] in ('matplotlib', 'numpy', 'seaborn')]
+    print(f"  {GUI_MODULE} imported in {total / 1000:.0f} ms ({len(times)} modules)")
+    assert not plotting, f"imports {', '.join(sorted(plotting)[:3])} at startup"
+    assert total / 1000 <= STARTUP_BUDGET_MS, f"over {STARTUP_BUDGET_MS} ms"
+
+
+def run(name, test, *args) -> bool:
+    """Run a test function, printing whether it passed."""
+    print(f"Testing {name}...")
+    try:
+        test(*args)
+        print(f"✓ {name}: PASSED")
+        return True
+    except Exception as e:
+        print(f"✗ {name}: FAILED - {e}")
+        return False
+
+
+def main():
+    print("=" * 50)
+    print("BMI Calculator Pro Performance Test")
+    print("=" * 50)
+
+    passed = int(run("Startup Import Time", test_startup_time))
+    total = 1
+    print()
+
+    if not has_display():
+        print("No display available - skipping GUI performance tests.")
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = make_engine(data_dir)
+            try:
+                tests = [("Time To Display", test_time_to_display)]
+                passed += sum(1 for name, test in tests if run(name, test, engine))
+                total += len(tests)
+            finally:
+                engine.close()
+
+    print("=" * 50)
+    print(f"Test Results: {passed}/{total} tests passed")
+
+    if passed == total:
+        print("🎉 The GUI starts quickly and stays responsive.")
+    else:
+        print("⚠️  The GUI is too slow; see the timings above.")
+    print("=" * 50)
+    if passed != total:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark cold-start time-to-first-message with and without the local cache.
+
+Starts a server on a temporary database with 100 messages in General, then
+measures, over fresh connections, the time from sending the login request
+until the first history message is decrypted and ready for display:
+
+- without cache: login, then get_history round trip
+- with cache:    login, then read and decrypt the local cache
+
+Run from the project directory:
+    python benchmarks/bench_cold_start.py
+"""
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import LocalCache
+from server import ChatServer
+from utils import EncryptionHandler
+
+
+PORT = 5655
+HISTORY_SIZE = 100
+RUNS = 20
+
+
+class Connection:
+    """Minimal line-protocol client"""
+    
+    def __init__(self):
+        self.sock = socket.create_connection(('127.0.0.1', PORT))
+        self.reader = self.sock.makefile('rb')
+        
+    def send(self, data: dict):
+        self.sock.sendall(json.dumps(data).encode('utf-8') + b'\n')
+        
+    def wait_for(self, msg_type: str) -> dict:
+        while True:
+            msg = json.loads(self.reader.readline())
+            if msg.get('type') == msg_type:
+                return msg
+                
+    def close(self):
+        self.sock.close()
+
+
+def login(conn: Connection):
+    conn.send({'action': 'login', 'username': 'bench', 'password': 'bench-password'})
+    conn.wait_for('login')
+
+
+def without_cache(encryption: EncryptionHandler) -> float:
+    conn = Connection()
+    start = time.perf_counter()
+    login(conn)
+    conn.send({'action': 'get_history', 'room_id': 1, 'limit': 100})
+    history = conn.wait_for('history')
+    encryption.decrypt_many([m['content'] for m in history['messages']], 1)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def with_cache(encryption: EncryptionHandler, cache_dir: str) -> float:
+    conn = Connection()
+    start = time.perf_counter()
+    login(conn)
+    cache = LocalCache('bench', cache_dir)
+    cached = cache.get_room_messages(1, 100)
+    encryption.decrypt_many([m['content'] for m in cached], 1)
+    elapsed = time.perf_counter() - start
+    assert len(cached) == HISTORY_SIZE
+    conn.close()
+    return elapsed
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='chat_bench_')
+    server = ChatServer('127.0.0.1', PORT, os.path.join(workdir, 'chat_app.db'))
+    threading.Thread(target=server.start, daemon=True).start()
+    time.sleep(0.3)
+    
+    # Seed an account and room history
+    conn = Connection()
+    conn.send({'action': 'register', 'username': 'bench', 'password': 'bench-password'})
+    conn.wait_for('register')
+    login(conn)
+    for i in range(HISTORY_SIZE):
+        conn.send({'action': 'send_message', 'room_id': 1, 'content': f'message {i}'})
+        conn.wait_for('message')
+    conn.send({'action': 'get_history', 'room_id': 1, 'limit': 100})
+    LocalCache('bench', workdir).save_messages(1, conn.wait_for('history')['messages'])
+    conn.close()
+    
+    encryption = server.encryption
+    cold = [without_cache(encryption) for _ in range(RUNS)]
+    warm = [with_cache(encryption, workdir) for _ in range(RUNS)]
+    print(f"Time to first message, {HISTORY_SIZE}-message history (median of {RUNS}):")
+    print(f"  without cache: {statistics.median(cold) * 1000:7.1f} ms")
+    print(f"  with cache:    {statistics.median(warm) * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
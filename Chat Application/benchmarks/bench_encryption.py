@@ -0,0 +1,61 @@
+"""
+Benchmark message decryption for a 1k-message history and password hashing cost.
+
+Run from the project directory:
+    python benchmarks/bench_encryption.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import EncryptionHandler
+from utils.encryption import CIPHERS
+
+
+HISTORY_SIZE = 1000
+REPEAT = 20
+
+
+def report(label: str, seconds: float):
+    per_history = seconds / REPEAT
+    print(f"{label:<40} {per_history * 1000:8.2f} ms/history "
+          f"({HISTORY_SIZE / per_history:,.0f} msg/s)")
+
+
+def main():
+    master_key = os.urandom(32)
+    contents = [f"history message {i} with some typical chat text :smile:" for i in range(HISTORY_SIZE)]
+    
+    for cipher in CIPHERS:
+        handler = EncryptionHandler(master_key, cipher)
+        tokens = handler.encrypt_many(contents, room_id=1)
+        assert handler.decrypt_many(tokens, room_id=1) == contents
+        print(f"\n[{cipher}]")
+        
+        # Key derived for every message, as a handler without a key cache would
+        def per_message_setup():
+            for token in tokens:
+                EncryptionHandler(master_key, cipher).decrypt(token, 1)
+        
+        def per_message():
+            for token in tokens:
+                handler.decrypt(token, 1)
+        
+        def batched():
+            handler.decrypt_many(tokens, 1)
+        
+        report("decrypt() with per-message key setup", timeit.timeit(per_message_setup, number=REPEAT))
+        report("decrypt() per message", timeit.timeit(per_message, number=REPEAT))
+        report("decrypt_many()", timeit.timeit(batched, number=REPEAT))
+        report("encrypt_many()", timeit.timeit(lambda: handler.encrypt_many(contents, 1), number=REPEAT))
+    
+    print("\n[password hashing]")
+    for iterations in (50000, 200000, 600000):
+        seconds = timeit.timeit(lambda: EncryptionHandler.hash_password('correct horse', iterations), number=3) / 3
+        print(f"pbkdf2_sha256 {iterations:>7} iterations      {seconds * 1000:8.1f} ms/hash")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark 100 MB attachment throughput while monitoring text chat latency.
+
+Starts the chat and file servers on temporary storage, then uploads and
+downloads a random 100 MB file on the file channel while a second client
+keeps sending chat messages and timing their round trip.
+
+Run from the project directory:
+    python benchmarks/bench_file_transfer.py
+"""
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import ChatServer
+from utils import FileTransferClient
+
+
+PORT = 5665
+FILE_PORT = 5666
+FILE_SIZE = 100 * 1024 * 1024
+PROBE_INTERVAL = 0.01
+
+
+class ChatProbe(threading.Thread):
+    """Sends chat messages in a loop and records round-trip latency"""
+    
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.sock = socket.create_connection(('127.0.0.1', PORT))
+        self.reader = self.sock.makefile('rb')
+        self.samples = []
+        self.running = True
+        self.send({'action': 'register', 'username': 'probe', 'password': 'probe-password'})
+        self.wait_for('register')
+        self.send({'action': 'login', 'username': 'probe', 'password': 'probe-password'})
+        self.token = self.wait_for('login')['token']
+        
+    def send(self, data: dict):
+        self.sock.sendall(json.dumps(data).encode('utf-8') + b'\n')
+        
+    def wait_for(self, msg_type: str) -> dict:
+        while True:
+            msg = json.loads(self.reader.readline())
+            if msg.get('type') == msg_type:
+                return msg
+                
+    def take(self) -> list:
+        samples, self.samples = self.samples, []
+        return samples
+        
+    def run(self):
+        while self.running:
+            start = time.perf_counter()
+            self.send({'action': 'send_message', 'room_id': 1, 'content': 'ping'})
+            self.wait_for('message')
+            self.samples.append(time.perf_counter() - start)
+            time.sleep(PROBE_INTERVAL)
+
+
+def latency_summary(samples: list) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {statistics.median(samples) * 1000:6.2f} ms, p99 {p99 * 1000:6.2f} ms ({len(samples)} msgs)"
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='chat_bench_')
+    server = ChatServer('127.0.0.1', PORT, os.path.join(workdir, 'chat_app.db'),
+                        file_port=FILE_PORT, blob_dir=os.path.join(workdir, 'blobs'))
+    threading.Thread(target=server.start, daemon=True).start()
+    time.sleep(0.3)
+    
+    source = os.path.join(workdir, 'payload.bin')
+    with open(source, 'wb') as f:
+        for _ in range(FILE_SIZE // (1024 * 1024)):
+            f.write(os.urandom(1024 * 1024))
+    
+    probe = ChatProbe()
+    probe.start()
+    time.sleep(1.0)
+    print(f"Chat latency idle:          {latency_summary(probe.take())}")
+    
+    with FileTransferClient('127.0.0.1', FILE_PORT, probe.token) as transfer:
+        start = time.perf_counter()
+        descriptor = transfer.upload(source)
+        elapsed = time.perf_counter() - start
+        print(f"Upload 100 MB:              {FILE_SIZE / elapsed / 1e6:8.1f} MB/s (incl. hashing)")
+        print(f"Chat latency during upload: {latency_summary(probe.take())}")
+        
+        start = time.perf_counter()
+        transfer.upload(source)
+        print(f"Re-upload (deduplicated):   {(time.perf_counter() - start) * 1000:8.1f} ms")
+        
+        start = time.perf_counter()
+        transfer.download(descriptor['sha256'], os.path.join(workdir, 'download.bin'))
+        elapsed = time.perf_counter() - start
+        print(f"Download 100 MB:            {FILE_SIZE / elapsed / 1e6:8.1f} MB/s (incl. verification)")
+        print(f"Chat latency during download: {latency_summary(probe.take())}")
+        
+        start = time.perf_counter()
+        transfer.read_range(descriptor['sha256'], FILE_SIZE // 2, 64 * 1024)
+        print(f"64 KB range read:           {(time.perf_counter() - start) * 1000:8.2f} ms")
+    
+    probe.running = False
+
+
+if __name__ == '__main__':
+    main()
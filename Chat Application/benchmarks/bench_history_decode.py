@@ -0,0 +1,113 @@
+"""
+Benchmark GUI-thread stalls while a 10k-message history payload is decoded.
+
+The old client parsed and decrypted history on the GUI thread; the decode
+worker does it off-thread and hands display-ready chunks to the GUI. A GUI
+timer ticking every 5 ms records the longest gap between ticks.
+
+Run from the project directory:
+    python benchmarks/bench_history_decode.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEventLoop, QTimer
+from client import DecodeWorker
+from utils import EncryptionHandler
+
+
+HISTORY_SIZE = 10000
+TICK_MS = 5
+
+
+def build_history_line(encryption: EncryptionHandler) -> bytes:
+    """Build one server 'history' line with encrypted contents"""
+    messages = [{
+        'message_id': i,
+        'sender_id': 1 + i % 3,
+        'sender_username': ('alice', 'bob', 'carol')[i % 3],
+        'room_id': 1,
+        'content': encryption.encrypt(f'history message {i} :thumbsup:'),
+        'message_type': 'text',
+        'timestamp': '2024-01-01 12:00:00',
+        'is_encrypted': True
+    } for i in range(HISTORY_SIZE)]
+    return json.dumps({'type': 'history', 'room_id': 1, 'messages': messages}).encode('utf-8')
+
+
+class StallMonitor:
+    """Records the longest gap between GUI timer ticks"""
+    
+    def __init__(self):
+        self.last = time.perf_counter()
+        self.max_gap = 0.0
+        self.timer = QTimer()
+        self.timer.setInterval(TICK_MS)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start()
+        
+    def tick(self):
+        now = time.perf_counter()
+        self.max_gap = max(self.max_gap, now - self.last)
+        self.last = now
+
+
+def on_gui_thread(encryption: EncryptionHandler, line: bytes) -> float:
+    """Old behaviour: parse and decrypt inside the GUI slot"""
+    start = time.perf_counter()
+    msg = json.loads(line.decode('utf-8'))
+    for m in msg.get('messages', []):
+        try:
+            m['content'] = encryption.decrypt(m['content'])
+        except Exception:
+            pass
+    return time.perf_counter() - start
+
+
+def with_decode_worker(app: QApplication, encryption: EncryptionHandler, line: bytes):
+    """New behaviour: decode worker thread, GUI only receives chunks"""
+    received = []
+    loop = QEventLoop()
+    
+    def on_decoded(messages, live):
+        received.extend(messages)
+        if len(received) >= HISTORY_SIZE:
+            loop.quit()
+    
+    worker = DecodeWorker(encryption)
+    worker.username = 'alice'
+    worker.messages_decoded.connect(on_decoded)
+    worker.start()
+    
+    monitor = StallMonitor()
+    start = time.perf_counter()
+    worker.feed(line)
+    loop.exec_()
+    elapsed = time.perf_counter() - start
+    
+    worker.finish()
+    worker.wait()
+    return elapsed, monitor.max_gap
+
+
+def main():
+    app = QApplication(sys.argv)
+    encryption = EncryptionHandler()
+    line = build_history_line(encryption)
+    
+    stall = on_gui_thread(encryption, line)
+    print(f"GUI-thread decode:  GUI blocked for {stall * 1000:8.1f} ms")
+    
+    elapsed, max_gap = with_decode_worker(app, encryption, line)
+    print(f"Decode worker:      ready after {elapsed * 1000:8.1f} ms, "
+          f"longest GUI stall {max_gap * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
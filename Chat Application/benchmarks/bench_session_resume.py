@@ -0,0 +1,101 @@
+"""
+Benchmark session resumes against full password logins.
+
+Drives the server handlers directly with in-memory clients, so the numbers
+measure server-side work only. A full login runs the password KDF, which is
+slow by design; by default only a sample of logins is timed and the cost of
+the full count is extrapolated from it.
+
+Run from the project directory:
+    python benchmarks/bench_session_resume.py [--count 10000] [--login-sample 100]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import ChatServer
+from utils import EncryptionHandler
+from utils.encryption import PASSWORD_ITERATIONS
+
+
+USERNAME = 'bench_user'
+PASSWORD = 'correct horse battery staple'
+
+
+class FakeClient:
+    """Stands in for a ClientThread, keeping the last response of each type"""
+
+    def __init__(self):
+        self.user_id = None
+        self.username = None
+        self.responses = {}
+
+    def send(self, payload: dict):
+        self.responses[payload['type']] = payload
+
+
+def report(label: str, count: int, seconds: float):
+    print(f"{label:<28} {count:>6} ops  {seconds:8.3f} s  {seconds / count * 1e6:10.1f} us/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=10000, help='number of reconnects to compare')
+    parser.add_argument('--login-sample', type=int, default=100,
+                        help='full logins actually timed (use --count for all of them)')
+    args = parser.parse_args()
+
+    # The server logs every disconnect; keep that out of the timings
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        server = ChatServer('127.0.0.1', 0, db_path=os.path.join(tmp, 'bench.db'),
+                            blob_dir=os.path.join(tmp, 'blobs'))
+        server.db.create_user(USERNAME, EncryptionHandler.hash_password(PASSWORD), None)
+
+        client = FakeClient()
+        server.handle_login(client, USERNAME, PASSWORD)
+        response = client.responses['login']
+        assert response['success'], response
+        token = response['token']
+        server.disconnect_client(client)
+
+        login_count = min(args.login_sample, args.count)
+        start = time.perf_counter()
+        for _ in range(login_count):
+            client = FakeClient()
+            server.handle_login(client, USERNAME, PASSWORD)
+            server.disconnect_client(client)
+        login_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.count):
+            client = FakeClient()
+            server.handle_resume(client, token)
+            server.disconnect_client(client)
+        resume_seconds = time.perf_counter() - start
+        assert client.responses['resume']['success'], client.responses
+
+        start = time.perf_counter()
+        for _ in range(args.count):
+            server.sessions.verify(token)
+        verify_seconds = time.perf_counter() - start
+
+    print(f"{args.count} reconnects, PBKDF2 with {PASSWORD_ITERATIONS} iterations")
+    report("full login", login_count, login_seconds)
+    if login_count < args.count:
+        projected = login_seconds / login_count * args.count
+        print(f"{'full login (projected)':<28} {args.count:>6} ops  {projected:8.3f} s")
+    else:
+        projected = login_seconds
+    report("resume", args.count, resume_seconds)
+    report("token verify only", args.count, verify_seconds)
+    print(f"\nresume is {projected / resume_seconds:,.0f}x faster than a full login")
+
+
+if __name__ == '__main__':
+    main()
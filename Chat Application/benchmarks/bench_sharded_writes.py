@@ -0,0 +1,64 @@
+"""
+Benchmark aggregate message write throughput with sharded storage.
+
+Writer threads, one per room, save messages concurrently through
+DatabaseHandler. "single" is the original one-file layout; the other runs
+spread the rooms over 1, 4 and 16 shard files.
+
+Run from the project directory:
+    python benchmarks/bench_sharded_writes.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseHandler, Message
+
+
+ROOMS = 16
+MESSAGES_PER_ROOM = 300
+LAYOUTS = (0, 1, 4, 16)
+
+
+def run(shards: int) -> float:
+    """Return messages written per second"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseHandler(os.path.join(tmp, 'bench.db'), shards)
+        user_id = db.create_user('writer', 'x')
+        room_ids = [1] + [db.create_room(f'room{i}', user_id) for i in range(1, ROOMS)]
+        
+        def write(room_id: int):
+            for i in range(MESSAGES_PER_ROOM):
+                db.save_message(Message(sender_id=user_id, sender_username='writer', room_id=room_id,
+                                        content=f'message {i} ' + 'x' * 100))
+        
+        threads = [threading.Thread(target=write, args=(room_id,)) for room_id in room_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        
+        assert all(len(db.get_room_messages(room_id, MESSAGES_PER_ROOM * 2)) == MESSAGES_PER_ROOM
+                   for room_id in room_ids)
+        db.close()
+        return ROOMS * MESSAGES_PER_ROOM / elapsed
+
+
+def main():
+    print(f"{ROOMS} rooms x {MESSAGES_PER_ROOM} messages, one writer thread per room\n")
+    baseline = None
+    for shards in LAYOUTS:
+        rate = run(shards)
+        baseline = baseline or rate
+        label = 'single' if shards == 0 else f'{shards} shard(s)'
+        print(f"{label:<12} {rate:10,.0f} msg/s  {rate / baseline:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
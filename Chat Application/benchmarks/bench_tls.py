@@ -0,0 +1,177 @@
+"""
+Benchmark TLS handshake rate and steady-state message throughput.
+
+Generates a self-signed certificate for 127.0.0.1, then starts three servers:
+
+- plain:          raw TCP, per-message encryption (the default without TLS)
+- tls:            TLS, per-message encryption dropped
+- tls+encrypt:    TLS and per-message encryption
+
+Handshakes are measured as full handshakes and as resumptions of a TLS 1.3
+session ticket. Throughput is one logged-in client sending messages to
+General and reading (and, where needed, decrypting) the broadcasts back.
+
+Run from the project directory:
+    python benchmarks/bench_tls.py
+"""
+import datetime
+import ipaddress
+import json
+import os
+import socket
+import ssl
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from server import ChatServer
+from utils import EncryptionHandler
+from utils.tls import create_client_context, create_server_context
+
+
+HOST = '127.0.0.1'
+BASE_PORT = 5675
+HANDSHAKES = 300
+MESSAGES = 3000
+
+
+def write_certificate(directory: str) -> str:
+    """Write a self-signed certificate and key for HOST, returning the PEM path"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, HOST)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(HOST))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    path = os.path.join(directory, 'bench_cert.pem')
+    with open(path, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    return path
+
+
+class Connection:
+    """Minimal line-protocol client"""
+
+    def __init__(self, port: int, context: ssl.SSLContext = None, session: ssl.SSLSession = None):
+        self.sock = socket.create_connection((HOST, port))
+        if context:
+            self.sock = context.wrap_socket(self.sock, server_hostname=HOST, session=session)
+        self.reader = self.sock.makefile('rb')
+
+    def send(self, data: dict):
+        self.sock.sendall(json.dumps(data).encode('utf-8') + b'\n')
+
+    def read(self) -> dict:
+        return json.loads(self.reader.readline())
+
+    def wait_for(self, msg_type: str) -> dict:
+        while True:
+            msg = self.read()
+            if msg.get('type') == msg_type:
+                return msg
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def handshake_rate(port: int, context: ssl.SSLContext = None, resume: bool = False) -> float:
+    """Connections per second, each completing a handshake and one round trip"""
+    session = None
+    if resume:
+        conn = Connection(port, context)
+        conn.send({'action': 'ping'})
+        conn.read()  # TLS 1.3 tickets arrive after the handshake
+        session = conn.sock.session
+        conn.close()
+
+    start = time.perf_counter()
+    for _ in range(HANDSHAKES):
+        conn = Connection(port, context, session)
+        conn.send({'action': 'ping'})
+        conn.read()
+        if resume:
+            assert conn.sock.session_reused
+        conn.close()
+    return HANDSHAKES / (time.perf_counter() - start)
+
+
+def throughput(port: int, context: ssl.SSLContext, username: str) -> float:
+    """Messages per second sent, broadcast back and decoded"""
+    encryption = EncryptionHandler()
+    conn = Connection(port, context)
+    conn.send({'action': 'register', 'username': username, 'password': 'pw'})
+    conn.wait_for('register')
+    conn.send({'action': 'login', 'username': username, 'password': 'pw'})
+    conn.wait_for('login')
+
+    def send_all():
+        for i in range(MESSAGES):
+            conn.send({'action': 'send_message', 'room_id': 1, 'content': f'message {i} ' + 'x' * 100})
+
+    start = time.perf_counter()
+    sender = threading.Thread(target=send_all)
+    sender.start()
+    for _ in range(MESSAGES):
+        msg = conn.wait_for('message')
+        if msg.get('is_encrypted', True):
+            encryption.decrypt(msg['content'], 1)
+    elapsed = time.perf_counter() - start
+    sender.join()
+    conn.close()
+    return MESSAGES / elapsed
+
+
+def main():
+    # The servers keep running in daemon threads until exit
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        cert = write_certificate(tmp)
+        server_context = create_server_context(cert)
+        client_context = create_client_context(cert)
+
+        setups = [
+            ('plain', None, None),
+            ('tls', server_context, None),
+            ('tls+encrypt', server_context, True),
+        ]
+        ports = {}
+        for i, (label, context, encrypt) in enumerate(setups):
+            port = BASE_PORT + 2 * i
+            server = ChatServer(HOST, port, db_path=os.path.join(tmp, f'{label}.db'), file_port=port + 1,
+                                blob_dir=os.path.join(tmp, 'blobs'), shards=1,
+                                ssl_context=context, encrypt_messages=encrypt)
+            threading.Thread(target=server.start, daemon=True).start()
+            ports[label] = port
+        time.sleep(0.5)
+
+        print(f"\nHandshakes ({HANDSHAKES} connections, each with one round trip)")
+        print(f"{'tcp only':<20} {handshake_rate(ports['plain']):10,.0f} conn/s")
+        print(f"{'tls full':<20} {handshake_rate(ports['tls'], client_context):10,.0f} conn/s")
+        print(f"{'tls resumed':<20} {handshake_rate(ports['tls'], client_context, resume=True):10,.0f} conn/s")
+
+        print(f"\nThroughput ({MESSAGES} messages of ~110 bytes)")
+        for label, context, _ in setups:
+            rate = throughput(ports[label], client_context if context else None, f'bench_{label.replace("+", "_")}')
+            print(f"{label:<20} {rate:10,.0f} msg/s")
+
+
+if __name__ == '__main__':
+    main()
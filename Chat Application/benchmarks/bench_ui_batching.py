@@ -0,0 +1,91 @@
+"""
+Benchmark GUI-thread time for a 1000-message burst in the chat window.
+
+Messages are delivered the way the network thread delivers them, with the
+event loop turning between arrivals. Compares the old per-message path (one
+bubble, animation and scroll timer per message) against coalescing arrivals
+into one batched update per frame interval.
+
+Run from the project directory:
+    python benchmarks/bench_ui_batching.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEventLoop, QTimer, qInstallMessageHandler
+from gui import ChatWindow
+
+
+BURST_SIZE = 1000
+MESSAGES_PER_FRAME = 16  # one message per millisecond, 16 ms frames
+SETTLE_SECONDS = 0.6  # long enough for scroll timers and fade-in animations
+
+
+def make_messages(count: int) -> list:
+    """Build a burst of received messages"""
+    return [
+        ({'sender': 'bob', 'content': f'message {i} :smile:', 'timestamp': None,
+          'message_type': 'text'}, False)
+        for i in range(count)
+    ]
+
+
+def settle(app: QApplication):
+    """Run the event loop idle until pending timers and animations finish"""
+    loop = QEventLoop()
+    QTimer.singleShot(int(SETTLE_SECONDS * 1000), loop.quit)
+    loop.exec_()
+
+
+def run(app: QApplication, label: str, apply_burst) -> float:
+    """Measure GUI-thread CPU time for one burst, including settling"""
+    window = ChatWindow({'username': 'alice'})
+    window.show()
+    settle(app)
+    
+    messages = make_messages(BURST_SIZE)
+    start = time.process_time()
+    apply_burst(app, window, messages)
+    settle(app)
+    elapsed = time.process_time() - start
+    
+    window.close()
+    window.deleteLater()
+    settle(app)
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms GUI-thread CPU per {BURST_SIZE} messages")
+    return elapsed
+
+
+def per_message(app, window, messages):
+    for message, is_sent in messages:
+        window.add_message(message, is_sent)
+        app.processEvents()
+
+
+def batched(app, window, messages):
+    pending = []
+    for message, is_sent in messages:
+        pending.append((message, is_sent))
+        if len(pending) >= MESSAGES_PER_FRAME:
+            window.add_messages(pending)
+            pending = []
+        app.processEvents()
+    window.add_messages(pending)
+
+
+def main():
+    # Nested opacity effects spam painter warnings in the per-message path
+    qInstallMessageHandler(lambda *args: None)
+    app = QApplication(sys.argv)
+    baseline = run(app, "per-message add_message", per_message)
+    improved = run(app, "batched add_messages", batched)
+    print(f"Speedup: {baseline / improved:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
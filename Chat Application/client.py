@@ -3,55 +3,237 @@ Main client application with PyQt5 GUI and network handling
 """
 import sys
 import socket
+import ssl
 import json
+import queue
 import threading
+from datetime import datetime
+import emoji
 from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtCore import QObject, pyqtSignal, QThread
+from PyQt5.QtCore import QObject, pyqtSignal, QThread, QTimer
 from gui import LoginWindow, ChatWindow
-from utils import EncryptionHandler, NotificationManager
+from database import LocalCache
+from utils import EncryptionHandler, NotificationManager, FileTransferClient
+from utils.tls import create_client_context
 
 
 HOST = '127.0.0.1'
 PORT = 5555
+FILE_PORT = 5556
 
+# Incoming messages are coalesced and applied to the window once per frame
+FRAME_INTERVAL_MS = 16
+MAX_MESSAGES_PER_FRAME = 200
 
-class NetworkThread(QThread):
-    """Thread for handling network communication"""
+RECV_BUFFER_SIZE = 65536
+# History payloads are decoded and handed to the GUI in chunks of this size
+HISTORY_DECODE_CHUNK = 500
+
+# Delays between attempts to resume a session after the connection drops
+RECONNECT_DELAYS_MS = (500, 1000, 2000, 4000)
+
+
+class DecodeWorker(QThread):
+    """Thread that parses, decrypts and prepares server messages for display"""
     
     message_received = pyqtSignal(dict)
+    messages_decoded = pyqtSignal(list, bool)  # display-ready (message, is_sent) pairs, live
     disconnected = pyqtSignal()
     
-    def __init__(self, sock: socket.socket):
+    def __init__(self, encryption: EncryptionHandler):
+        super().__init__()
+        self.encryption = encryption
+        self.username = None
+        self.cache = None
+        self.lines = queue.Queue()
+        
+    def feed(self, line: bytes):
+        """Queue a raw protocol line for decoding"""
+        self.lines.put(line)
+        
+    def load_cached(self, room_id: int, limit: int = 100):
+        """Queue a request to emit cached history of a room"""
+        self.lines.put(('cached', room_id, limit))
+        
+    def finish(self):
+        """Signal end of stream; disconnected is emitted after pending lines"""
+        self.lines.put(None)
+        
+    def run(self):
+        """Decode lines in arrival order"""
+        while True:
+            line = self.lines.get()
+            if line is None:
+                break
+            if isinstance(line, tuple):
+                self.emit_cached(*line[1:])
+                continue
+            try:
+                msg = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            self.decode(msg)
+            
+        self.disconnected.emit()
+        
+    def decode(self, msg: dict):
+        """Turn one server message into signals for the GUI thread"""
+        msg_type = msg.get('type')
+        
+        if msg_type == 'message':
+            room_id = msg.get('room_id', 1)
+            content = self.message_contents([msg], room_id)[0]
+            display_msg = self.prepare_message(msg, msg.get('sender'), content)
+            self.messages_decoded.emit([(display_msg, display_msg['is_sent'])], True)
+            self.store(room_id, [msg])
+            
+        elif msg_type == 'history':
+            room_id = msg.get('room_id', 1)
+            messages = msg.get('messages', [])
+            self.emit_history(room_id, messages)
+            self.store(room_id, messages)
+            if msg.get('has_more'):
+                # Cached now, so the next page starts after these
+                self.message_received.emit({'type': 'history_more', 'room_id': room_id})
+            
+        else:
+            if msg_type == 'login' and msg.get('success'):
+                self.username = msg.get('user', {}).get('username')
+            elif msg_type == 'rooms' and self.cache:
+                self.cache.save_rooms(msg.get('rooms', []))
+            self.message_received.emit(msg)
+            
+    def message_contents(self, messages: list, room_id: int) -> list:
+        """Plaintext contents of messages; only encrypted ones are decrypted"""
+        encrypted = [m.get('content', '') for m in messages if m.get('is_encrypted', True)]
+        if len(encrypted) == len(messages):
+            return self.encryption.decrypt_many(encrypted, room_id)
+        decrypted = iter(self.encryption.decrypt_many(encrypted, room_id))
+        return [next(decrypted) if m.get('is_encrypted', True) else m.get('content', '') for m in messages]
+            
+    def emit_history(self, room_id: int, messages: list):
+        """Decrypt and emit history messages in chunks"""
+        for i in range(0, len(messages), HISTORY_DECODE_CHUNK):
+            chunk = messages[i:i + HISTORY_DECODE_CHUNK]
+            contents = self.message_contents(chunk, room_id)
+            prepared = [
+                self.prepare_message(m, m.get('sender_username'), content)
+                for m, content in zip(chunk, contents)
+            ]
+            self.messages_decoded.emit([(m, m['is_sent']) for m in prepared], False)
+            
+    def emit_cached(self, room_id: int, limit: int):
+        """Emit cached history of a room"""
+        if self.cache:
+            try:
+                self.emit_history(room_id, self.cache.get_room_messages(room_id, limit))
+            except Exception as e:
+                print(f"Cache error: {e}")
+                
+    def store(self, room_id: int, messages: list):
+        """Write received messages to the local cache"""
+        if self.cache:
+            try:
+                self.cache.save_messages(room_id, messages)
+            except Exception as e:
+                print(f"Cache error: {e}")
+            
+    def prepare_message(self, msg: dict, sender: str, content: str) -> dict:
+        """Build a display-ready message dict from decrypted content"""
+        message_type = msg.get('message_type', 'text')
+        attachment = None
+        if message_type in ('file', 'image'):
+            try:
+                attachment = json.loads(content)
+                content = f"📎 {attachment.get('name', 'file')}"
+            except (json.JSONDecodeError, AttributeError):
+                attachment = None
+        else:
+            content = emoji.emojize(content, language='alias')
+        
+        timestamp = msg.get('timestamp')
+        if timestamp:
+            try:
+                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                time_str = dt.strftime('%I:%M %p')
+            except ValueError:
+                time_str = timestamp
+        else:
+            time_str = datetime.now().strftime('%I:%M %p')
+        
+        return {
+            'message_id': msg.get('message_id'),
+            'room_id': msg.get('room_id'),
+            'sender': sender,
+            'sender_username': sender,
+            'content': content,
+            'attachment': attachment,
+            'timestamp': timestamp,
+            'time_str': time_str,
+            'message_type': message_type,
+            'is_sent': sender == self.username,
+            'prepared': True
+        }
+        
+
+class FileTransferThread(QThread):
+    """Thread running one file server operation"""
+    
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, operation, token: str, ssl_context, *args):
+        super().__init__()
+        self.operation = operation
+        self.token = token
+        self.ssl_context = ssl_context
+        self.args = args
+        
+    def run(self):
+        """Open a file server connection and run the operation"""
+        try:
+            with FileTransferClient(HOST, FILE_PORT, self.token, ssl_context=self.ssl_context) as transfer:
+                result = getattr(transfer, self.operation)(*self.args)
+            self.succeeded.emit(result)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class NetworkThread(QThread):
+    """Thread for handling network communication"""
+    
+    def __init__(self, sock: socket.socket, decoder: DecodeWorker):
         super().__init__()
         self.sock = sock
+        self.decoder = decoder
         self.running = True
-        self.buffer = b''
+        self.buffer = bytearray()
         
     def run(self):
-        """Receive messages from server"""
+        """Receive messages from server and hand complete lines to the decoder"""
         while self.running:
             try:
-                data = self.sock.recv(4096)
+                data = self.sock.recv(RECV_BUFFER_SIZE)
                 if not data:
                     break
                     
+                scan_from = len(self.buffer)
                 self.buffer += data
-                while b'\n' in self.buffer:
-                    line, self.buffer = self.buffer.split(b'\n', 1)
-                    if not line:
-                        continue
-                    try:
-                        msg = json.loads(line.decode('utf-8'))
-                        self.message_received.emit(msg)
-                    except json.JSONDecodeError:
-                        continue
+                newline = self.buffer.find(b'\n', scan_from)
+                start = 0
+                while newline != -1:
+                    if newline > start:
+                        self.decoder.feed(bytes(self.buffer[start:newline]))
+                    start = newline + 1
+                    newline = self.buffer.find(b'\n', start)
+                del self.buffer[:start]
             except ConnectionResetError:
                 break
             except Exception as e:
                 print(f"Network error: {e}")
                 break
                 
-        self.disconnected.emit()
+        self.decoder.finish()
         
     def stop(self):
         """Stop the network thread"""
@@ -69,12 +251,29 @@ class ChatClient(QObject):
         super().__init__()
         self.sock = None
         self.network_thread = None
+        self.decode_worker = None
         self.encryption = EncryptionHandler()
         self.notification_manager = NotificationManager()
+        # TLS is used when CHAT_TLS_CA names the server certificate to trust
+        self.ssl_context = create_client_context()
+        self.tls_session = None
         
         self.login_window = None
         self.chat_window = None
         self.user_data = None
+        self.session_token = None
+        self.reconnect_attempt = 0
+        self.local_cache = None
+        self.seen_message_ids = set()
+        self.transfers = []
+        
+        # Pending (message, is_sent) pairs waiting for the next frame
+        self.pending_messages = []
+        self.pending_notification = None
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FRAME_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush_pending_messages)
         
     def start(self):
         """Start the application"""
@@ -83,21 +282,32 @@ class ChatClient(QObject):
         self.login_window.login_success.connect(self.handle_auth)
         self.login_window.show()
         
-    def connect_to_server(self) -> bool:
+    def connect_to_server(self, quiet: bool = False) -> bool:
         """Connect to chat server"""
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect((HOST, PORT))
+            self.sock = socket.create_connection((HOST, PORT))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.ssl_context:
+                # Resuming the previous TLS session skips the full handshake on reconnect
+                self.sock = self.ssl_context.wrap_socket(self.sock, server_hostname=HOST,
+                                                         session=self.tls_session)
             
-            # Start network thread
-            self.network_thread = NetworkThread(self.sock)
-            self.network_thread.message_received.connect(self.handle_server_message)
-            self.network_thread.disconnected.connect(self.handle_disconnection)
+            # Start decode worker and network thread
+            self.decode_worker = DecodeWorker(self.encryption)
+            self.decode_worker.message_received.connect(self.handle_server_message)
+            self.decode_worker.messages_decoded.connect(self.handle_decoded_messages)
+            self.decode_worker.disconnected.connect(self.handle_disconnection)
+            self.decode_worker.start()
+            
+            self.network_thread = NetworkThread(self.sock, self.decode_worker)
             self.network_thread.start()
             
             return True
         except Exception as e:
             print(f"Connection error: {e}")
+            self.sock = None
+            if quiet:
+                return False
             QMessageBox.critical(None, "Connection Error", 
                                f"Could not connect to server.\nMake sure the server is running on {HOST}:{PORT}")
             return False
@@ -142,46 +352,34 @@ class ChatClient(QObject):
         elif msg_type == 'login':
             if msg.get('success'):
                 self.user_data = msg.get('user')
+                self.session_token = msg.get('token')
+                self.remember_tls_session()
+                self.local_cache = LocalCache(self.user_data.get('username'))
+                self.decode_worker.cache = self.local_cache
                 self.show_chat_window()
-                # Request message history
-                self.send_message({'action': 'get_history', 'room_id': 1, 'limit': 100})
+                
+                # Show cached history right away, then fetch only newer messages
+                self.decode_worker.load_cached(1)
+                self.request_new_history()
             else:
                 self.login_window.show_error(msg.get('message', 'Login failed'))
                 self.login_window.reset_button()
                 
-        elif msg_type == 'message':
-            if self.chat_window:
-                content = msg.get('content', '')
-                # Decrypt message
-                decrypted = self.encryption.decrypt(content)
-                
-                display_msg = {
-                    'sender': msg.get('sender'),
-                    'content': decrypted,
-                    'timestamp': None,
-                    'message_type': msg.get('message_type', 'text')
-                }
-                
-                is_sent = msg.get('sender') == self.user_data.get('username')
-                self.chat_window.add_message(display_msg, is_sent)
+        elif msg_type == 'resume':
+            if msg.get('success'):
+                self.remember_tls_session()
+                self.reconnect_attempt = 0
+                self.chat_window.show_notification("Reconnected", "Connection to server restored")
+                # Fetch whatever arrived while disconnected
+                self.request_new_history()
+            else:
+                self.session_token = None
+                QMessageBox.warning(None, "Session Expired", "Your session has expired. Please log in again.")
+                self.disconnect()
                 
-                # Show notification if not sent by self
-                if not is_sent:
-                    self.notification_manager.notify_new_message(
-                        msg.get('sender', 'Someone'),
-                        decrypted
-                    )
-                    
-        elif msg_type == 'history':
-            if self.chat_window:
-                messages = msg.get('messages', [])
-                # Decrypt all messages
-                for m in messages:
-                    try:
-                        m['content'] = self.encryption.decrypt(m['content'])
-                    except:
-                        pass
-                self.chat_window.load_message_history(messages)
+        elif msg_type == 'history_more':
+            # Still catching up; page forward until the server has nothing newer
+            self.request_new_history(msg.get('room_id', 1))
                 
         elif msg_type == 'user_joined':
             username = msg.get('username')
@@ -192,6 +390,71 @@ class ChatClient(QObject):
         elif msg_type == 'error':
             QMessageBox.warning(None, "Error", msg.get('message', 'An error occurred'))
             
+    def remember_tls_session(self):
+        """Keep the TLS session for resuming it on reconnect"""
+        # Tickets arrive after the handshake, so this is only set once the server has replied
+        if isinstance(self.sock, ssl.SSLSocket) and self.sock.session:
+            self.tls_session = self.sock.session
+            
+    def request_new_history(self, room_id: int = 1):
+        """Fetch the next page of messages newer than the newest cached one"""
+        self.send_message({
+            'action': 'get_history',
+            'room_id': room_id,
+            'limit': 100,
+            'after_id': self.local_cache.get_last_message_id(room_id)
+        })
+        
+    def handle_decoded_messages(self, messages: list, live: bool):
+        """Handle display-ready chat messages from the decode worker"""
+        if not self.chat_window:
+            return
+        
+        # Cached, fetched and live copies of a message may overlap
+        fresh = []
+        for message, is_sent in messages:
+            message_id = message.get('message_id')
+            if message_id is not None:
+                if message_id in self.seen_message_ids:
+                    continue
+                self.seen_message_ids.add(message_id)
+            fresh.append((message, is_sent))
+        messages = fresh
+        self.queue_messages(messages)
+        
+        # Remember the newest notification; shown once per batch
+        if live:
+            for message, is_sent in reversed(messages):
+                if not is_sent:
+                    self.pending_notification = (message.get('sender') or 'Someone', message['content'])
+                    break
+            
+    def queue_messages(self, messages: list):
+        """Queue (message, is_sent) pairs for the next frame update"""
+        self.pending_messages.extend(messages)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+            
+    def flush_pending_messages(self):
+        """Apply queued messages to the chat window as one batch"""
+        if not self.chat_window:
+            self.pending_messages = []
+            return
+        
+        batch = self.pending_messages[:MAX_MESSAGES_PER_FRAME]
+        del self.pending_messages[:MAX_MESSAGES_PER_FRAME]
+        self.chat_window.add_messages(batch)
+        
+        # Show notification if not sent by self
+        if self.pending_notification:
+            sender, content = self.pending_notification
+            self.pending_notification = None
+            self.notification_manager.notify_new_message(sender, content)
+        
+        # Spread very large bursts over several frames
+        if self.pending_messages:
+            self.flush_timer.start()
+            
     def show_chat_window(self):
         """Show chat window and hide login window"""
         self.login_window.hide()
@@ -199,6 +462,9 @@ class ChatClient(QObject):
         self.chat_window = ChatWindow(self.user_data)
         self.chat_window.send_message.connect(self.send_chat_message)
         self.chat_window.disconnect_requested.connect(self.disconnect)
+        self.chat_window.attach_requested.connect(self.upload_attachment)
+        self.chat_window.download_requested.connect(self.download_attachment)
+        self.chat_window.thumbnail_requested.connect(self.fetch_thumbnail)
         self.chat_window.show()
         
     def send_chat_message(self, content: str, message_type: str):
@@ -210,6 +476,45 @@ class ChatClient(QObject):
             'message_type': message_type
         })
         
+    def run_transfer(self, operation: str, args: tuple, on_success, error_title: str):
+        """Run a file transfer in the background"""
+        thread = FileTransferThread(operation, self.session_token, self.ssl_context, *args)
+        thread.succeeded.connect(on_success)
+        if error_title:
+            thread.failed.connect(lambda error: self.show_transfer_error(error_title, error))
+        thread.finished.connect(lambda: self.transfers.remove(thread))
+        self.transfers.append(thread)
+        thread.start()
+        
+    def show_transfer_error(self, title: str, error: str):
+        """Show a failed transfer in the chat window"""
+        if self.chat_window:
+            self.chat_window.show_notification(title, error)
+            
+    def upload_attachment(self, file_path: str):
+        """Upload a file, then send a message referencing it"""
+        def on_uploaded(descriptor: dict):
+            message_type = 'image' if descriptor['mime'].startswith('image/') else 'file'
+            self.send_chat_message(json.dumps(descriptor), message_type)
+        
+        self.run_transfer('upload', (file_path,), on_uploaded, "Upload Failed")
+        
+    def download_attachment(self, attachment: dict, dest_path: str):
+        """Download an attachment to dest_path"""
+        def on_downloaded(path: str):
+            if self.chat_window:
+                self.chat_window.show_notification("Download Complete", attachment.get('name', path))
+        
+        self.run_transfer('download', (attachment['sha256'], dest_path), on_downloaded, "Download Failed")
+        
+    def fetch_thumbnail(self, sha256: str):
+        """Fetch an image thumbnail for the chat window"""
+        def on_thumbnail(data):
+            if data and self.chat_window:
+                self.chat_window.set_thumbnail(sha256, data)
+        
+        self.run_transfer('thumbnail', (sha256,), on_thumbnail, None)
+        
     def send_message(self, data: dict):
         """Send message to server"""
         if self.sock:
@@ -221,9 +526,33 @@ class ChatClient(QObject):
                 
     def disconnect(self):
         """Disconnect from server"""
+        self.flush_timer.stop()
+        self.pending_messages = []
+        self.pending_notification = None
+        self.seen_message_ids = set()
+        self.local_cache = None
+        if self.session_token:
+            # Revoke the token on the server so it cannot be replayed
+            self.send_message({'action': 'logout', 'token': self.session_token})
+        self.session_token = None
+        self.close_connection()
+        
+        # Close chat window
+        if self.chat_window:
+            self.chat_window.close()
+            self.chat_window = None
+        
+        # Reset and show login window
+        self.user_data = None
+        self.login_window.show()
+        self.login_window.reset_button()
+        
+    def close_connection(self):
+        """Stop the network threads and close the socket"""
         # Stop network thread first
         if self.network_thread:
             self.network_thread.stop()
+            self.network_thread.wait(1000)
             self.network_thread = None
             
         # Close socket
@@ -233,21 +562,44 @@ class ChatClient(QObject):
             except:
                 pass
             self.sock = None
-        
-        # Close chat window
-        if self.chat_window:
-            self.chat_window.close()
-            self.chat_window = None
-        
-        # Reset and show login window
-        self.user_data = None
-        self.login_window.show()
-        self.login_window.reset_button()
+            
+        if self.decode_worker:
+            self.decode_worker.wait(1000)
+            self.decode_worker = None
         
     def handle_disconnection(self):
         """Handle unexpected disconnection"""
+        # Ignore the end of a connection that was closed on purpose
+        if self.decode_worker is None or self.sender() is not self.decode_worker:
+            return
+        self.close_connection()
+        
+        if self.session_token and self.chat_window:
+            self.reconnect_attempt = 0
+            self.chat_window.show_notification("Connection Lost", "Reconnecting...")
+            QTimer.singleShot(RECONNECT_DELAYS_MS[0], self.reconnect)
+            return
+        
         QMessageBox.warning(None, "Disconnected", "Connection to server lost.")
         self.disconnect()
+        
+    def reconnect(self):
+        """Reconnect and resume the session with its token"""
+        if not self.session_token or not self.chat_window or self.sock:
+            return
+        
+        if self.connect_to_server(quiet=True):
+            self.decode_worker.username = self.user_data.get('username')
+            self.decode_worker.cache = self.local_cache
+            self.send_message({'action': 'resume', 'token': self.session_token})
+            return
+        
+        self.reconnect_attempt += 1
+        if self.reconnect_attempt < len(RECONNECT_DELAYS_MS):
+            QTimer.singleShot(RECONNECT_DELAYS_MS[self.reconnect_attempt], self.reconnect)
+        else:
+            QMessageBox.warning(None, "Disconnected", "Could not reconnect to the server.")
+            self.disconnect()
 
 
 def main():
@@ -2,6 +2,7 @@
 Database package for chat application
 """
 from .db_handler import DatabaseHandler
+from .local_cache import LocalCache
 from .models import User, Message, ChatRoom, RoomMembership
 
-__all__ = ['DatabaseHandler', 'User', 'Message', 'ChatRoom', 'RoomMembership']
+__all__ = ['DatabaseHandler', 'LocalCache', 'User', 'Message', 'ChatRoom', 'RoomMembership']
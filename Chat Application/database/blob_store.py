@@ -0,0 +1,125 @@
+"""
+Content-addressed blob store for file and image attachments
+"""
+import hashlib
+import io
+import os
+import re
+from typing import Iterator, Optional
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+BLOB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'blobs')
+CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_SIZE = (256, 256)
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class BlobStore:
+    """Stores each file once under its SHA-256 digest"""
+    
+    def __init__(self, root: str = BLOB_DIR):
+        """Initialize store directories"""
+        self.root = root
+        self.partial_dir = os.path.join(root, 'partial')
+        self.thumb_dir = os.path.join(root, 'thumbs')
+        os.makedirs(self.partial_dir, exist_ok=True)
+        os.makedirs(self.thumb_dir, exist_ok=True)
+    
+    @staticmethod
+    def is_valid_digest(sha256: str) -> bool:
+        """Check that a digest is a lowercase hex SHA-256"""
+        return isinstance(sha256, str) and bool(SHA256_PATTERN.match(sha256))
+    
+    def blob_path(self, sha256: str) -> str:
+        """Get the final path of a blob"""
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+    
+    def partial_path(self, sha256: str) -> str:
+        """Get the path of an in-progress upload"""
+        return os.path.join(self.partial_dir, f"{sha256}.part")
+    
+    def thumbnail_path(self, sha256: str) -> str:
+        """Get the path of a blob's thumbnail"""
+        return os.path.join(self.thumb_dir, f"{sha256}.jpg")
+    
+    def has(self, sha256: str) -> bool:
+        """Check whether a complete blob exists"""
+        return os.path.exists(self.blob_path(sha256))
+    
+    def size(self, sha256: str) -> int:
+        """Get the size of a complete blob"""
+        return os.path.getsize(self.blob_path(sha256))
+    
+    def partial_size(self, sha256: str) -> int:
+        """Get how many bytes of an upload were already received"""
+        try:
+            return os.path.getsize(self.partial_path(sha256))
+        except OSError:
+            return 0
+    
+    def open_partial(self, sha256: str, offset: int):
+        """Open an in-progress upload for appending at offset"""
+        f = open(self.partial_path(sha256), 'ab')
+        f.truncate(offset)
+        f.seek(offset)
+        return f
+    
+    def finalize(self, sha256: str) -> bool:
+        """Verify a finished upload and move it into the store"""
+        partial = self.partial_path(sha256)
+        digest = hashlib.sha256()
+        with open(partial, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        if digest.hexdigest() != sha256:
+            os.remove(partial)
+            return False
+        
+        final = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(partial, final)
+        self.create_thumbnail(sha256)
+        return True
+    
+    def read_range(self, sha256: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        """Yield a byte range of a blob in chunks"""
+        remaining = self.size(sha256) - offset if length is None else length
+        with open(self.blob_path(sha256), 'rb') as f:
+            f.seek(offset)
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    
+    def create_thumbnail(self, sha256: str) -> Optional[str]:
+        """Create the thumbnail of an image blob once; None for non-images"""
+        path = self.thumbnail_path(sha256)
+        if os.path.exists(path):
+            return path
+        if Image is None:
+            return None
+        try:
+            with Image.open(self.blob_path(sha256)) as img:
+                img.thumbnail(THUMBNAIL_SIZE)
+                buffer = io.BytesIO()
+                img.convert('RGB').save(buffer, 'JPEG', quality=80)
+        except Exception:
+            return None
+        with open(path, 'wb') as f:
+            f.write(buffer.getvalue())
+        return path
+    
+    def get_thumbnail(self, sha256: str) -> Optional[bytes]:
+        """Get thumbnail bytes of an image blob"""
+        path = self.thumbnail_path(sha256)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
@@ -1,19 +1,41 @@
 """
 Database handler for SQLite operations
 """
+import heapq
+import os
 import sqlite3
+import threading
+import time
 from datetime import datetime
 from typing import List, Optional, Tuple
 from .models import User, Message, ChatRoom, RoomMembership
 
 
 class DatabaseHandler:
-    """Handles all database operations"""
+    """Handles all database operations
     
-    def __init__(self, db_path: str = "chat_app.db"):
+    With shards > 0, db_path only holds users, rooms and memberships, and
+    messages are stored in shards separate files (chat_app.shard0.db, ...)
+    chosen by room_id % shards, so rooms in different shards are written
+    in parallel. Message IDs stay unique across shards and increase within
+    a room.
+    
+    Message IDs encode the shard, so the number of shards is recorded in
+    the catalog when it is first opened, and opening it with a different
+    number raises ValueError rather than hiding or renumbering messages.
+    """
+    
+    def __init__(self, db_path: str = "chat_app.db", shards: int = 0):
         """Initialize database connection"""
         self.db_path = db_path
+        self.shards = shards
+        self.shard_paths = [self.shard_path(i) for i in range(shards)]
+        # One long-lived writer connection per shard, used under its lock
+        self.shard_locks = [threading.Lock() for _ in range(shards)]
+        self.shard_writers: List[Optional[sqlite3.Connection]] = [None] * shards
         self.init_database()
+        for shard in range(shards):
+            self.init_shard(shard)
     
     def get_connection(self) -> sqlite3.Connection:
         """Get database connection"""
@@ -21,6 +43,75 @@ class DatabaseHandler:
         conn.row_factory = sqlite3.Row
         return conn
     
+    def shard_path(self, shard: int) -> str:
+        """Get the file name of a message shard"""
+        base, ext = os.path.splitext(self.db_path)
+        return f"{base}.shard{shard}{ext or '.db'}"
+    
+    def get_shard(self, room_id: int) -> int:
+        """Get the shard holding a room's messages"""
+        return room_id % self.shards
+    
+    def get_shard_connection(self, shard: int) -> sqlite3.Connection:
+        """Get connection to a message shard"""
+        conn = sqlite3.connect(self.shard_paths[shard])
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def get_shard_writer(self, shard: int) -> sqlite3.Connection:
+        """Get the shard's writer connection; call with the shard lock held"""
+        if self.shard_writers[shard] is None:
+            self.shard_writers[shard] = sqlite3.connect(self.shard_paths[shard], check_same_thread=False)
+        return self.shard_writers[shard]
+    
+    def close(self):
+        """Close the shard writer connections"""
+        for shard, lock in enumerate(self.shard_locks):
+            with lock:
+                if self.shard_writers[shard] is not None:
+                    self.shard_writers[shard].close()
+                    self.shard_writers[shard] = None
+    
+    def init_shard(self, shard: int):
+        """Initialize a message shard"""
+        conn = self.get_shard_connection(shard)
+        # WAL lets history reads run while the shard's writer commits
+        conn.execute('PRAGMA journal_mode=WAL')
+        # Usernames are stored with the message; users live in the catalog
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS messages (
+                local_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sender_id INTEGER NOT NULL,
+                sender_username TEXT NOT NULL,
+                room_id INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                message_type TEXT DEFAULT 'text',
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                is_encrypted BOOLEAN DEFAULT 1
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_messages_room ON messages (room_id, local_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages (sender_id, timestamp)')
+        conn.commit()
+        conn.close()
+    
+    def to_message_id(self, shard: int, local_id: int) -> int:
+        """Combine a shard's row ID and the shard number into a global message ID"""
+        return local_id * self.shards + shard
+    
+    def shard_row_to_message(self, shard: int, row: sqlite3.Row) -> Message:
+        """Build a Message from a shard row"""
+        return Message(
+            message_id=self.to_message_id(shard, row['local_id']),
+            sender_id=row['sender_id'],
+            sender_username=row['sender_username'],
+            room_id=row['room_id'],
+            content=row['content'],
+            message_type=row['message_type'],
+            timestamp=row['timestamp'],
+            is_encrypted=bool(row['is_encrypted'])
+        )
+    
     def init_database(self):
         """Initialize database tables"""
         conn = self.get_connection()
@@ -81,20 +172,66 @@ class DatabaseHandler:
             )
         ''')
         
+        # Server settings that must not change between runs
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+        
+        # Session tokens revoked by logging out, kept until they expire
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS revoked_sessions (
+                signature TEXT PRIMARY KEY,
+                expires INTEGER NOT NULL
+            )
+        ''')
+        
         # Create default general room
         cursor.execute('''
             INSERT OR IGNORE INTO chat_rooms (room_id, room_name, description, created_by)
             VALUES (1, 'General', 'Default chat room for everyone', NULL)
         ''')
         
+        stored_shards = self.get_shard_layout(cursor)
         conn.commit()
         conn.close()
+        
+        if stored_shards != self.shards:
+            if stored_shards:
+                layout, option = f"in {stored_shards} shard(s)", f"with --shards {stored_shards}"
+            else:
+                layout, option = "without shards", "without --shards"
+            raise ValueError(
+                f"Messages in {self.db_path} are stored {layout}; message IDs depend on the "
+                f"number of shards, so run {option}"
+            )
+    
+    def get_shard_layout(self, cursor: sqlite3.Cursor) -> int:
+        """Get the number of shards the catalog's messages are stored in, recording it the first time"""
+        row = cursor.execute("SELECT value FROM settings WHERE key = 'message_shards'").fetchone()
+        if row is not None:
+            return int(row['value'])
+        
+        # Catalogs from before the layout was recorded: go by what is on disk
+        existing = 0
+        while os.path.exists(self.shard_path(existing)):
+            existing += 1
+        if existing:
+            stored = existing
+        elif cursor.execute('SELECT 1 FROM messages LIMIT 1').fetchone() is not None:
+            stored = 0
+        else:
+            stored = self.shards
+        cursor.execute("INSERT INTO settings (key, value) VALUES ('message_shards', ?)", (str(stored),))
+        return stored
     
     # User operations
     def create_user(self, username: str, password_hash: str, email: Optional[str] = None) -> Optional[int]:
         """Create a new user"""
+        conn = self.get_connection()
         try:
-            conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)',
@@ -102,10 +239,11 @@ class DatabaseHandler:
             )
             user_id = cursor.lastrowid
             conn.commit()
-            conn.close()
             return user_id
         except sqlite3.IntegrityError:
             return None
+        finally:
+            conn.close()
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
@@ -147,6 +285,33 @@ class DatabaseHandler:
             )
         return None
     
+    def update_password_hash(self, user_id: int, password_hash: str):
+        """Replace a user's stored password hash"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE users SET password_hash = ? WHERE user_id = ?', (password_hash, user_id))
+        conn.commit()
+        conn.close()
+    
+    def revoke_session(self, signature: str, expires: int):
+        """Record a revoked session token and forget those that expired"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM revoked_sessions WHERE expires < ?', (int(time.time()),))
+        cursor.execute('INSERT OR IGNORE INTO revoked_sessions (signature, expires) VALUES (?, ?)',
+                       (signature, expires))
+        conn.commit()
+        conn.close()
+    
+    def get_revoked_sessions(self) -> List[Tuple[str, int]]:
+        """Get (signature, expires) of revoked session tokens that have not expired"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT signature, expires FROM revoked_sessions WHERE expires >= ?', (int(time.time()),))
+        rows = [(row['signature'], row['expires']) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+    
     def update_user_status(self, user_id: int, is_online: bool):
         """Update user online status"""
         conn = self.get_connection()
@@ -176,6 +341,8 @@ class DatabaseHandler:
     # Message operations
     def save_message(self, message: Message) -> Optional[int]:
         """Save a message to database"""
+        if self.shards:
+            return self.save_shard_message(message)
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute(
@@ -188,18 +355,52 @@ class DatabaseHandler:
         conn.close()
         return message_id
     
-    def get_room_messages(self, room_id: int, limit: int = 100) -> List[Message]:
-        """Get messages from a room"""
+    def save_shard_message(self, message: Message) -> int:
+        """Save a message to its room's shard"""
+        shard = self.get_shard(message.room_id)
+        with self.shard_locks[shard]:
+            conn = self.get_shard_writer(shard)
+            with conn:
+                cursor = conn.execute(
+                    '''INSERT INTO messages (sender_id, sender_username, room_id, content, message_type, is_encrypted)
+                       VALUES (?, ?, ?, ?, ?, ?)''',
+                    (message.sender_id, message.sender_username, message.room_id,
+                     message.content, message.message_type, message.is_encrypted)
+                )
+            return self.to_message_id(shard, cursor.lastrowid)
+    
+    def get_room_messages(self, room_id: int, limit: int = 100, after_id: Optional[int] = None) -> List[Message]:
+        """Get the newest limit messages of a room in chronological order
+        
+        With after_id, get the oldest limit messages after it instead, so a
+        client catching up can page forward without skipping any.
+        """
+        order = 'ASC' if after_id is not None else 'DESC'
+        if self.shards:
+            shard = self.get_shard(room_id)
+            conn = self.get_shard_connection(shard)
+            rows = conn.execute(
+                f'''SELECT * FROM messages
+                   WHERE room_id = ? AND local_id > ?
+                   ORDER BY local_id {order}
+                   LIMIT ?''',
+                (room_id, (after_id or 0) // self.shards, limit)
+            ).fetchall()
+            conn.close()
+            if after_id is None:
+                rows.reverse()
+            return [self.shard_row_to_message(shard, row) for row in rows]
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute(
-            '''SELECT m.*, u.username as sender_username 
+            f'''SELECT m.*, u.username as sender_username 
                FROM messages m
                JOIN users u ON m.sender_id = u.user_id
-               WHERE m.room_id = ?
-               ORDER BY m.timestamp DESC
+               WHERE m.room_id = ? AND m.message_id > ?
+               ORDER BY m.message_id {order}
                LIMIT ?''',
-            (room_id, limit)
+            (room_id, after_id or 0, limit)
         )
         rows = cursor.fetchall()
         conn.close()
@@ -217,10 +418,29 @@ class DatabaseHandler:
                 is_encrypted=bool(row['is_encrypted'])
             ))
         
-        return list(reversed(messages))  # Return in chronological order
+        if after_id is None:
+            messages.reverse()  # Return in chronological order
+        return messages
     
     def get_user_messages(self, user_id: int, limit: int = 50) -> List[Message]:
         """Get messages sent by a user"""
+        if self.shards:
+            # Newest first from every shard, merged
+            per_shard = []
+            for shard in range(self.shards):
+                conn = self.get_shard_connection(shard)
+                rows = conn.execute(
+                    '''SELECT * FROM messages
+                       WHERE sender_id = ?
+                       ORDER BY timestamp DESC, local_id DESC
+                       LIMIT ?''',
+                    (user_id, limit)
+                ).fetchall()
+                conn.close()
+                per_shard.append([self.shard_row_to_message(shard, row) for row in rows])
+            merged = heapq.merge(*per_shard, key=lambda m: (m.timestamp, m.message_id), reverse=True)
+            return list(merged)[:limit]
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute(
@@ -249,8 +469,8 @@ class DatabaseHandler:
     # Room operations
     def create_room(self, room_name: str, created_by: int, description: Optional[str] = None, is_private: bool = False) -> Optional[int]:
         """Create a new chat room"""
+        conn = self.get_connection()
         try:
-            conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO chat_rooms (room_name, description, created_by, is_private) VALUES (?, ?, ?, ?)',
@@ -258,10 +478,11 @@ class DatabaseHandler:
             )
             room_id = cursor.lastrowid
             conn.commit()
-            conn.close()
             return room_id
         except sqlite3.IntegrityError:
             return None
+        finally:
+            conn.close()
     
     def get_room_by_id(self, room_id: int) -> Optional[ChatRoom]:
         """Get room by ID"""
@@ -325,18 +546,19 @@ class DatabaseHandler:
     # Room membership operations
     def add_user_to_room(self, user_id: int, room_id: int, role: str = "member") -> bool:
         """Add user to a room"""
+        conn = self.get_connection()
         try:
-            conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO room_memberships (user_id, room_id, role) VALUES (?, ?, ?)',
                 (user_id, room_id, role)
             )
             conn.commit()
-            conn.close()
             return True
         except sqlite3.IntegrityError:
             return False
+        finally:
+            conn.close()
     
     def remove_user_from_room(self, user_id: int, room_id: int) -> bool:
         """Remove user from a room"""
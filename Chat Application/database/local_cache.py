@@ -0,0 +1,140 @@
+"""
+Client-side SQLite cache of rooms and messages
+"""
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+from typing import List, Optional
+
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache')
+# Messages kept per room; older ones are pruned on write
+MAX_CACHED_MESSAGES = 1000
+
+
+class LocalCache:
+    """Per-user cache so history can be shown before the server answers"""
+    
+    def __init__(self, username: str, cache_dir: str = CACHE_DIR):
+        """Open (or create) the cache file for a user"""
+        os.makedirs(cache_dir, exist_ok=True)
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', username)
+        self.db_path = os.path.join(cache_dir, f"{safe_name}.db")
+        self.init_database()
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Get cache connection"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def init_database(self):
+        """Initialize cache tables"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rooms (
+                room_id INTEGER PRIMARY KEY,
+                room_name TEXT NOT NULL,
+                description TEXT
+            )
+        ''')
+        
+        # Content is cached exactly as received (encrypted unless sent over TLS)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS messages (
+                room_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                sender_username TEXT,
+                content TEXT NOT NULL,
+                message_type TEXT DEFAULT 'text',
+                timestamp TEXT,
+                is_encrypted BOOLEAN DEFAULT 1,
+                PRIMARY KEY (room_id, message_id)
+            ) WITHOUT ROWID
+        ''')
+        columns = [row['name'] for row in cursor.execute('PRAGMA table_info(messages)')]
+        if 'is_encrypted' not in columns:
+            cursor.execute('ALTER TABLE messages ADD COLUMN is_encrypted BOOLEAN DEFAULT 1')
+        
+        conn.commit()
+        conn.close()
+    
+    # Room operations
+    def save_rooms(self, rooms: List[dict]):
+        """Replace cached room list"""
+        conn = self.get_connection()
+        with conn:
+            conn.execute('DELETE FROM rooms')
+            conn.executemany(
+                'INSERT INTO rooms (room_id, room_name, description) VALUES (?, ?, ?)',
+                [(r['room_id'], r['room_name'], r.get('description')) for r in rooms]
+            )
+        conn.close()
+    
+    def get_rooms(self) -> List[dict]:
+        """Get cached rooms"""
+        conn = self.get_connection()
+        rows = conn.execute('SELECT * FROM rooms ORDER BY room_name').fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    
+    # Message operations
+    def save_messages(self, room_id: int, messages: List[dict]):
+        """Cache messages as received from the server"""
+        rows = []
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        for m in messages:
+            if m.get('message_id') is None:
+                continue
+            rows.append((
+                room_id,
+                m['message_id'],
+                m.get('sender_username') or m.get('sender'),
+                m.get('content', ''),
+                m.get('message_type', 'text'),
+                m.get('timestamp') or now,
+                m.get('is_encrypted', True)
+            ))
+        if not rows:
+            return
+        
+        conn = self.get_connection()
+        with conn:
+            conn.executemany(
+                '''INSERT OR REPLACE INTO messages
+                   (room_id, message_id, sender_username, content, message_type, timestamp, is_encrypted)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                rows
+            )
+            conn.execute(
+                '''DELETE FROM messages WHERE room_id = ? AND message_id <= (
+                       SELECT message_id FROM messages WHERE room_id = ?
+                       ORDER BY message_id DESC LIMIT 1 OFFSET ?
+                   )''',
+                (room_id, room_id, MAX_CACHED_MESSAGES)
+            )
+        conn.close()
+    
+    def get_room_messages(self, room_id: int, limit: int = 100) -> List[dict]:
+        """Get the newest cached messages of a room in chronological order"""
+        conn = self.get_connection()
+        rows = conn.execute(
+            '''SELECT * FROM messages WHERE room_id = ?
+               ORDER BY message_id DESC LIMIT ?''',
+            (room_id, limit)
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in reversed(rows)]
+    
+    def get_last_message_id(self, room_id: int) -> Optional[int]:
+        """Get the newest cached message ID of a room"""
+        conn = self.get_connection()
+        row = conn.execute(
+            'SELECT MAX(message_id) FROM messages WHERE room_id = ?', (room_id,)
+        ).fetchone()
+        conn.close()
+        return row[0]
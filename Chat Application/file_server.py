@@ -0,0 +1,213 @@
+"""
+Binary file transfer server for chat attachments
+
+Runs next to the chat server on its own port so large transfers never
+block the newline-JSON chat channel. Each request is one JSON header line,
+followed by raw bytes for uploads and downloads. Every request carries the
+session token issued at chat login, so the port uses TLS whenever the chat
+server does.
+"""
+import json
+import socket
+import ssl
+import threading
+from typing import Optional, Set, Tuple
+from database.blob_store import BlobStore
+from utils.session import SessionManager
+from utils.tls import HANDSHAKE_TIMEOUT
+
+
+HOST = '127.0.0.1'
+FILE_PORT = 5556
+MAX_FILE_SIZE = 2 * 1024 ** 3
+RECV_SIZE = 1024 * 1024
+# Longest request header line accepted, in bytes
+MAX_HEADER = 64 * 1024
+
+
+class TransferThread(threading.Thread):
+    def __init__(self, conn: socket.socket, addr: Tuple[str, int], server: 'FileTransferServer'):
+        super().__init__(daemon=True)
+        self.conn = conn
+        self.addr = addr
+        self.server = server
+        self.reader = conn.makefile('rb')
+
+    def reply(self, payload: dict):
+        self.conn.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+
+    def handshake(self) -> bool:
+        """Complete the TLS handshake on this thread rather than in the accept loop"""
+        if not isinstance(self.conn, ssl.SSLSocket):
+            return True
+        try:
+            self.conn.settimeout(HANDSHAKE_TIMEOUT)
+            self.conn.do_handshake()
+            self.conn.settimeout(None)
+            return True
+        except (ssl.SSLError, OSError) as e:
+            print(f"TLS handshake failed for {self.addr}: {e}")
+            return False
+
+    def run(self):
+        try:
+            if not self.handshake():
+                return
+            while True:
+                line = self.reader.readline(MAX_HEADER + 1)
+                if not line:
+                    break
+                if len(line) > MAX_HEADER:
+                    self.reply({'status': 'error', 'message': 'Request too large'})
+                    break
+                try:
+                    msg = json.loads(line.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    self.reply({'status': 'error', 'message': 'Invalid request'})
+                    break
+                if not self.handle_request(msg):
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+
+    def handle_request(self, msg: dict) -> bool:
+        """Handle one request; returns False when the connection should close"""
+        if not self.server.sessions.verify(msg.get('token')):
+            self.reply({'status': 'error', 'message': 'Not authenticated'})
+            return False
+        action = msg.get('action')
+        sha256 = msg.get('sha256')
+        if not BlobStore.is_valid_digest(sha256):
+            self.reply({'status': 'error', 'message': 'Invalid digest'})
+            return False
+        try:
+            size = int(msg.get('size', 0))
+            offset = int(msg.get('offset', 0))
+            length = msg.get('length')
+            length = None if length is None else int(length)
+        except (TypeError, ValueError, OverflowError):
+            self.reply({'status': 'error', 'message': 'Invalid request'})
+            return False
+        if action == 'upload':
+            return self.handle_upload(sha256, size)
+        elif action == 'download':
+            return self.handle_download(sha256, offset, length)
+        elif action == 'thumbnail':
+            return self.handle_thumbnail(sha256)
+        self.reply({'status': 'error', 'message': 'Unknown action'})
+        return False
+
+    def handle_upload(self, sha256: str, size: int) -> bool:
+        store = self.server.store
+        if store.has(sha256):
+            self.reply({'status': 'exists', 'sha256': sha256, 'size': store.size(sha256)})
+            return True
+        if size <= 0 or size > MAX_FILE_SIZE:
+            self.reply({'status': 'error', 'message': 'Invalid file size'})
+            return False
+        if not self.server.begin_upload(sha256):
+            self.reply({'status': 'busy', 'message': 'Upload already in progress'})
+            return True
+        try:
+            offset = min(store.partial_size(sha256), size)
+            self.reply({'status': 'ready', 'offset': offset})
+            
+            remaining = size - offset
+            buffer = bytearray(RECV_SIZE)
+            view = memoryview(buffer)
+            with store.open_partial(sha256, offset) as f:
+                while remaining > 0:
+                    received = self.reader.readinto(view[:min(RECV_SIZE, remaining)])
+                    if not received:
+                        return False  # client went away; partial data is kept for resume
+                    f.write(view[:received])
+                    remaining -= received
+            
+            if not store.finalize(sha256):
+                self.reply({'status': 'error', 'message': 'Checksum mismatch'})
+                return False
+            self.reply({
+                'status': 'complete',
+                'sha256': sha256,
+                'size': size,
+                'thumbnail': store.get_thumbnail(sha256) is not None
+            })
+            return True
+        finally:
+            self.server.end_upload(sha256)
+
+    def handle_download(self, sha256: str, offset: int, length: Optional[int]) -> bool:
+        store = self.server.store
+        if not store.has(sha256):
+            self.reply({'status': 'missing'})
+            return True
+        size = store.size(sha256)
+        offset = max(0, min(offset, size))
+        length = size - offset if length is None else max(0, min(length, size - offset))
+        self.reply({'status': 'ok', 'size': size, 'offset': offset, 'length': length})
+        if length:
+            with open(store.blob_path(sha256), 'rb') as f:
+                self.conn.sendfile(f, offset, length)
+        return True
+
+    def handle_thumbnail(self, sha256: str) -> bool:
+        thumbnail = self.server.store.get_thumbnail(sha256) if self.server.store.has(sha256) else None
+        if thumbnail is None:
+            self.reply({'status': 'missing'})
+            return True
+        self.reply({'status': 'ok', 'length': len(thumbnail)})
+        self.conn.sendall(thumbnail)
+        return True
+
+
+class FileTransferServer:
+    def __init__(self, host: str, port: int, store: BlobStore = None, sessions: SessionManager = None,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.host = host
+        self.port = port
+        self.store = store or BlobStore()
+        # Tokens are signed with a key derived from the master key, so a
+        # standalone file server accepts the chat server's tokens too
+        self.sessions = sessions or SessionManager()
+        self.ssl_context = ssl_context
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.uploads: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(50)
+        print(f"File server listening on {self.host}:{self.port}")
+        try:
+            while True:
+                conn, addr = self.server_socket.accept()
+                if self.ssl_context:
+                    try:
+                        conn = self.ssl_context.wrap_socket(conn, server_side=True, do_handshake_on_connect=False)
+                    except (ssl.SSLError, OSError):
+                        conn.close()
+                        continue
+                TransferThread(conn, addr, self).start()
+        finally:
+            self.server_socket.close()
+
+    def begin_upload(self, sha256: str) -> bool:
+        with self.lock:
+            if sha256 in self.uploads:
+                return False
+            self.uploads.add(sha256)
+            return True
+
+    def end_upload(self, sha256: str):
+        with self.lock:
+            self.uploads.discard(sha256)
+
+
+if __name__ == '__main__':
+    FileTransferServer(HOST, FILE_PORT).start()
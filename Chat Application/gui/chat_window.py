@@ -11,15 +11,30 @@ from datetime import datetime
 from .styles import CHAT_STYLE, COLORS, get_message_style
 
 
+# Batches larger than this are inserted without entrance animations
+ANIMATION_BATCH_LIMIT = 20
+
+
+def format_size(size: int) -> str:
+    """Format a byte count for display"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
 class MessageBubble(QFrame):
     """Animated message bubble widget"""
     
-    def __init__(self, message: dict, is_sent: bool, parent=None):
+    download_clicked = pyqtSignal(dict)  # attachment descriptor
+    
+    def __init__(self, message: dict, is_sent: bool, parent=None, animate: bool = True):
         super().__init__(parent)
         self.message = message
         self.is_sent = is_sent
         self.init_ui()
-        self.animate_in()
+        if animate:
+            self.animate_in()
         
     def init_ui(self):
         """Initialize message bubble UI"""
@@ -42,8 +57,9 @@ class MessageBubble(QFrame):
         content_label = QLabel()
         content = self.message.get('content', '')
         
-        # Process emojis
-        content = emoji.emojize(content, language='alias')
+        # Process emojis (already done for messages prepared by the client)
+        if not self.message.get('prepared'):
+            content = emoji.emojize(content, language='alias')
         
         content_label.setText(content)
         content_label.setWordWrap(True)
@@ -51,9 +67,25 @@ class MessageBubble(QFrame):
         content_label.setStyleSheet("font-size: 14px;")
         layout.addWidget(content_label)
         
+        # Attachments: lazy thumbnail for images, download button for all
+        self.thumbnail_label = None
+        attachment = self.message.get('attachment')
+        if attachment:
+            content_label.setText(f"📎 {attachment.get('name', 'file')} ({format_size(attachment.get('size', 0))})")
+            if self.message.get('message_type') == 'image':
+                self.thumbnail_label = QLabel("Loading preview...")
+                self.thumbnail_label.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 11px;")
+                layout.addWidget(self.thumbnail_label)
+            download_btn = QPushButton("Download")
+            download_btn.setCursor(Qt.PointingHandCursor)
+            download_btn.clicked.connect(lambda: self.download_clicked.emit(attachment))
+            layout.addWidget(download_btn)
+        
         # Timestamp
         timestamp = self.message.get('timestamp', '')
-        if timestamp:
+        if self.message.get('time_str'):
+            time_str = self.message['time_str']
+        elif timestamp:
             try:
                 dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
                 time_str = dt.strftime('%I:%M %p')
@@ -69,6 +101,12 @@ class MessageBubble(QFrame):
         
         self.setLayout(layout)
         
+    def set_thumbnail(self, pixmap: QPixmap):
+        """Show an image thumbnail in the bubble"""
+        if self.thumbnail_label is not None:
+            self.thumbnail_label.setText("")
+            self.thumbnail_label.setPixmap(pixmap)
+        
     def animate_in(self):
         """Animate message bubble entrance"""
         # Fade in effect
@@ -88,12 +126,18 @@ class ChatWindow(QWidget):
     
     send_message = pyqtSignal(str, str)  # content, message_type
     disconnect_requested = pyqtSignal()
+    attach_requested = pyqtSignal(str)  # file path
+    download_requested = pyqtSignal(dict, str)  # attachment descriptor, destination path
+    thumbnail_requested = pyqtSignal(str)  # sha256
     
     def __init__(self, user_data: dict):
         super().__init__()
         self.user_data = user_data
         self.current_room_id = 1
         self.messages_container = None
+        self.scroll_pending = False
+        self.image_bubbles = {}  # sha256 -> bubbles waiting for or showing a thumbnail
+        self.thumbnails = {}  # sha256 -> QPixmap
         self.init_ui()
         
     def init_ui(self):
@@ -309,29 +353,79 @@ class ChatWindow(QWidget):
         
     def add_message(self, message: dict, is_sent: bool = False):
         """Add message to chat with animation"""
-        # Create message bubble
-        bubble = MessageBubble(message, is_sent)
-        
-        # Wrapper for alignment
-        wrapper = QHBoxLayout()
-        wrapper.setContentsMargins(0, 0, 0, 0)
+        self.add_messages([(message, is_sent)])
         
-        if is_sent:
-            wrapper.addStretch()
-            wrapper.addWidget(bubble)
+    def add_messages(self, messages: list, animate: bool = None):
+        """Add a batch of (message, is_sent) pairs with a single scroll"""
+        if not messages:
+            return
+        if animate is None:
+            animate = len(messages) <= ANIMATION_BATCH_LIMIT
+        
+        # Suspend repaints while the batch is inserted
+        messages_widget = self.messages_scroll.widget()
+        messages_widget.setUpdatesEnabled(False)
+        try:
+            for message, is_sent in messages:
+                # Create message bubble
+                bubble = MessageBubble(message, is_sent, animate=animate)
+                if message.get('attachment'):
+                    self.track_attachment(bubble)
+                
+                # Wrapper for alignment
+                wrapper = QHBoxLayout()
+                wrapper.setContentsMargins(0, 0, 0, 0)
+                
+                if is_sent:
+                    wrapper.addStretch()
+                    wrapper.addWidget(bubble)
+                else:
+                    wrapper.addWidget(bubble)
+                    wrapper.addStretch()
+                
+                # Insert before stretch
+                count = self.messages_layout.count()
+                self.messages_layout.insertLayout(count - 1, wrapper)
+        finally:
+            messages_widget.setUpdatesEnabled(True)
+        
+        # One delayed scroll for the whole batch
+        if not self.scroll_pending:
+            self.scroll_pending = True
+            QTimer.singleShot(100, self.scroll_to_bottom)
+        
+    def track_attachment(self, bubble: MessageBubble):
+        """Wire up downloads and request image thumbnails once per file"""
+        bubble.download_clicked.connect(self.choose_download_path)
+        if bubble.thumbnail_label is None:
+            return
+        sha256 = bubble.message['attachment'].get('sha256')
+        if sha256 in self.thumbnails:
+            bubble.set_thumbnail(self.thumbnails[sha256])
+        elif sha256 not in self.image_bubbles:
+            self.image_bubbles[sha256] = [bubble]
+            self.thumbnail_requested.emit(sha256)
         else:
-            wrapper.addWidget(bubble)
-            wrapper.addStretch()
-        
-        # Insert before stretch
-        count = self.messages_layout.count()
-        self.messages_layout.insertLayout(count - 1, wrapper)
-        
-        # Scroll to bottom with delay
-        QTimer.singleShot(100, self.scroll_to_bottom)
-        
+            self.image_bubbles[sha256].append(bubble)
+            
+    def set_thumbnail(self, sha256: str, data: bytes):
+        """Show a fetched thumbnail on every bubble of that image"""
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(data):
+            return
+        self.thumbnails[sha256] = pixmap
+        for bubble in self.image_bubbles.pop(sha256, []):
+            bubble.set_thumbnail(pixmap)
+            
+    def choose_download_path(self, attachment: dict):
+        """Ask where to save an attachment and request the download"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save File", attachment.get('name', ''))
+        if file_path:
+            self.download_requested.emit(attachment, file_path)
+            
     def scroll_to_bottom(self):
         """Scroll chat to bottom"""
+        self.scroll_pending = False
         scrollbar = self.messages_scroll.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
         
@@ -339,9 +433,9 @@ class ChatWindow(QWidget):
         """Load message history"""
         current_user = self.user_data.get('username', '')
         
-        for msg in messages:
-            is_sent = msg.get('sender_username') == current_user
-            self.add_message(msg, is_sent)
+        self.add_messages([
+            (msg, msg.get('sender_username') == current_user) for msg in messages
+        ])
             
     def update_online_users(self, users: list):
         """Update online users list"""
@@ -369,10 +463,7 @@ class ChatWindow(QWidget):
         )
         
         if file_path:
-            # For now, just show the filename
-            filename = file_path.split('/')[-1].split('\\')[-1]
-            current_text = self.message_input.toPlainText()
-            self.message_input.setPlainText(f"{current_text}\n[File: {filename}]")
+            self.attach_requested.emit(file_path)
             
     def setup_entrance_animation(self):
         """Setup entrance animation"""
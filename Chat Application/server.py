@@ -1,17 +1,29 @@
 """
 Multi-threaded chat server with authentication, rooms, and encryption
 """
+import argparse
+import os
+import signal
 import socket
+import ssl
 import threading
 import json
 from typing import Dict, Tuple
 from database import DatabaseHandler
-from utils import EncryptionHandler
+from database.blob_store import BlobStore, BLOB_DIR
+from file_server import FileTransferServer, FILE_PORT
+from utils import EncryptionHandler, SessionManager
+from utils.profiler import SamplingProfiler, TimedLock
+from utils.tls import create_server_context, HANDSHAKE_TIMEOUT
 
 
 HOST = '127.0.0.1'
 PORT = 5555
 
+# Usernames allowed to run admin actions, comma separated
+ADMINS = {name.strip() for name in os.environ.get('CHAT_ADMINS', '').split(',') if name.strip()}
+PROFILE_SECONDS = float(os.environ.get('CHAT_PROFILE_SECONDS', 30))
+
 
 class ClientThread(threading.Thread):
     def __init__(self, conn: socket.socket, addr: Tuple[str, int], server: 'ChatServer'):
@@ -21,16 +33,36 @@ class ClientThread(threading.Thread):
         self.server = server
         self.user_id = None
         self.username = None
-        self.encryption = EncryptionHandler()
+        # Broadcasts from other client threads write to this socket too
+        self.send_lock = threading.Lock()
 
     def send(self, payload: dict):
+        self.send_data(json.dumps(payload).encode('utf-8') + b'\n')
+
+    def send_data(self, data: bytes):
         try:
-            data = json.dumps(payload).encode('utf-8') + b'\n'
-            self.conn.sendall(data)
+            with self.send_lock:
+                self.conn.sendall(data)
         except Exception:
             self.server.disconnect_client(self)
 
+    def handshake(self) -> bool:
+        """Complete the TLS handshake on this thread rather than in the accept loop"""
+        if not isinstance(self.conn, ssl.SSLSocket):
+            return True
+        try:
+            self.conn.settimeout(HANDSHAKE_TIMEOUT)
+            self.conn.do_handshake()
+            self.conn.settimeout(None)
+            return True
+        except (ssl.SSLError, OSError) as e:
+            print(f"TLS handshake failed for {self.addr}: {e}")
+            return False
+
     def run(self):
+        if not self.handshake():
+            self.server.disconnect_client(self)
+            return
         buffer = b''
         while True:
             try:
@@ -44,9 +76,13 @@ class ClientThread(threading.Thread):
                         continue
                     try:
                         msg = json.loads(line.decode('utf-8'))
-                        self.handle_message(msg)
-                    except json.JSONDecodeError:
+                    except (json.JSONDecodeError, UnicodeDecodeError):
                         continue
+                    try:
+                        self.handle_message(msg)
+                    except (TypeError, ValueError):
+                        # A field of the wrong type, such as a non-numeric room_id or seconds
+                        self.send({'type': 'error', 'message': 'Invalid request'})
             except ConnectionResetError:
                 break
             except Exception:
@@ -64,6 +100,10 @@ class ClientThread(threading.Thread):
             username = msg.get('username')
             password = msg.get('password')
             self.server.handle_login(self, username, password)
+        elif action == 'resume':
+            self.server.handle_resume(self, msg.get('token'))
+        elif action == 'logout':
+            self.server.handle_logout(self, msg.get('token'))
         elif action == 'join_room':
             room_id = int(msg.get('room_id', 1))
             self.server.handle_join_room(self, room_id)
@@ -71,36 +111,70 @@ class ClientThread(threading.Thread):
             content = msg.get('content', '')
             room_id = int(msg.get('room_id', 1))
             mtype = msg.get('message_type', 'text')
-            encrypted = self.encryption.encrypt(content)
-            self.server.handle_send_message(self, room_id, encrypted, mtype)
+            if mtype in ('file', 'image') and not self.server.is_valid_attachment(content):
+                self.send({'type': 'error', 'message': 'Attachment not uploaded'})
+                return
+            # TLS already protects the content in transit
+            encrypted = self.server.encrypt_messages
+            if encrypted:
+                content = self.server.encryption.encrypt(content, room_id)
+            self.server.handle_send_message(self, room_id, content, mtype, encrypted)
         elif action == 'get_rooms':
             self.server.handle_get_rooms(self)
+        elif action == 'profile':
+            self.server.handle_profile(self, float(msg.get('seconds', PROFILE_SECONDS)))
         elif action == 'get_history':
             room_id = int(msg.get('room_id', 1))
             limit = int(msg.get('limit', 100))
-            self.server.handle_get_history(self, room_id, limit)
+            after_id = msg.get('after_id')
+            self.server.handle_get_history(self, room_id, limit, int(after_id) if after_id else None)
         else:
             self.send({'type': 'error', 'message': 'Unknown action'})
 
 
 class ChatServer:
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, db_path: str = "chat_app.db",
+                 file_port: int = FILE_PORT, blob_dir: str = BLOB_DIR, shards: int = 0,
+                 ssl_context: ssl.SSLContext | None = None, encrypt_messages: bool | None = None):
         self.host = host
         self.port = port
-        self.db = DatabaseHandler()
+        self.db = DatabaseHandler(db_path, shards)
+        self.ssl_context = ssl_context
+        # Per-message encryption is skipped under TLS unless asked for
+        self.encrypt_messages = ssl_context is None if encrypt_messages is None else encrypt_messages
+        self.encryption = EncryptionHandler()
+        self.sessions = SessionManager()
+        self.sessions.load_revoked(self.db.get_revoked_sessions())
+        self.file_server = FileTransferServer(host, file_port, BlobStore(blob_dir), self.sessions, ssl_context)
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.clients: Dict[int, ClientThread] = {}
         self.room_members: Dict[int, set[int]] = {}  # room_id -> set of user_ids
-        self.lock = threading.Lock()
+        self.session_rooms: Dict[int, set[int]] = {}  # user_id -> rooms joined before disconnect
+        self.lock = TimedLock()
+        self.profiler = SamplingProfiler()
 
     def start(self):
+        # kill -USR1 <pid> profiles the server for PROFILE_SECONDS
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            # Started from a thread: the handler interrupts the main thread, which may hold self.lock
+            signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(
+                target=self.start_profile, args=(PROFILE_SECONDS,), daemon=True).start())
+        threading.Thread(target=self.file_server.start, daemon=True).start()
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen(50)
         print(f"Server listening on {self.host}:{self.port}")
         try:
             while True:
                 conn, addr = self.server_socket.accept()
+                # Small protocol lines and handshake flights should not wait on Nagle
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if self.ssl_context:
+                    try:
+                        conn = self.ssl_context.wrap_socket(conn, server_side=True, do_handshake_on_connect=False)
+                    except (ssl.SSLError, OSError):
+                        conn.close()
+                        continue
                 client = ClientThread(conn, addr, self)
                 client.start()
         finally:
@@ -108,22 +182,28 @@ class ChatServer:
 
     def broadcast(self, room_id: int, payload: dict):
         with self.lock:
-            members = self.room_members.get(room_id, set()).copy()
-            for uid in members:
-                client = self.clients.get(uid)
-                if client:
-                    client.send(payload)
+            members = self.room_members.get(room_id, set())
+            clients = [self.clients[uid] for uid in members if uid in self.clients]
+        # Encode once and send outside the lock so a slow peer holds up only this broadcast
+        data = json.dumps(payload).encode('utf-8') + b'\n'
+        for client in clients:
+            client.send_data(data)
 
     def disconnect_client(self, client: ClientThread):
         with self.lock:
-            if client.user_id in self.clients:
+            # A resumed session may already have replaced this connection
+            if client.user_id in self.clients and self.clients[client.user_id] is client:
                 print(f"Client disconnected: {client.username or client.addr}")
                 # Update DB status
                 if client.user_id:
                     self.db.update_user_status(client.user_id, False)
-                # Remove from room members
-                for members in self.room_members.values():
-                    members.discard(client.user_id)
+                # Remove from room members, remembering them for a resumed session
+                rooms = set()
+                for room_id, members in self.room_members.items():
+                    if client.user_id in members:
+                        rooms.add(room_id)
+                        members.discard(client.user_id)
+                self.session_rooms[client.user_id] = rooms
                 del self.clients[client.user_id]
         try:
             client.conn.close()
@@ -149,6 +229,9 @@ class ChatServer:
         if not EncryptionHandler.verify_password(password, user.password_hash):
             client.send({'type': 'login', 'success': False, 'message': 'Invalid credentials'})
             return
+        # Upgrade legacy or lower-cost hashes while the plain password is at hand
+        if EncryptionHandler.needs_rehash(user.password_hash):
+            self.db.update_password_hash(user.user_id, EncryptionHandler.hash_password(password))
         # Mark online and attach
         self.db.update_user_status(user.user_id, True)
         client.user_id = user.user_id
@@ -157,10 +240,46 @@ class ChatServer:
             self.clients[user.user_id] = client
         # Auto join General
         self.handle_join_room(client, 1)
-        client.send({'type': 'login', 'success': True, 'user': user.to_dict()})
+        token = self.sessions.issue(user.user_id, user.username)
+        client.send({'type': 'login', 'success': True, 'user': user.to_dict(), 'token': token})
         # Notify room
         self.broadcast(1, {'type': 'user_joined', 'room_id': 1, 'username': user.username})
 
+    def handle_resume(self, client: ClientThread, token: str):
+        """Restore a session from a login token without checking the password"""
+        session = self.sessions.verify(token)
+        if not session:
+            client.send({'type': 'resume', 'success': False, 'message': 'Session expired'})
+            return
+        # The account may have gone, or its ID been taken over, since the token was issued
+        user_id, username = session
+        user = self.db.get_user_by_id(user_id)
+        if not user or user.username != username:
+            client.send({'type': 'resume', 'success': False, 'message': 'User not found'})
+            return
+        self.db.update_user_status(user_id, True)
+        client.user_id = user_id
+        client.username = username
+        with self.lock:
+            self.clients[user_id] = client
+            rooms = self.session_rooms.pop(user_id, None) or {1}
+            for room_id in rooms:
+                self.room_members.setdefault(room_id, set()).add(user_id)
+        client.send({'type': 'resume', 'success': True,
+                     'user': {'user_id': user_id, 'username': username}, 'rooms': sorted(rooms)})
+        self.broadcast(1, {'type': 'user_joined', 'room_id': 1, 'username': username})
+
+    def handle_logout(self, client: ClientThread, token: str):
+        """Revoke the client's session token so it can no longer resume or transfer files"""
+        session = self.sessions.verify(token)
+        if not session or session[0] != client.user_id:
+            client.send({'type': 'error', 'message': 'Not authenticated'})
+            return
+        revoked = self.sessions.revoke(token)
+        if revoked:
+            self.db.revoke_session(*revoked)
+        client.send({'type': 'logout', 'success': True})
+    
     def handle_join_room(self, client: ClientThread, room_id: int):
         if not client.user_id:
             client.send({'type': 'error', 'message': 'Not authenticated'})
@@ -169,7 +288,8 @@ class ChatServer:
             self.room_members.setdefault(room_id, set()).add(client.user_id)
         client.send({'type': 'joined_room', 'room_id': room_id})
 
-    def handle_send_message(self, client: ClientThread, room_id: int, encrypted_content: str, message_type: str):
+    def handle_send_message(self, client: ClientThread, room_id: int, content: str, message_type: str,
+                            is_encrypted: bool = True):
         if not client.user_id:
             client.send({'type': 'error', 'message': 'Not authenticated'})
             return
@@ -179,9 +299,9 @@ class ChatServer:
             sender_id=client.user_id,
             sender_username=client.username,
             room_id=room_id,
-            content=encrypted_content,
+            content=content,
             message_type=message_type,
-            is_encrypted=True
+            is_encrypted=is_encrypted
         )
         msg_id = self.db.save_message(msg)
         payload = {
@@ -189,19 +309,71 @@ class ChatServer:
             'message_id': msg_id,
             'room_id': room_id,
             'sender': client.username,
-            'content': encrypted_content,
-            'message_type': message_type
+            'content': content,
+            'message_type': message_type,
+            'is_encrypted': is_encrypted
         }
         self.broadcast(room_id, payload)
 
+    def is_valid_attachment(self, content: str) -> bool:
+        """Check that an attachment descriptor references an uploaded blob"""
+        try:
+            sha256 = json.loads(content).get('sha256')
+        except (json.JSONDecodeError, AttributeError):
+            return False
+        store = self.file_server.store
+        return store.is_valid_digest(sha256) and store.has(sha256)
+
+    def start_profile(self, seconds: float, client: ClientThread | None = None) -> bool:
+        """Sample all threads and time lock contention for seconds; False if already running"""
+        def on_done(path: str, samples: int):
+            lock_stats = self.lock.stats()
+            print(f"Profile written to {path} ({samples} samples), lock: {lock_stats}")
+            if client:
+                client.send({'type': 'profile', 'success': True, 'path': path,
+                             'samples': samples, 'lock': lock_stats})
+        
+        # Counters are cleared only when this request starts a profile
+        started = self.profiler.start(seconds, on_done, on_start=self.lock.reset)
+        if started:
+            print(f"Profiling for {seconds:g}s")
+        return started
+
+    def handle_profile(self, client: ClientThread, seconds: float):
+        if client.username not in ADMINS:
+            client.send({'type': 'error', 'message': 'Not authorized'})
+            return
+        if not self.start_profile(seconds, client):
+            client.send({'type': 'profile', 'success': False, 'message': 'Profiler already running'})
+
     def handle_get_rooms(self, client: ClientThread):
         rooms = [r.to_dict() for r in self.db.get_all_rooms()]
         client.send({'type': 'rooms', 'rooms': rooms})
 
-    def handle_get_history(self, client: ClientThread, room_id: int, limit: int):
-        messages = [m.to_dict() for m in self.db.get_room_messages(room_id, limit)]
-        client.send({'type': 'history', 'room_id': room_id, 'messages': messages})
+    def handle_get_history(self, client: ClientThread, room_id: int, limit: int, after_id: int | None = None):
+        if after_id is None:
+            messages = [m.to_dict() for m in self.db.get_room_messages(room_id, limit)]
+            client.send({'type': 'history', 'room_id': room_id, 'messages': messages})
+            return
+        # One extra row tells whether the client has to ask for another page
+        messages = [m.to_dict() for m in self.db.get_room_messages(room_id, limit + 1, after_id)]
+        client.send({'type': 'history', 'room_id': room_id, 'messages': messages[:limit],
+                     'has_more': len(messages) > limit})
 
 
 if __name__ == '__main__':
-    ChatServer(HOST, PORT).start()
+    parser = argparse.ArgumentParser(description='Chat server')
+    parser.add_argument('--shards', type=int, default=0,
+                        help='store messages in this many per-room database files (default: one database)')
+    parser.add_argument('--tls-cert', help='serve TLS with this certificate (PEM)')
+    parser.add_argument('--tls-key', help='private key for --tls-cert, if not in the same file')
+    parser.add_argument('--encrypt-messages', action='store_true',
+                        help='keep per-message encryption when TLS is enabled')
+    args = parser.parse_args()
+    context = create_server_context(args.tls_cert, args.tls_key) if args.tls_cert else None
+    try:
+        server = ChatServer(HOST, PORT, shards=args.shards, ssl_context=context,
+                            encrypt_messages=True if args.encrypt_messages else None)
+    except ValueError as e:
+        parser.error(str(e))
+    server.start()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Test script to verify session tokens, logout, the file port and the shard layout check
+"""
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+# A throwaway master key, so no key file is written next to the code
+os.environ.setdefault('CHAT_ENCRYPTION_KEY', 'dGVzdC1tYXN0ZXIta2V5LW9mLTMyLWJ5dGVzLWxvbmc=')
+
+from database import DatabaseHandler
+from bench_tls import write_certificate
+from database.blob_store import BlobStore
+from file_server import MAX_HEADER, FileTransferServer
+from server import ChatServer
+from utils import EncryptionHandler, FileTransferClient, SessionManager
+from utils.file_transfer import TransferError
+from utils.tls import create_client_context, create_server_context
+
+
+class FakeClient:
+    """Stands in for a ClientThread, collecting what the server sends"""
+    
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self.username = None
+        self.sent = []
+    
+    def send(self, payload: dict):
+        self.sent.append(payload)
+    
+    def reply(self, msg_type: str) -> dict:
+        return next(payload for payload in reversed(self.sent) if payload['type'] == msg_type)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def make_server(data_dir: str) -> ChatServer:
+    server = ChatServer('127.0.0.1', free_port(), os.path.join(data_dir, 'chat_app.db'),
+                        file_port=free_port(), blob_dir=os.path.join(data_dir, 'blobs'))
+    server.broadcast = lambda room_id, payload: None
+    return server
+
+
+def start_file_server(data_dir: str, sessions: SessionManager, ssl_context=None) -> int:
+    """Start a file server in the background and return its port"""
+    port = free_port()
+    file_server = FileTransferServer('127.0.0.1', port, BlobStore(os.path.join(data_dir, 'blobs')),
+                                     sessions, ssl_context)
+    threading.Thread(target=file_server.start, daemon=True).start()
+    time.sleep(0.2)
+    return port
+
+
+def write_attachment(data_dir: str) -> str:
+    path = os.path.join(data_dir, 'note.txt')
+    with open(path, 'wb') as f:
+        f.write(b'attachment')
+    return path
+
+
+def login(server: ChatServer, username: str, password: str = 'secret-password') -> str:
+    """Register if needed, log in and return the session token"""
+    server.db.create_user(username, EncryptionHandler.hash_password(password))
+    client = FakeClient()
+    server.handle_login(client, username, password)
+    return client.reply('login')['token']
+
+
+def test_revoked_token_rejected():
+    """Test a revoked token no longer verifies, while other tokens still do"""
+    sessions = SessionManager(secret=os.urandom(32))
+    token = sessions.issue(1, 'alice')
+    other = sessions.issue(1, 'alice')
+    assert token != other
+    assert sessions.verify(token) == (1, 'alice')
+    
+    signature, expires = sessions.revoke(token)
+    assert sessions.verify(token) is None
+    assert sessions.verify(other) == (1, 'alice')
+    assert sessions.revoke(token) is None
+    
+    # Revocations are handed to a new manager after a restart
+    restarted = SessionManager(secret=sessions.secret)
+    restarted.load_revoked([(signature, expires)])
+    assert restarted.verify(token) is None
+    
+    payload, signature = other.split('.')
+    assert sessions.verify(f"{payload}.{signature[::-1]}") is None
+    assert SessionManager(secret=sessions.secret, ttl=-1).verify(
+        SessionManager(secret=sessions.secret, ttl=-1).issue(1, 'alice')) is None
+
+
+def test_logout_revokes_resume():
+    """Test logging out stops the token resuming a session, also after a restart"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = make_server(data_dir)
+        token = login(server, 'alice')
+        client = FakeClient()
+        server.handle_resume(client, token)
+        assert client.reply('resume')['success']
+        
+        # Only the token's own user can log it out
+        stranger = FakeClient(user_id=client.user_id + 1)
+        server.handle_logout(stranger, token)
+        assert stranger.reply('error')['message'] == 'Not authenticated'
+        
+        server.handle_logout(client, token)
+        assert client.reply('logout')['success']
+        resumed = FakeClient()
+        server.handle_resume(resumed, token)
+        assert not resumed.reply('resume')['success']
+        assert resumed.user_id is None
+        server.db.close()
+        
+        server = make_server(data_dir)
+        resumed = FakeClient()
+        server.handle_resume(resumed, token)
+        assert not resumed.reply('resume')['success']
+        server.db.close()
+
+
+def test_resume_mismatched_user():
+    """Test a resume is refused when the token's user is gone or is another account"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = make_server(data_dir)
+        token = login(server, 'alice')
+        user = server.db.get_user_by_username('alice')
+        
+        forged = server.sessions.issue(user.user_id, 'mallory')
+        client = FakeClient()
+        server.handle_resume(client, forged)
+        assert not client.reply('resume')['success']
+        
+        conn = server.db.get_connection()
+        conn.execute('DELETE FROM users WHERE user_id = ?', (user.user_id,))
+        conn.commit()
+        conn.close()
+        client = FakeClient()
+        server.handle_resume(client, token)
+        assert client.reply('resume') == {'type': 'resume', 'success': False, 'message': 'User not found'}
+        assert client.user_id is None
+        server.db.close()
+
+
+def test_file_port_requires_token():
+    """Test the file server refuses requests without a valid, unrevoked session token"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        sessions = SessionManager(secret=os.urandom(32))
+        port = start_file_server(data_dir, sessions)
+        token = sessions.issue(1, 'alice')
+        with FileTransferClient('127.0.0.1', port, token) as transfer:
+            sha256 = transfer.upload(write_attachment(data_dir))['sha256']
+            assert transfer.read_range(sha256, 0, 6) == b'attach'
+        
+        sessions.revoke(token)
+        for bad_token in (None, 'not.a-token', token):
+            with FileTransferClient('127.0.0.1', port, bad_token) as transfer:
+                try:
+                    transfer.read_range(sha256)
+                    raise AssertionError(f"read with token {bad_token!r}")
+                except TransferError as e:
+                    assert str(e) == 'Not authenticated'
+        
+        with FileTransferClient('127.0.0.1', port, sessions.issue(1, 'alice')) as transfer:
+            try:
+                transfer.request({'action': 'download', 'sha256': sha256, 'offset': 'start'})
+                raise AssertionError("accepted a non-numeric offset")
+            except TransferError as e:
+                assert str(e) == 'Invalid request'
+
+
+def test_file_port_header_limit():
+    """Test the file server stops reading a request header longer than MAX_HEADER"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        port = start_file_server(data_dir, SessionManager(secret=os.urandom(32)))
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as s:
+            s.sendall(b'{"action": "' + b'a' * (MAX_HEADER + 100))
+            reply = s.makefile('rb').readline()
+            assert b'Request too large' in reply, reply
+            assert s.recv(1) == b''
+
+
+def test_file_port_tls():
+    """Test the file server uses the chat server's TLS context, so tokens are not sent in the clear"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        cert = write_certificate(data_dir)
+        sessions = SessionManager(secret=os.urandom(32))
+        port = start_file_server(data_dir, sessions, create_server_context(cert))
+        token = sessions.issue(1, 'alice')
+        
+        with FileTransferClient('127.0.0.1', port, token, ssl_context=create_client_context(cert)) as transfer:
+            sha256 = transfer.upload(write_attachment(data_dir))['sha256']
+            assert transfer.read_range(sha256) == b'attachment'
+        
+        # A plaintext client gets no reply to its request
+        with FileTransferClient('127.0.0.1', port, token, timeout=5) as transfer:
+            try:
+                transfer.read_range(sha256)
+                raise AssertionError("served a plaintext request")
+            except (TransferError, ValueError, OSError):
+                pass
+
+
+def test_shard_layout_mismatch():
+    """Test opening a database with a different number of shards raises ValueError"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, 'chat_app.db')
+        DatabaseHandler(path, shards=2).close()
+        for shards, option in ((0, 'with --shards 2'), (3, 'with --shards 2')):
+            try:
+                DatabaseHandler(path, shards=shards)
+                raise AssertionError(f"opened with {shards} shards")
+            except ValueError as e:
+                assert option in str(e), e
+        DatabaseHandler(path, shards=2).close()
+        
+        path = os.path.join(data_dir, 'plain.db')
+        DatabaseHandler(path).close()
+        try:
+            DatabaseHandler(path, shards=4)
+            raise AssertionError("opened with 4 shards")
+        except ValueError as e:
+            assert 'without --shards' in str(e), e
+
+
+TESTS = [
+    test_revoked_token_rejected,
+    test_logout_revokes_resume,
+    test_resume_mismatched_user,
+    test_file_port_requires_token,
+    test_file_port_header_limit,
+    test_file_port_tls,
+    test_shard_layout_mismatch
+]
+
+
+def main():
+    print("=" * 50)
+    print("Chat Application Security Test")
+    print("=" * 50)
+    
+    passed = 0
+    for test in TESTS:
+        name = test.__doc__
+        try:
+            test()
+            print(f"✓ {name}: PASSED")
+            passed += 1
+        except Exception as e:
+            print(f"✗ {name}: FAILED - {e!r}")
+    
+    print("=" * 50)
+    print(f"Test Results: {passed}/{len(TESTS)} tests passed")
+    print("=" * 50)
+    if passed != len(TESTS):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 """
-GUI package for chat application
+Utilities package for chat application
 """
-from .login_window import LoginWindow
-from .chat_window import ChatWindow
-from .styles import COLORS, LOGIN_STYLE, CHAT_STYLE
+from .encryption import EncryptionHandler
+from .file_transfer import FileTransferClient, TransferError
+from .notifications import NotificationManager
+from .session import SessionManager
 
-__all__ = ['LoginWindow', 'ChatWindow', 'COLORS', 'LOGIN_STYLE', 'CHAT_STYLE']
+__all__ = ['EncryptionHandler', 'FileTransferClient', 'TransferError', 'NotificationManager', 'SessionManager']
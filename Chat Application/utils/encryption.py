@@ -0,0 +1,165 @@
+"""
+Message encryption and password hashing utilities
+"""
+import binascii
+import hashlib
+import hmac
+import os
+from typing import Dict, Iterable, List, Optional
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+
+# Authenticated ciphers that can be selected by name
+CIPHERS = {
+    'aes-gcm': AESGCM,
+    'chacha20-poly1305': ChaCha20Poly1305
+}
+DEFAULT_CIPHER = 'aes-gcm'
+
+NONCE_SIZE = 12
+KEY_SIZE = 32
+
+# Shared master key, created on first use next to the application
+KEY_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'chat_secret.key')
+KEY_ENV_VAR = 'CHAT_ENCRYPTION_KEY'
+
+# PBKDF2 work factor; raise it as hardware gets faster
+PASSWORD_ITERATIONS = int(os.environ.get('CHAT_PASSWORD_ITERATIONS', 200000))
+PASSWORD_SCHEME = 'pbkdf2_sha256'
+
+
+def load_master_key(key_file: str = KEY_FILE) -> bytes:
+    """Load the master key from the environment or the key file, creating it if needed"""
+    env_key = os.environ.get(KEY_ENV_VAR)
+    if env_key:
+        return binascii.a2b_base64(env_key)
+    
+    if os.path.exists(key_file):
+        with open(key_file, 'rb') as f:
+            return binascii.a2b_base64(f.read())
+    
+    key = os.urandom(KEY_SIZE)
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(binascii.b2a_base64(key))
+    return key
+
+
+class EncryptionHandler:
+    """Authenticated encryption of message content with per-room keys"""
+    
+    def __init__(self, master_key: Optional[bytes] = None, cipher: str = DEFAULT_CIPHER):
+        """Initialize with a master key and cipher name"""
+        if cipher not in CIPHERS:
+            raise ValueError(f"Unknown cipher '{cipher}', expected one of {sorted(CIPHERS)}")
+        self.cipher_name = cipher
+        self.cipher_class = CIPHERS[cipher]
+        self.master_key = master_key if master_key is not None else load_master_key()
+        self._room_ciphers: Dict[int, object] = {}
+    
+    def get_room_cipher(self, room_id: int):
+        """Get the cached AEAD instance for a room, deriving its key once"""
+        aead = self._room_ciphers.get(room_id)
+        if aead is None:
+            room_key = HKDF(
+                algorithm=hashes.SHA256(),
+                length=KEY_SIZE,
+                salt=None,
+                info=f'{self.cipher_name}:room:{room_id}'.encode('ascii')
+            ).derive(self.master_key)
+            aead = self.cipher_class(room_key)
+            self._room_ciphers[room_id] = aead
+        return aead
+    
+    def encrypt(self, content: str, room_id: int = 1) -> str:
+        """Encrypt message content for a room"""
+        return self.encrypt_many([content], room_id)[0]
+    
+    def decrypt(self, token: str, room_id: int = 1) -> str:
+        """Decrypt message content for a room; raises ValueError on failure"""
+        return self.decrypt_many([token], room_id, strict=True)[0]
+    
+    def encrypt_many(self, contents: Iterable[str], room_id: int = 1) -> List[str]:
+        """Encrypt a batch of messages with one key lookup and one nonce draw"""
+        contents = list(contents)
+        encrypt = self.get_room_cipher(room_id).encrypt
+        aad = b'%d' % room_id
+        b2a = binascii.b2a_base64
+        nonces = os.urandom(NONCE_SIZE * len(contents))
+        
+        tokens = []
+        for i, content in enumerate(contents):
+            nonce = nonces[i * NONCE_SIZE:(i + 1) * NONCE_SIZE]
+            sealed = encrypt(nonce, content.encode('utf-8'), aad)
+            tokens.append(b2a(nonce + sealed, newline=False).decode('ascii'))
+        return tokens
+    
+    def decrypt_many(self, tokens: Iterable[str], room_id: int = 1, strict: bool = False) -> List[str]:
+        """Decrypt a batch of messages for a room
+        
+        Tokens that fail to decrypt raise ValueError when strict, otherwise
+        they are returned unchanged (e.g. plaintext or legacy content).
+        """
+        decrypt = self.get_room_cipher(room_id).decrypt
+        aad = b'%d' % room_id
+        a2b = binascii.a2b_base64
+        
+        contents = []
+        for token in tokens:
+            try:
+                raw = a2b(token)
+                contents.append(decrypt(raw[:NONCE_SIZE], raw[NONCE_SIZE:], aad).decode('utf-8'))
+            except (binascii.Error, InvalidTag, ValueError, TypeError) as e:
+                if strict:
+                    raise ValueError(f"Could not decrypt message: {e.__class__.__name__}") from e
+                contents.append(token)
+        return contents
+    
+    # Password hashing
+    @staticmethod
+    def hash_password(password: str, iterations: int = None) -> str:
+        """Hash a password with salted PBKDF2-HMAC-SHA256"""
+        iterations = iterations or PASSWORD_ITERATIONS
+        salt = os.urandom(16)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+        return '$'.join([
+            PASSWORD_SCHEME,
+            str(iterations),
+            binascii.b2a_base64(salt, newline=False).decode('ascii'),
+            binascii.b2a_base64(digest, newline=False).decode('ascii')
+        ])
+    
+    @staticmethod
+    def verify_password(password: str, password_hash: str) -> bool:
+        """Verify a password against a stored hash"""
+        if not password_hash:
+            return False
+        
+        parts = password_hash.split('$')
+        if len(parts) == 4 and parts[0] == PASSWORD_SCHEME:
+            try:
+                iterations = int(parts[1])
+                salt = binascii.a2b_base64(parts[2])
+                expected = binascii.a2b_base64(parts[3])
+            except (ValueError, binascii.Error):
+                return False
+            digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+            return hmac.compare_digest(digest, expected)
+        
+        # Legacy unsalted SHA-256 hex digests
+        legacy = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(legacy, password_hash)
+    
+    @staticmethod
+    def needs_rehash(password_hash: str) -> bool:
+        """Check whether a stored hash uses an outdated scheme or cost"""
+        parts = password_hash.split('$')
+        if len(parts) != 4 or parts[0] != PASSWORD_SCHEME:
+            return True
+        try:
+            return int(parts[1]) < PASSWORD_ITERATIONS
+        except ValueError:
+            return True
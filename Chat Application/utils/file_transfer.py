@@ -0,0 +1,158 @@
+"""
+Client side of the chunked, resumable file transfer channel
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import socket
+import ssl
+from typing import Callable, Optional
+
+
+CHUNK_SIZE = 1024 * 1024
+ProgressCallback = Optional[Callable[[int, int], None]]
+
+
+class TransferError(Exception):
+    """Raised when the file server rejects or aborts a transfer"""
+
+
+def hash_file(path: str) -> str:
+    """Get the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def describe_file(path: str, sha256: str) -> dict:
+    """Build the attachment descriptor sent as message content"""
+    mime = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    return {
+        'sha256': sha256,
+        'name': os.path.basename(path),
+        'size': os.path.getsize(path),
+        'mime': mime
+    }
+
+
+class FileTransferClient:
+    """One connection to the file server; requests run sequentially"""
+    
+    def __init__(self, host: str, port: int, token: str, timeout: float = 30.0,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.token = token
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        if ssl_context:
+            # The session token must not cross the network in the clear
+            try:
+                self.sock = ssl_context.wrap_socket(self.sock, server_hostname=host)
+            except OSError:
+                self.sock.close()
+                raise
+        self.reader = self.sock.makefile('rb')
+        
+    def close(self):
+        """Close the connection"""
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        
+    def request(self, payload: dict) -> dict:
+        """Send a request header, with the session token, and read the response header"""
+        payload = dict(payload, token=self.token)
+        self.sock.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+        line = self.reader.readline()
+        if not line:
+            raise TransferError("Connection closed by file server")
+        response = json.loads(line.decode('utf-8'))
+        if response.get('status') == 'error':
+            raise TransferError(response.get('message', 'Transfer failed'))
+        return response
+    
+    def upload(self, path: str, progress: ProgressCallback = None) -> dict:
+        """Upload a file once (deduplicated by hash, resumed if interrupted)"""
+        sha256 = hash_file(path)
+        descriptor = describe_file(path, sha256)
+        size = descriptor['size']
+        
+        response = self.request({'action': 'upload', 'sha256': sha256, 'size': size})
+        if response['status'] == 'exists':
+            return descriptor
+        if response['status'] != 'ready':
+            raise TransferError(response.get('message', 'Upload not accepted'))
+        
+        offset = response['offset']
+        with open(path, 'rb') as f:
+            sent = offset
+            while sent < size:
+                count = min(CHUNK_SIZE, size - sent)
+                sent += self.sock.sendfile(f, sent, count)
+                if progress:
+                    progress(sent, size)
+        
+        line = self.reader.readline()
+        response = json.loads(line.decode('utf-8')) if line else {}
+        if response.get('status') != 'complete':
+            raise TransferError(response.get('message', 'Upload failed'))
+        return descriptor
+    
+    def read_range(self, sha256: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Fetch a byte range of a blob"""
+        response = self.request({'action': 'download', 'sha256': sha256, 'offset': offset, 'length': length})
+        if response['status'] != 'ok':
+            raise TransferError("File not found on server")
+        return self._read_exact(response['length'])
+    
+    def download(self, sha256: str, dest_path: str, progress: ProgressCallback = None) -> str:
+        """Download a blob to dest_path, resuming from an existing .part file"""
+        partial = dest_path + '.part'
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        
+        response = self.request({'action': 'download', 'sha256': sha256, 'offset': offset})
+        if response['status'] != 'ok':
+            raise TransferError("File not found on server")
+        
+        size = response['size']
+        remaining = response['length']
+        received = response['offset']
+        buffer = bytearray(CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(partial, 'ab') as f:
+            while remaining > 0:
+                count = self.reader.readinto(view[:min(CHUNK_SIZE, remaining)])
+                if not count:
+                    raise TransferError("Connection closed during download")
+                f.write(view[:count])
+                remaining -= count
+                received += count
+                if progress:
+                    progress(received, size)
+        
+        if hash_file(partial) != sha256:
+            os.remove(partial)
+            raise TransferError("Downloaded file is corrupt")
+        os.replace(partial, dest_path)
+        return dest_path
+    
+    def thumbnail(self, sha256: str) -> Optional[bytes]:
+        """Fetch the server-generated thumbnail of an image"""
+        response = self.request({'action': 'thumbnail', 'sha256': sha256})
+        if response['status'] != 'ok':
+            return None
+        return self._read_exact(response['length'])
+    
+    def _read_exact(self, length: int) -> bytes:
+        data = self.reader.read(length)
+        if len(data) != length:
+            raise TransferError("Connection closed during transfer")
+        return data
@@ -0,0 +1,46 @@
+"""
+Desktop notification system
+"""
+import time
+
+try:
+    from plyer import notification
+except ImportError:
+    notification = None
+
+
+APP_NAME = 'Chat Application'
+PREVIEW_LENGTH = 80
+# Minimum seconds between desktop notifications
+MIN_INTERVAL = 2.0
+
+
+class NotificationManager:
+    """Shows desktop notifications, rate limited to avoid flooding"""
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled and notification is not None
+        self.last_shown = 0.0
+        
+    def notify(self, title: str, message: str):
+        """Show a desktop notification if enabled and not rate limited"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if now - self.last_shown < MIN_INTERVAL:
+            return
+        self.last_shown = now
+        try:
+            notification.notify(title=title, message=message, app_name=APP_NAME, timeout=5)
+        except Exception as e:
+            print(f"Notification error: {e}")
+            
+    def notify_new_message(self, sender: str, content: str):
+        """Notify about a new chat message"""
+        if len(content) > PREVIEW_LENGTH:
+            content = content[:PREVIEW_LENGTH - 3] + '...'
+        self.notify(f"New message from {sender}", content)
+        
+    def notify_user_joined(self, username: str):
+        """Notify that a user joined the room"""
+        self.notify("User Joined", f"{username} joined the chat")
@@ -0,0 +1,156 @@
+"""
+Sampling profiler and lock contention timing for the chat server
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Optional
+
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'profiles')
+# Seconds between samples; each sample walks the stack of every thread
+SAMPLE_INTERVAL = 0.01
+MAX_STACK_DEPTH = 64
+MAX_PROFILE_SECONDS = 300
+
+
+class TimedLock:
+    """Lock that records how often and how long threads wait to acquire it"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def reset(self):
+        """Clear the contention counters; must not be called while holding the lock"""
+        with self.lock:
+            self.clear()
+
+    def clear(self):
+        self.acquisitions = 0
+        self.contentions = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        """Acquire the lock, timing the wait when it is already held"""
+        if self.lock.acquire(False):
+            self.acquisitions += 1
+            return True
+        if not blocking:
+            return False
+        start = time.perf_counter()
+        if not self.lock.acquire(True, timeout):
+            return False
+        waited = time.perf_counter() - start
+        # Counters are only updated while holding the lock
+        self.acquisitions += 1
+        self.contentions += 1
+        self.wait_time += waited
+        self.max_wait = max(self.max_wait, waited)
+        return True
+
+    def release(self):
+        self.lock.release()
+
+    def locked(self) -> bool:
+        return self.lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def stats(self) -> dict:
+        """Return the contention counters"""
+        return {
+            'acquisitions': self.acquisitions,
+            'contentions': self.contentions,
+            'wait_ms': round(self.wait_time * 1000, 3),
+            'max_wait_ms': round(self.max_wait * 1000, 3)
+        }
+
+
+class SamplingProfiler:
+    """Periodically samples the stacks of all threads into collapsed-stack counts
+
+    The output is one "thread;outer;...;inner count" line per distinct stack,
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, output_dir: str = PROFILE_DIR):
+        self.interval = interval
+        self.output_dir = output_dir
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        # Makes checking for a running profile and starting one atomic
+        self.start_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, seconds: float, on_done: Optional[Callable[[str, int], None]] = None,
+              on_start: Optional[Callable[[], None]] = None) -> bool:
+        """Profile for up to seconds in the background; False if already running
+
+        on_start is called just before sampling begins, only if this call
+        starts a profile. on_done is called with the output path and sample
+        count when finished.
+        """
+        with self.start_lock:
+            if self.running:
+                return False
+            seconds = min(max(seconds, 0), MAX_PROFILE_SECONDS)
+            if on_start:
+                on_start()
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, args=(seconds, on_done), name='profiler', daemon=True)
+            self.thread.start()
+            return True
+
+    def stop(self):
+        """End the current profile early"""
+        self.stop_event.set()
+
+    def run(self, seconds: float, on_done: Optional[Callable[[str, int], None]]):
+        counts = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline and not self.stop_event.is_set():
+            self.sample(counts)
+            samples += 1
+            self.stop_event.wait(self.interval)
+        path = self.write(counts)
+        if on_done:
+            on_done(path, samples)
+
+    def sample(self, counts: Counter):
+        """Add the current stack of every other thread to counts"""
+        me = threading.get_ident()
+        threads = {t.ident: t for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            thread = threads.get(ident)
+            # Group by thread class so all ClientThreads merge into one flame
+            names = [type(thread).__name__ if thread else str(ident)]
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            names.extend(reversed(stack))
+            counts[';'.join(name.replace(';', ':') for name in names)] += 1
+
+    def write(self, counts: Counter) -> str:
+        """Write collapsed stacks and return the file path"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded")
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
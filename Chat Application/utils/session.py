@@ -0,0 +1,88 @@
+"""
+Signed, expiring session tokens for resuming a login without the password
+
+Tokens are stateless, so logging out revokes a token by remembering its
+signature until the token would have expired anyway.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from .encryption import load_master_key
+
+
+# Seconds a session token stays valid after login
+SESSION_TTL = int(os.environ.get('CHAT_SESSION_TTL', 12 * 60 * 60))
+SESSION_KEY_INFO = b'chat-session-token'
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+class SessionManager:
+    """Issues and verifies HMAC-SHA256 signed session tokens"""
+
+    def __init__(self, secret: Optional[bytes] = None, ttl: int = SESSION_TTL):
+        """Initialize with a signing secret, derived from the master key by default"""
+        if secret is None:
+            # Derived from the master key so tokens survive a server restart
+            secret = hmac.new(load_master_key(), SESSION_KEY_INFO, hashlib.sha256).digest()
+        self.secret = secret
+        self.ttl = ttl
+        self.revoked: Dict[str, int] = {}  # signature -> expiry of revoked tokens
+        self.lock = threading.Lock()
+
+    def sign(self, payload: str) -> str:
+        """Return the signature of an encoded payload"""
+        return _b64encode(hmac.new(self.secret, payload.encode('ascii'), hashlib.sha256).digest())
+
+    def issue(self, user_id: int, username: str) -> str:
+        """Create a token for a logged in user"""
+        expires = int(time.time()) + self.ttl
+        # The nonce keeps tokens from two logins apart, so revoking one leaves the other
+        nonce = _b64encode(os.urandom(12))
+        payload = _b64encode(json.dumps([user_id, username, expires, nonce], separators=(',', ':')).encode('utf-8'))
+        return f"{payload}.{self.sign(payload)}"
+
+    def verify(self, token: str) -> Optional[Tuple[int, str]]:
+        """Return (user_id, username) for a valid, unexpired token, else None"""
+        if not isinstance(token, str) or token.count('.') != 1:
+            return None
+        payload, signature = token.split('.')
+        try:
+            if not hmac.compare_digest(signature, self.sign(payload)):
+                return None
+            user_id, username, expires = json.loads(_b64decode(payload))[:3]
+        except (ValueError, TypeError, UnicodeError, binascii.Error):
+            return None
+        if expires < time.time() or signature in self.revoked:
+            return None
+        return user_id, username
+    
+    def revoke(self, token: str) -> Optional[Tuple[str, int]]:
+        """Revoke a valid token; returns (signature, expires) to persist, else None"""
+        if not self.verify(token):
+            return None
+        payload, signature = token.split('.')
+        expires = json.loads(_b64decode(payload))[2]
+        self.load_revoked([(signature, expires)])
+        return signature, expires
+    
+    def load_revoked(self, entries: Iterable[Tuple[str, int]]):
+        """Add revoked (signature, expires) pairs, dropping those that expired"""
+        now = time.time()
+        with self.lock:
+            # Replaced rather than mutated so verify can read it without the lock
+            revoked = {signature: expires for signature, expires in self.revoked.items() if expires >= now}
+            revoked.update((signature, expires) for signature, expires in entries if expires >= now)
+            self.revoked = revoked
@@ -0,0 +1,31 @@
+"""
+TLS contexts for the chat connection
+"""
+import os
+import ssl
+from typing import Optional
+
+
+# Client side: trust this certificate (or CA bundle) and connect with TLS
+CA_ENV_VAR = 'CHAT_TLS_CA'
+# Seconds a client gets to finish the TLS handshake
+HANDSHAKE_TIMEOUT = 10.0
+
+
+def create_server_context(certfile: str, keyfile: Optional[str] = None) -> ssl.SSLContext:
+    """Server context issuing TLS 1.3 session tickets for cheap reconnects"""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.load_cert_chain(certfile, keyfile)
+    context.num_tickets = 2
+    return context
+
+
+def create_client_context(cafile: Optional[str] = None) -> Optional[ssl.SSLContext]:
+    """Client context trusting cafile (default: CHAT_TLS_CA); None when TLS is not configured"""
+    cafile = cafile or os.environ.get(CA_ENV_VAR)
+    if not cafile:
+        return None
+    context = ssl.create_default_context(cafile=cafile)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    return context